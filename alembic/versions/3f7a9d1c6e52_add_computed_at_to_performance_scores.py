@@ -0,0 +1,27 @@
+"""add computed_at to performance_scores
+
+Revision ID: 3f7a9d1c6e52
+Revises: 8c1e4f2a9b3d
+Create Date: 2026-10-19 11:40:03.524871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a9d1c6e52'
+down_revision: Union[str, None] = '8c1e4f2a9b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Existing rows stay NULL so they are treated as stale and recomputed on next read
+    op.add_column('performance_scores', sa.Column('computed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('performance_scores', 'computed_at')
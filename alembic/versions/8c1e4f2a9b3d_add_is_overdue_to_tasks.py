@@ -0,0 +1,31 @@
+"""add is_overdue to tasks
+
+Revision ID: 8c1e4f2a9b3d
+Revises: 5732602edc86
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1e4f2a9b3d'
+down_revision: Union[str, None] = '5732602edc86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('is_overdue', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.create_index('ix_tasks_is_overdue', 'tasks', ['is_overdue'])
+
+    # Backfill: open tasks already past their deadline
+    op.execute("UPDATE tasks SET is_overdue = true WHERE status != 'completed' AND deadline < now()")
+
+
+def downgrade():
+    op.drop_index('ix_tasks_is_overdue', table_name='tasks')
+    op.drop_column('tasks', 'is_overdue')
@@ -0,0 +1,39 @@
+"""add last_read_message_id to conversation participants
+
+Revision ID: a7d2e9f1c3b5
+Revises: f3b8c1d2a4e6
+Create Date: 2026-10-19 18:05:42.903115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e9f1c3b5'
+down_revision: Union[str, None] = 'f3b8c1d2a4e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('conversation_participants', sa.Column('last_read_message_id', sa.Integer(), nullable=True))
+    # Unread counts range-scan ids after the read watermark
+    op.create_index('ix_messages_conversation_id_id', 'messages', ['conversation_id', 'id'])
+
+    # Existing history counts as read rather than flooding everyone with unread badges
+    op.execute("""
+        UPDATE conversation_participants cp
+        SET last_read_message_id = (
+            SELECT max(m.id) FROM messages m
+            WHERE m.conversation_id = cp.conversation_id
+              AND (cp.removed_at IS NULL OR m.created_at <= cp.removed_at)
+        )
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_messages_conversation_id_id', table_name='messages')
+    op.drop_column('conversation_participants', 'last_read_message_id')
@@ -0,0 +1,60 @@
+"""backfill performance_counters
+
+Revision ID: a9d3f6b2c8e1
+Revises: e4c8a1f7b2d9
+Create Date: 2026-10-20 09:12:44.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f6b2c8e1'
+down_revision: Union[str, None] = 'e4c8a1f7b2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Rebuild every month's counters from the source tables (UTC months, as the
+    # routes bump them). Overwrites existing rows, so re-running is harmless.
+    op.execute("""
+        INSERT INTO performance_counters
+            (user_id, month, year, reports_submitted, days_present, tasks_completed, rating_sum, rating_count)
+        SELECT user_id, month, year, sum(reports), sum(present), sum(completed), sum(rating_sum), sum(rated)
+        FROM (
+            SELECT user_id,
+                   extract(month FROM created_at AT TIME ZONE 'UTC')::int AS month,
+                   extract(year FROM created_at AT TIME ZONE 'UTC')::int AS year,
+                   1 AS reports, 0 AS present, 0 AS completed, 0 AS rating_sum, 0 AS rated
+            FROM daily_reports
+            WHERE created_at IS NOT NULL
+            UNION ALL
+            SELECT user_id,
+                   extract(month FROM check_in_at AT TIME ZONE 'UTC')::int,
+                   extract(year FROM check_in_at AT TIME ZONE 'UTC')::int,
+                   0, 1, 0, 0, 0
+            FROM attendance_logs
+            UNION ALL
+            SELECT assigned_to_id,
+                   extract(month FROM completed_at AT TIME ZONE 'UTC')::int,
+                   extract(year FROM completed_at AT TIME ZONE 'UTC')::int,
+                   0, 0, 1, coalesce(rating, 0), (rating IS NOT NULL)::int
+            FROM tasks
+            WHERE completed_at IS NOT NULL
+        ) AS events
+        GROUP BY user_id, month, year
+        ON CONFLICT ON CONSTRAINT uq_counter_user_month_year DO UPDATE SET
+            reports_submitted = excluded.reports_submitted,
+            days_present = excluded.days_present,
+            tasks_completed = excluded.tasks_completed,
+            rating_sum = excluded.rating_sum,
+            rating_count = excluded.rating_count
+    """)
+
+
+def downgrade():
+    # Counters are derived data; nothing to undo
+    pass
@@ -0,0 +1,41 @@
+"""add performance_counters
+
+Revision ID: b42d6e8f0a17
+Revises: 3f7a9d1c6e52
+Create Date: 2026-10-19 13:05:17.902346
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b42d6e8f0a17'
+down_revision: Union[str, None] = '3f7a9d1c6e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'performance_counters',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('reports_submitted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('days_present', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('user_id', 'month', 'year', name='uq_counter_user_month_year'),
+    )
+    op.create_index('ix_performance_counters_id', 'performance_counters', ['id'])
+    # Populate with: python -m app.services.counters --month M --year Y
+
+
+def downgrade():
+    op.drop_index('ix_performance_counters_id', table_name='performance_counters')
+    op.drop_table('performance_counters')
@@ -0,0 +1,38 @@
+"""add full-text search vector to messages
+
+Revision ID: b8f4d2e6a1c7
+Revises: c5e1f8a3d7b9
+Create Date: 2026-10-19 20:41:09.318452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f4d2e6a1c7'
+down_revision: Union[str, None] = 'c5e1f8a3d7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Generated column: Postgres keeps it in step with content on insert/update.
+    # Adding it rewrites the table once, so run this in a quiet window on large installs.
+    op.add_column(
+        'messages',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', content)", persisted=True),
+        ),
+    )
+    op.create_index('ix_messages_search_vector', 'messages', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_messages_search_vector', table_name='messages')
+    op.drop_column('messages', 'search_vector')
@@ -0,0 +1,97 @@
+"""add targeted messages and recipient join table
+
+Revision ID: c5e1f8a3d7b9
+Revises: a7d2e9f1c3b5
+Create Date: 2026-10-19 19:12:37.551204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1f8a3d7b9'
+down_revision: Union[str, None] = 'a7d2e9f1c3b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'targeted_messages',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('admin_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_targeted_messages_id', 'targeted_messages', ['id'])
+    op.create_index('ix_targeted_messages_admin_id', 'targeted_messages', ['admin_id'])
+
+    op.create_table(
+        'message_recipients',
+        sa.Column('message_id', sa.Integer(), sa.ForeignKey('targeted_messages.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+    )
+    op.create_index('ix_message_recipients_user_message', 'message_recipients', ['user_id', 'message_id'])
+
+    # Carry over targeted messages still stored the old way (recipient_ids array on messages), keeping ids
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'messages' AND column_name = 'recipient_ids'
+            ) THEN
+                INSERT INTO targeted_messages (id, admin_id, title, content, created_at)
+                SELECT id, admin_id, title, content, created_at
+                FROM messages WHERE conversation_id IS NULL;
+
+                INSERT INTO message_recipients (message_id, user_id)
+                SELECT DISTINCT id, unnest(recipient_ids)
+                FROM messages WHERE conversation_id IS NULL;
+
+                PERFORM setval(
+                    pg_get_serial_sequence('targeted_messages', 'id'),
+                    COALESCE((SELECT max(id) FROM targeted_messages), 0) + 1,
+                    false
+                );
+            END IF;
+        END $$;
+    """)
+
+    # Replies belong to targeted messages now. Replies whose message_id pointed at
+    # anything else (chat messages) would silently attach to whichever targeted
+    # message later reuses that id, so move them aside before adding the FK.
+    op.execute("ALTER TABLE message_replies DROP CONSTRAINT IF EXISTS message_replies_message_id_fkey")
+    op.execute("""
+        CREATE TABLE message_replies_orphaned AS
+        SELECT * FROM message_replies
+        WHERE message_id NOT IN (SELECT id FROM targeted_messages)
+    """)
+    op.execute("DELETE FROM message_replies WHERE message_id NOT IN (SELECT id FROM targeted_messages)")
+    op.execute("""
+        ALTER TABLE message_replies
+        ADD CONSTRAINT message_replies_message_id_fkey
+        FOREIGN KEY (message_id) REFERENCES targeted_messages (id)
+    """)
+    op.create_index('ix_message_replies_message_id', 'message_replies', ['message_id'])
+
+
+def downgrade():
+    op.drop_index('ix_message_replies_message_id', table_name='message_replies')
+    op.execute("ALTER TABLE message_replies DROP CONSTRAINT IF EXISTS message_replies_message_id_fkey")
+    op.execute("""
+        ALTER TABLE message_replies
+        ADD CONSTRAINT message_replies_message_id_fkey
+        FOREIGN KEY (message_id) REFERENCES messages (id) NOT VALID
+    """)
+    op.execute("INSERT INTO message_replies SELECT * FROM message_replies_orphaned")
+    op.drop_table('message_replies_orphaned')
+    op.drop_index('ix_message_recipients_user_message', table_name='message_recipients')
+    op.drop_table('message_recipients')
+    op.drop_index('ix_targeted_messages_admin_id', table_name='targeted_messages')
+    op.drop_index('ix_targeted_messages_id', table_name='targeted_messages')
+    op.drop_table('targeted_messages')
@@ -0,0 +1,43 @@
+"""add archived message segments
+
+Revision ID: d2a7c9e4f6b1
+Revises: b8f4d2e6a1c7
+Create Date: 2026-10-19 21:27:44.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c9e4f6b1'
+down_revision: Union[str, None] = 'b8f4d2e6a1c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'archived_message_segments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('conversation_id', sa.Integer(), sa.ForeignKey('conversations.id'), nullable=False),
+        sa.Column('first_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('first_message_id', sa.Integer(), nullable=False),
+        sa.Column('last_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+    )
+    op.create_index(
+        'ix_archived_segments_conversation_last', 'archived_message_segments',
+        ['conversation_id', 'last_created_at', 'last_message_id']
+    )
+    # Already compressed; keep Postgres from trying again
+    op.execute("ALTER TABLE archived_message_segments ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade():
+    op.drop_index('ix_archived_segments_conversation_last', table_name='archived_message_segments')
+    op.drop_table('archived_message_segments')
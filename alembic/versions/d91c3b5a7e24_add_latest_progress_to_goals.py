@@ -0,0 +1,41 @@
+"""add latest_progress and last_update_at to goals
+
+Revision ID: d91c3b5a7e24
+Revises: b42d6e8f0a17
+Create Date: 2026-10-19 15:21:48.337910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91c3b5a7e24'
+down_revision: Union[str, None] = 'b42d6e8f0a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('goals', sa.Column('latest_progress', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('goals', sa.Column('last_update_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill from the newest update of each goal
+    op.execute("""
+        UPDATE goals g
+        SET latest_progress = u.progress_percent,
+            last_update_at = u.created_at
+        FROM (
+            SELECT DISTINCT ON (goal_id) goal_id, progress_percent, created_at
+            FROM goal_updates
+            ORDER BY goal_id, created_at DESC, id DESC
+        ) u
+        WHERE u.goal_id = g.id
+    """)
+
+
+def downgrade():
+    op.drop_column('goals', 'last_update_at')
+    op.drop_column('goals', 'latest_progress')
@@ -0,0 +1,26 @@
+"""add date_of_birth to users
+
+Revision ID: e4c8a1f7b2d9
+Revises: d2a7c9e4f6b1
+Create Date: 2026-10-19 22:05:13.640287
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c8a1f7b2d9'
+down_revision: Union[str, None] = 'd2a7c9e4f6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('date_of_birth', sa.Date(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('users', 'date_of_birth')
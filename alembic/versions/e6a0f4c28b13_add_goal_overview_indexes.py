@@ -0,0 +1,30 @@
+"""add goal overview indexes
+
+Revision ID: e6a0f4c28b13
+Revises: d91c3b5a7e24
+Create Date: 2026-10-19 16:02:55.140672
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a0f4c28b13'
+down_revision: Union[str, None] = 'd91c3b5a7e24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Grouping goals per staff member and scanning the at-risk window
+    op.create_index('ix_goals_user_id', 'goals', ['user_id'])
+    op.create_index('ix_goals_target_date_progress', 'goals', ['target_date', 'latest_progress'])
+    op.create_index('ix_goal_updates_goal_id', 'goal_updates', ['goal_id'])
+
+
+def downgrade():
+    op.drop_index('ix_goal_updates_goal_id', table_name='goal_updates')
+    op.drop_index('ix_goals_target_date_progress', table_name='goals')
+    op.drop_index('ix_goals_user_id', table_name='goals')
@@ -0,0 +1,30 @@
+"""add message pagination indexes
+
+Revision ID: f3b8c1d2a4e6
+Revises: e6a0f4c28b13
+Create Date: 2026-10-19 17:21:08.412930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c1d2a4e6'
+down_revision: Union[str, None] = 'e6a0f4c28b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Keyset pagination seeks on (conversation_id, created_at, id)
+    op.create_index(
+        'ix_messages_conversation_created_id', 'messages', ['conversation_id', 'created_at', 'id']
+    )
+    op.create_index('ix_conversations_admin_id', 'conversations', ['admin_id'])
+
+
+def downgrade():
+    op.drop_index('ix_conversations_admin_id', table_name='conversations')
+    op.drop_index('ix_messages_conversation_created_id', table_name='messages')
@@ -1,6 +1,6 @@
 # app/config.py
 from pydantic_settings import BaseSettings
-from typing import Optional, Set
+from typing import Dict, Optional, Set
 from pydantic import Field
 
 class Settings(BaseSettings):
@@ -15,6 +15,31 @@ class Settings(BaseSettings):
     # IP Whitelist: comma-separated IPs. If empty or missing → allow any IP.
     OFFICE_IP_WHITELIST: Optional[str] = None
 
+    # How often the org-wide performance scores are re-materialized (0 = disabled)
+    PERFORMANCE_REFRESH_MINUTES: int = Field(60)
+    # Stored scores older than this are served but recomputed in the background
+    PERFORMANCE_SCORE_TTL_MINUTES: int = Field(15)
+    # JSON object overriding component weights, e.g. {"task_score": 0.4, "report_consistency": 0.25}
+    PERFORMANCE_WEIGHTS: Optional[Dict[str, float]] = None
+
+    # Per-connection WebSocket send queue; clients that fall this far behind are dropped
+    CHAT_WS_QUEUE_SIZE: int = Field(256)
+    # Cross-worker chat delivery: "postgres" (LISTEN/NOTIFY) or unset for a single worker
+    CHAT_BROKER: Optional[str] = None
+
+    # Server-Sent Events: keepalive interval, Last-Event-ID replay window, per-client queue
+    SSE_HEARTBEAT_SECONDS: int = Field(15)
+    SSE_REPLAY_SIZE: int = Field(1000)
+    SSE_QUEUE_SIZE: int = Field(256)
+
+    # Chat archival: conversations idle this long (or marked inactive) move to cold storage
+    ARCHIVE_IDLE_DAYS: int = Field(90)
+    # How often the archiver runs (0 = disabled)
+    ARCHIVE_INTERVAL_MINUTES: int = Field(60)
+
+    # Composite /home endpoint: each section gets this long before it is reported as timed out
+    HOME_SECTION_TIMEOUT_SECONDS: float = Field(3.0)
+
     model_config = {
         "env_file": ".env",
         "extra": "allow",
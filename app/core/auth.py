@@ -1,5 +1,7 @@
 # app/core/auth.py
+from typing import Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.requests import HTTPConnection
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +12,31 @@ from app.config import settings
 
 reusable_oauth2 = HTTPBearer()
 
+def stream_token(connection: HTTPConnection, token: Optional[str] = None) -> Optional[str]:
+    """
+    Token for long-lived connections (WebSocket, EventSource), which browsers
+    can't give custom headers: ``?token=`` first, then ``Authorization: Bearer``.
+    """
+    if token:
+        return token
+    scheme, _, credentials = connection.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" and credentials else None
+
+
+async def get_user_from_token(db: AsyncSession, token: str):
+    """The user a bearer token belongs to, or None if it is invalid or expired."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id = payload.get("sub")
+        if user_id is None:
+            return None
+    except JWTError:
+        return None
+
+    result = await db.execute(select(User).where(User.id == int(user_id)))
+    return result.scalar_one_or_none()
+
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: HTTPAuthorizationCredentials = Depends(reusable_oauth2)
@@ -19,21 +46,7 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token.credentials, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    # 🔵 Now `select` is imported → this works
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    user = await get_user_from_token(db, token.credentials)
     if user is None:
         raise credentials_exception
     return user
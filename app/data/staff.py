@@ -1,6 +0,0 @@
-staff_birthdays = [
-    {"name": "Bello", "date_of_birth": "1990-03-15"},
-    {"name": "Chidi Okoro", "date_of_birth": "1985-12-01"},
-    {"name": "Amina Yusuf", "date_of_birth": "1992-02-29"},
-    {"name": "Tunde Ade", "date_of_birth": "1988-07-22"},
-]
\ No newline at end of file
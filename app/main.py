@@ -1,8 +1,15 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware  # ← ADD THIS
-from app.routers import auth, attendance, reports, task, performance, dashboard, goal, admin, admin_messages, message, announcements, chat
+from app.routers import auth, attendance, reports, task, performance, dashboard, goal, admin, admin_messages, message, announcements, chat, notifications, home
 from app.database import engine
+from app.services.deadlines import deadline_scheduler
+from app.services.chat_hub import chat_hub, PostgresBroker
+from app.services.notifications import notify_task_overdue
+from app.services.performance import run_performance_materializer
+from app.services.archive import run_archiver
+from app.config import settings
+from app.utils.pagination import CURSOR_HEADERS
 from app.models.user import User
 from app.models.attendance import Attendance
 from app.models.performance import PerformanceScore
@@ -16,6 +23,9 @@ from sqlalchemy import exc as sa_exc
 
 app = FastAPI(title="SSMS - Smart Staff Management System", version="1.0")
 
+# Long-running asyncio tasks started on startup, cancelled on shutdown
+background_jobs = []
+
 # === ADD CORS MIDDLEWARE ===
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +36,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=CURSOR_HEADERS + ["ETag"],
 )
 
 # Include Routers
@@ -38,8 +49,11 @@ app.include_router(dashboard.router)
 app.include_router(goal.router)
 app.include_router(admin.router)
 app.include_router(admin_messages.router)
+app.include_router(message.router)
 app.include_router(announcements.router)
 app.include_router(chat.router)
+app.include_router(notifications.router)
+app.include_router(home.router)
 
 # Create DB Tables (for demo only — use Alembic in prod)
 @app.on_event("startup")
@@ -55,6 +69,37 @@ async def startup_event():
             else:
                 raise
 
+    # Load open task deadlines and start flipping overdue tasks
+    deadline_scheduler.subscribe(notify_task_overdue)
+    await deadline_scheduler.start()
+
+    # Real-time chat; with several workers, bridge hubs through Postgres LISTEN/NOTIFY
+    broker = None
+    if settings.CHAT_BROKER == "postgres":
+        broker = PostgresBroker(settings.DATABASE_URL.replace("+asyncpg", "", 1))
+    await chat_hub.start(broker=broker, loader=chat.load_message_event)
+
+    # Periodically refresh every staff member's performance score
+    if settings.PERFORMANCE_REFRESH_MINUTES > 0:
+        background_jobs.append(
+            asyncio.create_task(run_performance_materializer(settings.PERFORMANCE_REFRESH_MINUTES * 60))
+        )
+
+    # Move inactive and idle conversations' messages to compressed cold storage
+    if settings.ARCHIVE_INTERVAL_MINUTES > 0:
+        background_jobs.append(
+            asyncio.create_task(run_archiver(settings.ARCHIVE_INTERVAL_MINUTES * 60, settings.ARCHIVE_IDLE_DAYS))
+        )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await deadline_scheduler.stop()
+    await chat_hub.stop()
+    for job in background_jobs:
+        job.cancel()
+    await asyncio.gather(*background_jobs, return_exceptions=True)
+    background_jobs.clear()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to SSMS Backend"}
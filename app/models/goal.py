@@ -1,23 +1,30 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func, Date
 from app.database import Base
 
 class Goal(Base):
     __tablename__ = "goals"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     frequency = Column(String, nullable=False)  # daily, weekly, etc.
     priority = Column(String, nullable=False)   # low, medium, high
     target_date = Column(Date, nullable=False)  # auto-calculated or set
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Denormalized from the newest GoalUpdate, written in the same transaction
+    latest_progress = Column(Integer, default=0, server_default="0", nullable=False)
+    last_update_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_goals_target_date_progress", "target_date", "latest_progress"),
+    )
 
 class GoalUpdate(Base):
     __tablename__ = "goal_updates"
 
     id = Column(Integer, primary_key=True, index=True)
-    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False)
+    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False, index=True)
     note = Column(Text, nullable=True)
     progress_percent = Column(Integer, nullable=False)  # 0–100
     created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
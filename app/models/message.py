@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, func, ARRAY
+from sqlalchemy import Column, Computed, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint, func, ARRAY
 from app.database import Base
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
+
+SEARCH_CONFIG = "english"  # text search configuration for chat search
 
 
 class Announcement(Base):
@@ -13,14 +16,31 @@ class Announcement(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class TargetedMessage(Base):
+    """Admin-to-staff message; recipients live in message_recipients."""
+    __tablename__ = "targeted_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    admin_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class MessageRecipient(Base):
+    __tablename__ = "message_recipients"
+
+    message_id = Column(Integer, ForeignKey("targeted_messages.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
 
+    # "My messages" looks up by recipient first
+    __table_args__ = (Index("ix_message_recipients_user_message", "user_id", "message_id"),)
 
 
 class MessageReply(Base):
     __tablename__ = "message_replies"
 
     id = Column(Integer, primary_key=True, index=True)
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=False)
+    message_id = Column(Integer, ForeignKey("targeted_messages.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Staff or admin
     content = Column(Text, nullable=False)
     is_private = Column(Boolean, default=False)  # True = only admin sees it
@@ -33,7 +53,7 @@ class Conversation(Base):
     __tablename__ = "conversations"
 
     id = Column(Integer, primary_key=True, index=True)
-    admin_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Admin who started it
+    admin_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Admin who started it
     title = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)  # Can be archived
@@ -47,6 +67,7 @@ class ConversationParticipant(Base):
     added_at = Column(DateTime(timezone=True), server_default=func.now())
     removed_at = Column(DateTime(timezone=True), nullable=True)  # NULL = still in chat
     removed_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # Who removed them
+    last_read_message_id = Column(Integer, nullable=True)  # Read watermark; messages with a higher id are unread
 
     __table_args__ = (UniqueConstraint("conversation_id", "user_id", name="uq_conversation_user"),)
 
@@ -57,4 +78,31 @@ class Message(Base):
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Who sent it
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Maintained by Postgres on every insert/update; GIN-indexed for full-text search.
+    # Deferred so ordinary message loads don't drag the vector along.
+    search_vector = deferred(Column(TSVECTOR, Computed(f"to_tsvector('{SEARCH_CONFIG}', content)", persisted=True)))
+
+    __table_args__ = (
+        Index("ix_messages_conversation_created_id", "conversation_id", "created_at", "id"),
+        Index("ix_messages_conversation_id_id", "conversation_id", "id"),
+        Index("ix_messages_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class ArchivedMessageSegment(Base):
+    """A compressed run of consecutive messages from an archived conversation (see app.services.archive)."""
+    __tablename__ = "archived_message_segments"
+
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
+    first_created_at = Column(DateTime(timezone=True), nullable=False)
+    first_message_id = Column(Integer, nullable=False)
+    last_created_at = Column(DateTime(timezone=True), nullable=False)
+    last_message_id = Column(Integer, nullable=False)
+    message_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed JSON [[id, sender_id, content, created_at], ...]
+
+    __table_args__ = (
+        Index("ix_archived_segments_conversation_last", "conversation_id", "last_created_at", "last_message_id"),
+    )
@@ -1,5 +1,5 @@
 # app/models/performance.py
-from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
 from app.database import Base
 
 class PerformanceScore(Base):
@@ -16,7 +16,27 @@ class PerformanceScore(Base):
     attendance_rate = Column(Float, default=0.0)
     training_score = Column(Float, default=0.0)
     achievement_count = Column(Integer, default=0)
+    computed_at = Column(DateTime(timezone=True), nullable=True)  # NULL = never computed with a timestamp → stale
 
     __table_args__ = (
         UniqueConstraint("user_id", "month", "year", name="uq_user_month_year"),
-    )
\ No newline at end of file
+    )
+
+class PerformanceCounter(Base):
+    """Running per-user monthly totals, updated in the same transaction as the event."""
+    __tablename__ = "performance_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    month = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=False)
+
+    reports_submitted = Column(Integer, default=0, server_default="0", nullable=False)
+    days_present = Column(Integer, default=0, server_default="0", nullable=False)
+    tasks_completed = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_sum = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "year", name="uq_counter_user_month_year"),
+    )
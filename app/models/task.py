@@ -14,4 +14,5 @@ class Task(Base):
     rating = Column(Integer, nullable=True)     # 1–5
     deadline = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    completed_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    is_overdue = Column(Boolean, default=False, nullable=False, index=True)  # set by the deadline scheduler
\ No newline at end of file
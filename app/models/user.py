@@ -13,3 +13,4 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     role = Column(String, default="staff")  # ← NEW FIELD
+    date_of_birth = Column(Date, nullable=True)  # feeds the dashboard's birthday index
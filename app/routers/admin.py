@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, not_
+from sqlalchemy import select, func, and_, not_, insert, update
 from datetime import date, datetime, timedelta
-from app.database import get_db
+from app.database import get_db, AsyncSessionLocal
 from app.core.auth import get_current_admin
 from app.models.user import User
 from app.models.report import DailyReport
 from app.models.task import Task
 from app.models.attendance import Attendance
 from app.routers import goal
+from app.routers.goal import goal_status_expr
 from app.schemas.admin import AdminReportStatusResponse, AdminStaffReportItem
 from app.schemas.task import TaskResponse, TaskRate
 from app.schemas.admin import AdminTaskCreate, AdminTaskFilter
+from app.schemas.admin import (
+    AdminBulkTaskCreate, AdminBulkTaskRate, AdminBulkTaskStatus,
+    AdminBulkItemResult, AdminBulkResponse
+)
 from typing import List, Optional
 from datetime import timezone
 from app.schemas.admin import StaffProfileResponse
@@ -19,8 +24,13 @@ from app.models.goal import Goal, GoalUpdate
 from app.schemas.goal import GoalDetailResponse, GoalUpdateResponse
 from app.schemas.attendance import DailyAttendanceRecord, MonthlyAttendanceResponse
 from app.schemas.report import ReportHistoryResponse, ReportHistoryItem
+from app.services.deadlines import deadline_scheduler
+from app.services.cache import TTLCache
+from app.services.counters import apply_counter_deltas, completion_deltas, rating_delta
+from app.services.notifications import notify_task_assigned, notify_tasks_assigned
 from datetime import date
 from calendar import monthrange
+import asyncio
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -38,57 +48,121 @@ def get_goal_status(goal: Goal, latest_progress: int, today: date) -> str:
 
 
 
-@router.get("/dashboard")
-async def admin_dashboard(
-    db: AsyncSession = Depends(get_db),
-    admin = Depends(get_current_admin)
-):
-    today = date.today()
-    now = datetime.now()
+# Dashboard aggregates are shared by all admins for a short window
+dashboard_cache = TTLCache(ttl=30)
+TOP_N = 5
+
+
+async def _dashboard_counts(today: date) -> dict:
+    # All headline counts in one round-trip via scalar subqueries
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                select(func.count(User.id))
+                .where(User.role == "staff")
+                .scalar_subquery().label("total_staff"),
+                select(func.count(Attendance.id))
+                .join(User, User.id == Attendance.user_id)
+                .where(User.role == "staff")
+                .where(func.date(Attendance.check_in_at) == today)
+                .scalar_subquery().label("checked_in"),
+                select(func.count(DailyReport.id))
+                .where(func.date(DailyReport.date) == today)
+                .scalar_subquery().label("reports_submitted"),
+                select(func.count(Task.id))
+                .scalar_subquery().label("total_tasks"),
+                select(func.count(Task.id))
+                .where(Task.status == "completed")
+                .scalar_subquery().label("completed_tasks"),
+            )
+        )
+        return dict(result.one()._mapping)
 
-    # 1. Staff counts
-    total_staff = await db.execute(
-        select(func.count(User.id)).where(User.role == "staff")
-    )
-    total = total_staff.scalar_one()
 
-    # Checked in today
-    checked_in = await db.execute(
-        select(func.count(Attendance.id))
-        .join(User, User.id == Attendance.user_id)
+async def _dashboard_top_workers(month_start: datetime) -> list:
+    # Staff ranked by hours worked (checked-out sessions) this month
+    hours = (
+        func.sum(func.extract("epoch", Attendance.check_out_at - Attendance.check_in_at)) / 3600
+    ).label("hours")
+    per_user = (
+        select(Attendance.user_id, hours)
+        .where(Attendance.check_in_at >= month_start)
+        .where(Attendance.check_out_at.isnot(None))
+        .group_by(Attendance.user_id)
+        .subquery()
+    )
+    ranked = (
+        select(
+            User.id, User.name, per_user.c.hours,
+            func.rank().over(order_by=per_user.c.hours.desc()).label("rank")
+        )
+        .join(per_user, per_user.c.user_id == User.id)
         .where(User.role == "staff")
-        .where(func.date(Attendance.check_in_at) == today)
+        .subquery()
     )
-    checked_in_count = checked_in.scalar_one()
-
-    not_checked_in_count = total - checked_in_count
-
-    # 2. Reports (today only)
-    submitted_reports = await db.execute(
-        select(func.count(DailyReport.id))
-        .where(func.date(DailyReport.date) == today)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ranked).where(ranked.c.rank <= TOP_N).order_by(ranked.c.rank, ranked.c.id)
+        )
+        return [
+            {"user_id": r.id, "name": r.name, "hours": round(float(r.hours or 0), 2), "rank": r.rank}
+            for r in result
+        ]
+
+
+async def _dashboard_top_performers(month_start: datetime) -> list:
+    # Staff ranked by average rating of tasks completed this month
+    per_user = (
+        select(
+            Task.assigned_to_id.label("user_id"),
+            func.avg(Task.rating).label("average_rating"),
+            func.count(Task.id).label("rated_tasks"),
+        )
+        .where(Task.completed_at >= month_start)
+        .where(Task.rating.isnot(None))
+        .group_by(Task.assigned_to_id)
+        .subquery()
     )
-    submitted = submitted_reports.scalar_one()
-
-    pending = not_checked_in_count  # staff who haven’t submitted report yet
-    missed = 0  # For simplicity; calculate properly in Part 2
-
-    # 3. Tasks
-    total_tasks = await db.execute(select(func.count(Task.id)))
-    completed_tasks = await db.execute(
-        select(func.count(Task.id)).where(Task.status == "completed")
+    ranked = (
+        select(
+            User.id, User.name, per_user.c.average_rating, per_user.c.rated_tasks,
+            func.rank().over(
+                order_by=(per_user.c.average_rating.desc(), per_user.c.rated_tasks.desc())
+            ).label("rank")
+        )
+        .join(per_user, per_user.c.user_id == User.id)
+        .where(User.role == "staff")
+        .subquery()
     )
-    overdue_tasks = await db.execute(
-        select(func.count(Task.id))
-        .where(Task.status != "completed")
-        .where(Task.deadline < now)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ranked).where(ranked.c.rank <= TOP_N).order_by(ranked.c.rank, ranked.c.id)
+        )
+        return [
+            {
+                "user_id": r.id,
+                "name": r.name,
+                "average_rating": round(float(r.average_rating), 2),
+                "rated_tasks": r.rated_tasks,
+                "rank": r.rank,
+            }
+            for r in result
+        ]
+
+
+async def _compute_dashboard(today: date) -> dict:
+    month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    # Independent sections run concurrently, each on its own pooled session
+    counts, top_workers, top_performers = await asyncio.gather(
+        _dashboard_counts(today),
+        _dashboard_top_workers(month_start),
+        _dashboard_top_performers(month_start),
     )
 
-    # 4. Top Workers (by hours this month — simplified)
-    top_workers = []
-
-    # 5. Top Performers (by task rating — simplified)
-    top_performers = []
+    total = counts["total_staff"]
+    checked_in_count = counts["checked_in"]
+    not_checked_in_count = total - checked_in_count
 
     return {
         "staff": {
@@ -97,20 +171,31 @@ async def admin_dashboard(
             "not_checked_in_today": not_checked_in_count
         },
         "reports": {
-            "submitted": submitted,
-            "pending": pending,
-            "missed": missed
+            "submitted": counts["reports_submitted"],
+            "pending": not_checked_in_count,  # staff who haven’t submitted report yet
+            "missed": 0  # For simplicity; calculate properly in Part 2
         },
         "tasks": {
-            "total": total_tasks.scalar_one(),
-            "completed": completed_tasks.scalar_one(),
-            "overdue": overdue_tasks.scalar_one()
+            "total": counts["total_tasks"],
+            "completed": counts["completed_tasks"],
         },
         "top_workers": top_workers,
         "top_performers": top_performers
     }
 
 
+@router.get("/dashboard")
+async def admin_dashboard(
+    admin = Depends(get_current_admin)
+):
+    today = date.today()
+    dashboard = await dashboard_cache.get_or_compute(today, lambda: _compute_dashboard(today))
+
+    # Overdue comes from the deadline scheduler's live counter, so it is never stale
+    tasks = {**dashboard["tasks"], "overdue": deadline_scheduler.overdue_count}
+    return {**dashboard, "tasks": tasks}
+
+
 
 @router.get("/reports/status", response_model=AdminReportStatusResponse)
 async def admin_report_status(
@@ -202,8 +287,180 @@ async def admin_create_task(
     db.add(task)
     await db.commit()
     await db.refresh(task)
+    deadline_scheduler.schedule(task.id, task.deadline, task.assigned_to_id)
+    await notify_task_assigned(task.id, task.title, task.assigned_to_id, task.creator_id, task.deadline)
     return task
 
+def _bulk_response(results: List[AdminBulkItemResult]) -> AdminBulkResponse:
+    failed = sum(1 for r in results if r.status == "error")
+    return AdminBulkResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
+# Bulk routes are declared before /tasks/{task_id}/... so "bulk" is never parsed as a task id
+@router.post("/tasks/bulk", response_model=AdminBulkResponse)
+async def admin_bulk_create_tasks(
+    task_in: AdminBulkTaskCreate,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Assign one task template to many staff in a single transaction.
+    Invalid staff IDs are reported per item; the valid ones are still created.
+    """
+    requested_ids = list(dict.fromkeys(task_in.assigned_to_ids))  # de-dupe, keep order
+
+    # Validate every recipient with one IN query
+    staff_result = await db.execute(
+        select(User.id)
+        .where(User.id.in_(requested_ids))
+        .where(User.role == "staff")
+    )
+    staff_ids = set(staff_result.scalars().all())
+
+    rater_id = task_in.rater_id or admin.id
+    rows = [
+        {
+            "title": task_in.title,
+            "description": task_in.description,
+            "creator_id": admin.id,
+            "assigned_to_id": user_id,
+            "rater_id": rater_id,
+            "deadline": task_in.deadline,
+            "status": "pending",
+        }
+        for user_id in requested_ids
+        if user_id in staff_ids
+    ]
+
+    created = {}
+    if rows:
+        # Multi-row INSERT ... RETURNING (batched by SQLAlchemy's insertmanyvalues)
+        inserted = await db.execute(
+            insert(Task).returning(Task.id, Task.assigned_to_id),
+            rows
+        )
+        created = {row.assigned_to_id: row.id for row in inserted}
+        await db.commit()
+
+        for user_id, task_id in created.items():
+            deadline_scheduler.schedule(task_id, task_in.deadline, user_id)
+        await notify_tasks_assigned(
+            [(task_id, user_id) for user_id, task_id in created.items()],
+            task_in.title, admin.id, task_in.deadline
+        )
+
+    results = [
+        AdminBulkItemResult(id=user_id, status="created", task_id=created[user_id])
+        if user_id in created
+        else AdminBulkItemResult(id=user_id, status="error", detail="Assigned user not found or not staff")
+        for user_id in requested_ids
+    ]
+    return _bulk_response(results)
+
+@router.post("/tasks/bulk/rate", response_model=AdminBulkResponse)
+async def admin_bulk_rate_tasks(
+    rating_in: AdminBulkTaskRate,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Rate many completed tasks in a single transaction.
+    """
+    ratings = {item.task_id: item.rating for item in rating_in.items}  # last rating wins
+
+    tasks = await db.execute(
+        select(Task.id, Task.status, Task.assigned_to_id, Task.completed_at, Task.rating)
+        .where(Task.id.in_(list(ratings)))
+        .order_by(Task.id)
+        .with_for_update()  # rating deltas depend on the old rating; lock in id order
+    )
+    task_rows = {row.id: row for row in tasks}
+
+    results = []
+    updates = []
+    deltas = []
+    for task_id, rating in ratings.items():
+        row = task_rows.get(task_id)
+        if row is None:
+            results.append(AdminBulkItemResult(id=task_id, status="error", detail="Task not found"))
+        elif row.status != "completed":
+            results.append(AdminBulkItemResult(id=task_id, status="error", detail="Task must be completed before rating"))
+        else:
+            updates.append({"id": task_id, "rating": rating})
+            deltas.append(rating_delta(row.assigned_to_id, row.completed_at, row.rating, rating))
+            results.append(AdminBulkItemResult(id=task_id, status="rated", task_id=task_id))
+
+    if updates:
+        # ORM bulk UPDATE by primary key → one executemany
+        await db.execute(update(Task), updates)
+        await apply_counter_deltas(db, deltas)
+        await db.commit()
+
+    return _bulk_response(results)
+
+@router.post("/tasks/bulk/status", response_model=AdminBulkResponse)
+async def admin_bulk_update_task_status(
+    status_in: AdminBulkTaskStatus,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Change the status of many tasks with a single UPDATE.
+    """
+    task_ids = list(dict.fromkeys(status_in.task_ids))
+
+    if status_in.status == "completed":
+        # Keep the original completion time for tasks that were already completed
+        completed_at = func.coalesce(Task.completed_at, datetime.now(timezone.utc))
+    else:
+        completed_at = None
+
+    # Previous completion times, so performance counters can follow tasks between months
+    before = await db.execute(
+        select(Task.id, Task.completed_at)
+        .where(Task.id.in_(task_ids))
+        .order_by(Task.id)
+        .with_for_update()
+    )
+    previous_completed_at = dict(before.all())
+
+    # Re-opened tasks whose deadline has passed stay overdue; the rest go back
+    # to the deadline scheduler
+    now = datetime.now(timezone.utc)
+    is_overdue = False if status_in.status == "completed" else Task.deadline <= now
+    updated = await db.execute(
+        update(Task)
+        .where(Task.id.in_(task_ids))
+        .values(status=status_in.status, completed_at=completed_at, is_overdue=is_overdue)
+        .returning(Task.id, Task.deadline, Task.assigned_to_id, Task.rating, Task.completed_at)
+        .execution_options(synchronize_session=False)
+    )
+    updated_rows = updated.all()
+    updated_ids = {row.id for row in updated_rows}
+
+    deltas = []
+    for row in updated_rows:
+        deltas.extend(completion_deltas(
+            row.assigned_to_id, row.rating, previous_completed_at.get(row.id), row.completed_at
+        ))
+    await apply_counter_deltas(db, deltas)
+    await db.commit()
+
+    for row in updated_rows:
+        if status_in.status == "completed":
+            deadline_scheduler.complete(row.id)
+        elif row.deadline <= now:
+            deadline_scheduler.mark_overdue(row.id)  # already overdue: no second task_overdue event
+        else:
+            deadline_scheduler.schedule(row.id, row.deadline, row.assigned_to_id)
+
+    results = [
+        AdminBulkItemResult(id=task_id, status="updated", task_id=task_id)
+        if task_id in updated_ids
+        else AdminBulkItemResult(id=task_id, status="error", detail="Task not found")
+        for task_id in task_ids
+    ]
+    return _bulk_response(results)
+
 @router.post("/tasks/{task_id}/rate", response_model=TaskResponse)
 async def admin_rate_task(
     task_id: int,
@@ -212,7 +469,7 @@ async def admin_rate_task(
     admin = Depends(get_current_admin)
 ):
     task = await db.execute(
-        select(Task).where(Task.id == task_id)
+        select(Task).where(Task.id == task_id).with_for_update()
     )
     task_obj = task.scalar_one_or_none()
     if not task_obj:
@@ -221,6 +478,9 @@ async def admin_rate_task(
     if task_obj.status != "completed":
         raise HTTPException(400, "Task must be completed before rating")
 
+    await apply_counter_deltas(db, [
+        rating_delta(task_obj.assigned_to_id, task_obj.completed_at, task_obj.rating, rating_in.rating)
+    ])
     task_obj.rating = rating_in.rating
     db.add(task_obj)
     await db.commit()
@@ -240,13 +500,7 @@ async def admin_list_tasks(
     if filters.status:
         query = query.where(Task.status == filters.status)
     if filters.overdue is not None:
-        now = datetime.now(timezone.utc)
-        if filters.overdue:
-            query = query.where(Task.status != "completed").where(Task.deadline < now)
-        else:
-            query = query.where(
-                (Task.status == "completed") | (Task.deadline >= now)
-            )
+        query = query.where(Task.is_overdue.is_(filters.overdue))
     if filters.date_from:
         query = query.where(Task.created_at >= filters.date_from)
     if filters.date_to:
@@ -260,12 +514,101 @@ async def admin_list_tasks(
 
 
 
+PROFILE_SECTIONS = ("attendance", "reports", "assigned_tasks", "created_tasks", "goals")
+
+
+async def _profile_hours(user_id: int, month_start: datetime) -> float:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(func.coalesce(func.sum(
+                func.extract("epoch", Attendance.check_out_at - Attendance.check_in_at)
+            ), 0))
+            .where(Attendance.user_id == user_id)
+            .where(Attendance.check_in_at >= month_start)
+            .where(Attendance.check_out_at.isnot(None))
+        )
+        return round(float(result.scalar_one()) / 3600, 2)
+
+
+async def _profile_rows(query) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(query)
+        return result.scalars().all()
+
+
+async def _profile_goals(user_id: int, limit: int) -> List[GoalDetailResponse]:
+    async with AsyncSessionLocal() as db:
+        goals_result = await db.execute(
+            select(Goal)
+            .where(Goal.user_id == user_id)
+            .order_by(Goal.target_date)
+            .limit(limit)
+        )
+        goals = goals_result.scalars().all()
+        if not goals:
+            return []
+
+        # The latest `limit` updates of each goal on the page, in one query
+        ranked = (
+            select(
+                GoalUpdate.id,
+                func.row_number().over(
+                    partition_by=GoalUpdate.goal_id,
+                    order_by=(GoalUpdate.created_at.desc(), GoalUpdate.id.desc()),
+                ).label("position"),
+            )
+            .where(GoalUpdate.goal_id.in_([g.id for g in goals]))
+            .subquery()
+        )
+        updates_result = await db.execute(
+            select(GoalUpdate)
+            .join(ranked, ranked.c.id == GoalUpdate.id)
+            .where(ranked.c.position <= limit)
+            .order_by(GoalUpdate.goal_id, GoalUpdate.created_at, GoalUpdate.id)
+        )
+        updates_by_goal = {}
+        for u in updates_result.scalars():
+            updates_by_goal.setdefault(u.goal_id, []).append(u)
+
+    today = date.today()
+    return [
+        GoalDetailResponse(
+            id=goal.id,
+            title=goal.title,
+            description=goal.description,
+            frequency=goal.frequency,
+            priority=goal.priority,
+            target_date=goal.target_date,
+            created_at=goal.created_at,
+            latest_progress=goal.latest_progress,
+            status=get_goal_status(goal, goal.latest_progress, today),
+            updates=[GoalUpdateResponse.model_validate(u) for u in updates_by_goal.get(goal.id, [])]
+        )
+        for goal in goals
+    ]
+
+
 @router.get("/staff/{user_id}", response_model=StaffProfileResponse)
 async def admin_get_staff_profile(
     user_id: int,
+    include: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
     admin = Depends(get_current_admin)
 ):
+    """
+    Staff profile. `include` is a comma-separated subset of
+    attendance, reports, assigned_tasks, created_tasks, goals (default: all);
+    `limit` caps each list section and the updates shown per goal (the latest
+    ones). Sections load concurrently on separate sessions.
+    """
+    sections = PROFILE_SECTIONS
+    if include:
+        sections = tuple(s.strip() for s in include.split(",") if s.strip())
+        unknown = set(sections) - set(PROFILE_SECTIONS)
+        if unknown:
+            raise HTTPException(400, f"Unknown profile section: {sorted(unknown)[0]}")
+
     # 1. Get user
     user = await db.execute(
         select(User).where(User.id == user_id, User.role == "staff")
@@ -274,85 +617,196 @@ async def admin_get_staff_profile(
     if not staff:
         raise HTTPException(404, "Staff not found")
 
-    # 2. Attendance: total hours this month
     now = datetime.now(timezone.utc)
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    attendance_records = await db.execute(
-        select(Attendance)
-        .where(Attendance.user_id == user_id)
-        .where(Attendance.check_in_at >= month_start)
-        .where(Attendance.check_out_at.isnot(None))
+    loaders = {
+        # Total hours this month, summed in SQL
+        "attendance": lambda: _profile_hours(user_id, month_start),
+        "reports": lambda: _profile_rows(
+            select(DailyReport)
+            .where(DailyReport.user_id == user_id)
+            .order_by(DailyReport.date.desc())
+            .limit(limit)
+        ),
+        "assigned_tasks": lambda: _profile_rows(
+            select(Task)
+            .where(Task.assigned_to_id == user_id)
+            .order_by(Task.deadline)
+            .limit(limit)
+        ),
+        "created_tasks": lambda: _profile_rows(
+            select(Task)
+            .where(Task.creator_id == user_id)
+            .order_by(Task.created_at.desc())
+            .limit(limit)
+        ),
+        "goals": lambda: _profile_goals(user_id, limit),
+    }
+    requested = list(dict.fromkeys(sections))
+    loaded = dict(zip(requested, await asyncio.gather(*(loaders[s]() for s in requested))))
+
+    return StaffProfileResponse(
+        id=staff.id,
+        name=staff.name,
+        email=staff.email,
+        role=staff.role,
+        total_working_hours_this_month=loaded.get("attendance"),
+        reports=loaded.get("reports", []),
+        assigned_tasks=loaded.get("assigned_tasks", []),
+        created_tasks=loaded.get("created_tasks", []),
+        goals=loaded.get("goals", []),
+        achievements=[]
     )
-    total_seconds = 0
-    for rec in attendance_records.scalars():
-        if rec.check_out_at:
-            total_seconds += (rec.check_out_at - rec.check_in_at).total_seconds()
-    total_hours = round(total_seconds / 3600, 2)
 
-    # 3. Reports (all)
-    reports = await db.execute(
-        select(DailyReport)
-        .where(DailyReport.user_id == user_id)
-        .order_by(DailyReport.date.desc())
+
+
+# Org-wide goal aggregates, shared across admins for a minute
+goals_overview_cache = TTLCache(ttl=60)
+
+
+def _goal_status_counts(status):
+    return (
+        func.count(Goal.id).label("total"),
+        func.count(Goal.id).filter(status == "achieved").label("achieved"),
+        func.count(Goal.id).filter(status == "ongoing").label("ongoing"),
+        func.count(Goal.id).filter(status == "overdue").label("overdue"),
+        func.avg(Goal.latest_progress).label("average_progress"),
     )
 
-    # 4. Tasks
-    assigned_tasks = await db.execute(
-        select(Task)
-        .where(Task.assigned_to_id == user_id)
-        .order_by(Task.deadline)
+
+def _status_counts_row(row) -> dict:
+    return {
+        "total": row.total,
+        "achieved": row.achieved,
+        "ongoing": row.ongoing,
+        "overdue": row.overdue,
+        "average_progress": round(float(row.average_progress or 0), 2),
+    }
+
+
+async def _compute_goals_overview(
+    db: AsyncSession, today: date, page: int, page_size: int,
+    risk_days: int, risk_progress: int, risk_page: int, risk_page_size: int
+) -> dict:
+    status = goal_status_expr(today)
+
+    # Per priority (a handful of rows) — also gives the org-wide totals
+    by_priority_result = await db.execute(
+        select(Goal.priority, *_goal_status_counts(status))
+        .join(User, User.id == Goal.user_id)
+        .where(User.role == "staff")
+        .group_by(Goal.priority)
+        .order_by(Goal.priority)
+    )
+    by_priority = {row.priority: _status_counts_row(row) for row in by_priority_result}
+
+    # Per staff member, paginated
+    staff_total = await db.execute(
+        select(func.count(func.distinct(Goal.user_id)))
+        .join(User, User.id == Goal.user_id)
+        .where(User.role == "staff")
     )
-    created_tasks = await db.execute(
-        select(Task)
-        .where(Task.creator_id == user_id)
-        .order_by(Task.created_at.desc())
+    by_staff_result = await db.execute(
+        select(User.id, User.name, *_goal_status_counts(status))
+        .join(Goal, Goal.user_id == User.id)
+        .where(User.role == "staff")
+        .group_by(User.id, User.name)
+        .order_by(User.name, User.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
     )
 
-    # 5. Goals
-    goals = await db.execute(
-        select(Goal)
-        .where(Goal.user_id == user_id)
-        .order_by(Goal.target_date)
+    # At risk: due within risk_days and still below risk_progress, paginated on its own
+    at_risk_filter = (
+        Goal.target_date >= today,
+        Goal.target_date <= today + timedelta(days=risk_days),
+        Goal.latest_progress < risk_progress,
+        User.role == "staff",
     )
-    goal_list = []
-    today = date.today()
-    for goal in goals.scalars():
-        updates_result = await db.execute(
-            select(GoalUpdate)
-            .where(GoalUpdate.goal_id == goal.id)
-            .order_by(GoalUpdate.created_at)
+    at_risk_total = await db.execute(
+        select(func.count(Goal.id))
+        .join(User, User.id == Goal.user_id)
+        .where(*at_risk_filter)
+    )
+    at_risk_result = await db.execute(
+        select(
+            Goal.id, Goal.title, Goal.priority, Goal.target_date, Goal.latest_progress,
+            Goal.last_update_at, Goal.user_id, User.name
         )
-        update_list = updates_result.scalars().all()
+        .join(User, User.id == Goal.user_id)
+        .where(*at_risk_filter)
+        .order_by(Goal.target_date, Goal.latest_progress, Goal.id)
+        .offset((risk_page - 1) * risk_page_size)
+        .limit(risk_page_size)
+    )
 
-        latest_progress = update_list[-1].progress_percent if update_list else 0
-        status = get_goal_status(goal, latest_progress, today)
+    totals = {"total": 0, "achieved": 0, "ongoing": 0, "overdue": 0}
+    progress_sum = 0.0
+    for counts in by_priority.values():
+        for k in totals:
+            totals[k] += counts[k]
+        progress_sum += counts["average_progress"] * counts["total"]
+    totals["average_progress"] = round(progress_sum / totals["total"], 2) if totals["total"] else 0.0
 
-        goal_with_updates = GoalDetailResponse(
-            id=goal.id,
-            title=goal.title,
-            description=goal.description,
-            frequency=goal.frequency,
-            priority=goal.priority,
-            target_date=goal.target_date,
-            created_at=goal.created_at,
-            latest_progress=latest_progress,
-            status=status,
-            updates=[GoalUpdateResponse.model_validate(u) for u in update_list]
-        )
-        goal_list.append(goal_with_updates)
+    return {
+        "date": today,
+        "page": page,
+        "page_size": page_size,
+        "totals": totals,
+        "by_priority": by_priority,
+        "staff": {
+            "total": staff_total.scalar_one(),
+            "items": [
+                {"user_id": row.id, "name": row.name, **_status_counts_row(row)}
+                for row in by_staff_result
+            ]
+        },
+        "at_risk": {
+            "total": at_risk_total.scalar_one(),
+            "page": risk_page,
+            "page_size": risk_page_size,
+            "days": risk_days,
+            "progress_below": risk_progress,
+            "items": [
+                {
+                    "goal_id": row.id,
+                    "title": row.title,
+                    "priority": row.priority,
+                    "target_date": row.target_date,
+                    "latest_progress": row.latest_progress,
+                    "last_update_at": row.last_update_at,
+                    "user_id": row.user_id,
+                    "name": row.name,
+                }
+                for row in at_risk_result
+            ]
+        }
+    }
 
-    return StaffProfileResponse(
-        id=staff.id,
-        name=staff.name,
-        email=staff.email,
-        # date_of_birth=staff.date_of_birth,  # ← REMOVE THIS LINE
-        role=staff.role,
-        total_working_hours_this_month=total_hours,
-        reports=reports.scalars().all(),
-        assigned_tasks=assigned_tasks.scalars().all(),
-        created_tasks=created_tasks.scalars().all(),
-        goals=goal_list,
-        achievements=[]
+
+@router.get("/goals/overview")
+async def admin_goals_overview(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    risk_days: int = Query(14, ge=1, le=365),
+    risk_progress: int = Query(50, ge=1, le=100),
+    risk_page: int = Query(1, ge=1),
+    risk_page_size: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Org-wide goals: achieved / ongoing / overdue counts and average progress
+    per staff member (paginated by page/page_size) and per priority, plus goals
+    at risk (target date within risk_days, progress below risk_progress;
+    paginated separately by risk_page/risk_page_size).
+    """
+    today = date.today()
+    key = (today, page, page_size, risk_days, risk_progress, risk_page, risk_page_size)
+    return await goals_overview_cache.get_or_compute(
+        key, lambda: _compute_goals_overview(
+            db, today, page, page_size, risk_days, risk_progress, risk_page, risk_page_size
+        )
     )
 
 
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, insert, update, func, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from app.database import get_db
 from app.core.auth import get_current_admin
-from app.models.message import Announcement, Conversation, ConversationParticipant, Message, MessageReply
+from app.models.message import (
+    Announcement, Conversation, ConversationParticipant, Message, MessageRecipient, TargetedMessage
+)
+from app.routers.message import recipient_ids_expr, targeted_message_page
 from app.models.user import User
-from typing import List
+from app.services.announcements import invalidate_feed
+from app.services.archive import archive_conversation, rehydrate_conversation
+from app.services.chat_hub import chat_hub
+from app.services.notifications import notification_hub
+from app.services.membership import get_membership, invalidate_membership
+from app.utils.pagination import keyset_page, resolve_cursor, set_cursor_headers
+from typing import Iterable, List, Optional, Set
 from datetime import datetime, timezone
 from app.schemas.message import (
     AnnouncementCreate, AnnouncementResponse, ConversationCreate, ConversationResponse,
-    MessageCreate, MessageResponse,
-    MessageReplyCreate, MessageReplyResponse
+    ConversationParticipantsAdd, ConversationParticipantsAddResponse,
+    MessageResponse, TargetedMessageCreate, TargetedMessageResponse
 )
 
 router = APIRouter(prefix="/admin/messages", tags=["admin-messages"])
@@ -30,55 +40,107 @@ async def create_announcement(
     db.add(announcement)
     await db.commit()
     await db.refresh(announcement)
+    invalidate_feed()
+    # Title only: clients pull the body from the (cached) feed, and the event stays small
+    await notification_hub.publish("announcement", {
+        "id": announcement.id,
+        "title": announcement.title,
+        "admin_id": announcement.admin_id,
+        "created_at": announcement.created_at.isoformat(),
+    })
     return announcement
 
 # 2. Send Targeted Message
-@router.post("", response_model=MessageResponse)
+@router.post("", response_model=TargetedMessageResponse)
 async def send_message(
-    message_in: MessageCreate,
+    message_in: TargetedMessageCreate,
     db: AsyncSession = Depends(get_db),
     admin = Depends(get_current_admin)
 ):
-    # Validate all recipients are staff
-    for user_id in message_in.recipient_ids:
-        user = await db.execute(
-            select(User).where(User.id == user_id, User.role == "staff")
+    # Validate all recipients are staff (one IN query)
+    recipient_ids = sorted(await _validate_staff_ids(db, message_in.recipient_ids))
+    if not recipient_ids:
+        raise HTTPException(400, "At least one recipient is required")
+
+    result = await db.execute(
+        insert(TargetedMessage)
+        .values(admin_id=admin.id, title=message_in.title, content=message_in.content)
+        .returning(TargetedMessage.id, TargetedMessage.created_at)
+    )
+    message_id, created_at = result.one()
+
+    # Fan out with one INSERT ... SELECT unnest(:ids), however long the list
+    await db.execute(
+        insert(MessageRecipient).from_select(
+            ["message_id", "user_id"],
+            select(literal(message_id), func.unnest(literal(recipient_ids, ARRAY(Integer))))
         )
-        if not user.scalar_one_or_none():
-            raise HTTPException(400, f"Invalid staff user ID: {user_id}")
+    )
+    await db.commit()
 
-    message = Message(
+    await notification_hub.publish("targeted_message", {
+        "id": message_id,
+        "title": message_in.title,
+        "admin_id": admin.id,
+        "created_at": created_at.isoformat(),
+    }, user_ids=recipient_ids)
+    return TargetedMessageResponse(
+        id=message_id,
         admin_id=admin.id,
-        recipient_ids=message_in.recipient_ids,
+        recipient_ids=recipient_ids,
         title=message_in.title,
-        content=message_in.content
-    )
-    db.add(message)
-    await db.commit()
-    await db.refresh(message)
-    return MessageResponse(
-        id=message.id,
-        admin_id=message.admin_id,
-        recipient_ids=message.recipient_ids,
-        title=message.title,
-        content=message.content,
-        created_at=message.created_at,
+        content=message_in.content,
+        created_at=created_at,
         replies=[]  # No replies yet
     )
 
+@router.get("/targeted", response_model=List[TargetedMessageResponse])
+async def get_sent_messages(
+    response: Response,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Targeted messages this admin sent, newest first, with recipients and all
+    replies (including private ones).
+    """
+    query = (
+        select(TargetedMessage, recipient_ids_expr().label("recipient_ids"))
+        .where(TargetedMessage.admin_id == admin.id)
+    )
+    return await targeted_message_page(db, query, response, before, after, limit)
+
 @router.get("", response_model=List[MessageResponse])
 async def get_messages(
+    response: Response,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     db: AsyncSession = Depends(get_db),
     admin = Depends(get_current_admin)
 ):
+    """
+    One page of messages across the admin's conversations, newest first.
+    Page with the X-Before-Cursor / X-After-Cursor response headers.
+    """
+    direction, position = resolve_cursor(before, after)
+
     # Join Message → Conversation to get admin_id
-    result = await db.execute(
+    query = (
         select(Message)
         .join(Conversation, Conversation.id == Message.conversation_id)
         .where(Conversation.admin_id == admin.id)
-        .order_by(Message.created_at.desc())
     )
-    messages = result.scalars().all()
+    query = keyset_page(query, Message.created_at, Message.id, direction, position, limit)
+    messages = (await db.execute(query)).scalars().all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if direction == "after":
+        messages.reverse()
+    set_cursor_headers(response, messages, has_more)
     
     # Convert to response model
     return [
@@ -93,41 +155,99 @@ async def get_messages(
     ]
 
 
+async def _validate_staff_ids(db: AsyncSession, user_ids: Iterable[int]) -> Set[int]:
+    """All ids must be staff users; checked with one IN query, before anything is written."""
+    wanted = set(user_ids)
+    if not wanted:
+        return wanted
+    result = await db.execute(select(User.id).where(User.id.in_(wanted), User.role == "staff"))
+    invalid = wanted - set(result.scalars().all())
+    if invalid:
+        raise HTTPException(400, f"Invalid staff user: {', '.join(map(str, sorted(invalid)))}")
+    return wanted
+
+
+async def _add_participants(db: AsyncSession, conv_id: int, user_ids: Set[int]) -> List[int]:
+    """
+    Add (or re-activate previously removed) participants with one multi-row
+    upsert. Returns the ids that were actually added; active ones are left as is.
+    Does not commit.
+    """
+    if not user_ids:
+        return []
+    stmt = pg_insert(ConversationParticipant).values(
+        [{"conversation_id": conv_id, "user_id": user_id} for user_id in sorted(user_ids)]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_conversation_user",
+        set_={"removed_at": None, "removed_by": None},
+        where=ConversationParticipant.removed_at.is_not(None),
+    ).returning(ConversationParticipant.user_id)
+    result = await db.execute(stmt)
+    return sorted(result.scalars().all())
+
+
+async def _participants_changed(conv_id: int, user_ids: Iterable[int]) -> None:
+    user_ids = list(user_ids)
+    for user_id in user_ids:
+        invalidate_membership(conv_id, user_id)
+    await chat_hub.join_many(conv_id, user_ids)
+
+
 @router.post("/conversations", response_model=ConversationResponse)
 async def create_conversation(
     conv_in: ConversationCreate,
     db: AsyncSession = Depends(get_db),
     admin = Depends(get_current_admin)
 ):
-    # Create conversation
-    conv = Conversation(admin_id=admin.id, title=conv_in.title)
-    db.add(conv)
-    await db.commit()
-    await db.refresh(conv)
-
-    # Add admin + initial participants
-    participant_ids = set(conv_in.initial_participant_ids + [admin.id])
-    for user_id in participant_ids:
-        # Validate staff user
-        user = await db.execute(
-            select(User).where(User.id == user_id, User.role == "staff")
-        )
-        if not user.scalar_one_or_none() and user_id != admin.id:
-            raise HTTPException(400, f"Invalid staff user: {user_id}")
-        
-        participant = ConversationParticipant(
-            conversation_id=conv.id,
-            user_id=user_id
-        )
-        db.add(participant)
-    
+    # Validate every staff participant up front so a bad id leaves nothing behind
+    staff_ids = await _validate_staff_ids(db, set(conv_in.initial_participant_ids) - {admin.id})
+
+    # Conversation + admin + initial participants in one transaction
+    result = await db.execute(
+        insert(Conversation)
+        .values(admin_id=admin.id, title=conv_in.title)
+        .returning(Conversation.id, Conversation.created_at)
+    )
+    conv_id, created_at = result.one()
+    participant_ids = staff_ids | {admin.id}
+    await _add_participants(db, conv_id, participant_ids)
     await db.commit()
+
+    await _participants_changed(conv_id, participant_ids)
     return ConversationResponse(
-        id=conv.id,
-        title=conv.title,
-        admin_id=conv.admin_id,
-        participants=list(participant_ids),
-        created_at=conv.created_at
+        id=conv_id,
+        title=conv_in.title,
+        admin_id=admin.id,
+        participants=sorted(participant_ids),
+        created_at=created_at
+    )
+
+
+@router.post("/conversations/{conv_id}/participants", response_model=ConversationParticipantsAddResponse)
+async def add_participants(
+    conv_id: int,
+    participants_in: ConversationParticipantsAdd,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Admin adds many staff members to a conversation at once. Previously
+    removed members are re-activated; members already in the chat are skipped.
+    """
+    admin_part = await get_membership(db, conv_id, admin.id)
+    if not admin_part or not admin_part.active:
+        raise HTTPException(403, "Admin not in this conversation")
+
+    user_ids = await _validate_staff_ids(db, participants_in.user_ids)
+    added = await _add_participants(db, conv_id, user_ids)
+    await db.commit()
+
+    await _participants_changed(conv_id, added)
+    return ConversationParticipantsAddResponse(
+        conversation_id=conv_id,
+        added=added,
+        already_active=sorted(user_ids - set(added))
     )
 
 
@@ -145,19 +265,14 @@ async def add_participant(
         raise HTTPException(400, "Invalid staff user")
 
     # Verify current user is in conversation
-    participant = await db.execute(
-        select(ConversationParticipant)
-        .where(ConversationParticipant.conversation_id == conv_id)
-        .where(ConversationParticipant.user_id == current_user.id)
-        .where(ConversationParticipant.removed_at.is_(None))
-    )
-    if not participant.scalar_one_or_none():
+    participant = await get_membership(db, conv_id, current_user.id)
+    if not participant or not participant.active:
         raise HTTPException(403, "Not a participant in this conversation")
 
-    # Add participant (idempotent)
-    new_part = ConversationParticipant(conversation_id=conv_id, user_id=user_id)
-    db.add(new_part)
+    # Add participant (idempotent; re-activates a removed participant)
+    added = await _add_participants(db, conv_id, {user_id})
     await db.commit()
+    await _participants_changed(conv_id, added)
     return {"message": "Participant added"}
 
 @router.post("/conversations/{conv_id}/participants/{user_id}/remove")
@@ -174,13 +289,8 @@ async def remove_participant(
         raise HTTPException(403, "Cannot remove admin")
 
     # Verify current user is in conversation
-    participant = await db.execute(
-        select(ConversationParticipant)
-        .where(ConversationParticipant.conversation_id == conv_id)
-        .where(ConversationParticipant.user_id == current_user.id)
-        .where(ConversationParticipant.removed_at.is_(None))
-    )
-    if not participant.scalar_one_or_none():
+    participant = await get_membership(db, conv_id, current_user.id)
+    if not participant or not participant.active:
         raise HTTPException(403, "Not a participant")
 
     # Mark as removed
@@ -193,6 +303,8 @@ async def remove_participant(
     )
     await db.execute(stmt)
     await db.commit()
+    invalidate_membership(conv_id, user_id)
+    await chat_hub.leave(conv_id, user_id)
     return {"message": "Participant removed"}
 
 
@@ -215,19 +327,14 @@ async def add_participant(
         raise HTTPException(400, "Invalid staff user")
 
     # Verify admin is in the conversation
-    admin_part = await db.execute(
-        select(ConversationParticipant)
-        .where(ConversationParticipant.conversation_id == conv_id)
-        .where(ConversationParticipant.user_id == admin.id)
-        .where(ConversationParticipant.removed_at.is_(None))
-    )
-    if not admin_part.scalar_one_or_none():
+    admin_part = await get_membership(db, conv_id, admin.id)
+    if not admin_part or not admin_part.active:
         raise HTTPException(403, "Admin not in this conversation")
 
-    # Add participant (idempotent)
-    new_part = ConversationParticipant(conversation_id=conv_id, user_id=user_id)
-    db.add(new_part)
+    # Add participant (idempotent; re-activates a removed participant)
+    added = await _add_participants(db, conv_id, {user_id})
     await db.commit()
+    await _participants_changed(conv_id, added)
     return {"message": "Participant added"}
 
 
@@ -252,13 +359,8 @@ async def remove_participant(
         raise HTTPException(403, "Cannot remove admin")
 
     # Verify admin is in the conversation
-    admin_part = await db.execute(
-        select(ConversationParticipant)
-        .where(ConversationParticipant.conversation_id == conv_id)
-        .where(ConversationParticipant.user_id == admin.id)
-        .where(ConversationParticipant.removed_at.is_(None))
-    )
-    if not admin_part.scalar_one_or_none():
+    admin_part = await get_membership(db, conv_id, admin.id)
+    if not admin_part or not admin_part.active:
         raise HTTPException(403, "Admin not in this conversation")
 
     # Mark as removed
@@ -277,4 +379,38 @@ async def remove_participant(
         raise HTTPException(400, "User not an active participant")
     
     await db.commit()
-    return {"message": "Participant removed"}
\ No newline at end of file
+    invalidate_membership(conv_id, user_id)
+    await chat_hub.leave(conv_id, user_id)
+    return {"message": "Participant removed"}
+
+
+@router.post("/conversations/{conv_id}/archive")
+async def archive_conversation_now(
+    conv_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """Mark a conversation inactive and move its messages to cold storage. History stays readable."""
+    admin_part = await get_membership(db, conv_id, admin.id)
+    if not admin_part or not admin_part.active:
+        raise HTTPException(403, "Admin not in this conversation")
+
+    await db.execute(update(Conversation).where(Conversation.id == conv_id).values(is_active=False))
+    archived = await archive_conversation(db, conv_id)  # commits both
+    return {"message": "Conversation archived", "archived_messages": archived}
+
+
+@router.post("/conversations/{conv_id}/reactivate")
+async def reactivate_conversation(
+    conv_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """Mark a conversation active again and rehydrate its archived messages into the hot table."""
+    admin_part = await get_membership(db, conv_id, admin.id)
+    if not admin_part or not admin_part.active:
+        raise HTTPException(403, "Admin not in this conversation")
+
+    await db.execute(update(Conversation).where(Conversation.id == conv_id).values(is_active=True))
+    restored = await rehydrate_conversation(db, conv_id)  # commits both
+    return {"message": "Conversation reactivated", "restored_messages": restored}
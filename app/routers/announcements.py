@@ -1,22 +1,79 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from app.database import get_db
 from app.models.message import Announcement
 from app.schemas.message import AnnouncementResponse
-from typing import List
+from app.services.announcements import get_feed
+from app.utils.pagination import decode_cursor, keyset_page, set_cursor_headers
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from typing import List, Optional
 
 router = APIRouter(prefix="/announcements", tags=["announcements"])
 
+
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:  # "-0000" parses naive; HTTP dates are always GMT
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
 @router.get("", response_model=List[AnnouncementResponse])
 async def get_announcements(
+    request: Request,
+    response: Response,
+    before: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Public endpoint: Get all announcements (no auth required)
+    Public endpoint: Get announcements, newest first (no auth required).
+    Served from an in-memory feed; send If-None-Match / If-Modified-Since to get
+    a 304 when nothing changed. Without ``limit`` every announcement is returned;
+    with it, pass X-Before-Cursor as ``before`` for older pages.
     """
-    result = await db.execute(
-        select(Announcement)
-        .order_by(Announcement.created_at.desc())
+    feed = await get_feed(db)
+    etag = feed.etag(limit, before)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if feed.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(feed.last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if _not_modified(request, etag, feed.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    position = decode_cursor(before) if before else None
+    rendered = feed.render(position, limit)
+    if rendered is not None:
+        items, body, has_more = rendered
+        response = Response(content=body, media_type="application/json", headers=headers)
+        set_cursor_headers(response, items, has_more)
+        return response
+
+    # Older than the in-memory window
+    response.headers.update(headers)
+    if limit is None:
+        query = select(Announcement).order_by(Announcement.created_at.desc(), Announcement.id.desc())
+        if position:
+            query = query.where(tuple_(Announcement.created_at, Announcement.id) < tuple_(*position))
+        rows = (await db.execute(query)).scalars().all()
+        set_cursor_headers(response, rows, False)
+        return rows
+
+    query = keyset_page(
+        select(Announcement), Announcement.created_at, Announcement.id,
+        "before" if position else None, position, limit
     )
-    return result.scalars().all()
\ No newline at end of file
+    rows = (await db.execute(query)).scalars().all()
+    set_cursor_headers(response, rows[:limit], len(rows) > limit)
+    return rows[:limit]
@@ -7,6 +7,7 @@ from app.core.auth import get_current_user
 from app.models.attendance import Attendance
 from app.schemas.attendance import AttendanceResponse, AttendanceStatusResponse, MonthlyAttendanceResponse, DailyAttendanceRecord
 from app.config import settings
+from app.services.counters import bump_counters
 from datetime import datetime, timezone, date, timedelta
 from calendar import monthrange
 
@@ -194,6 +195,7 @@ async def check_in(
         ip_address=client_ip
     )
     db.add(new_attendance)
+    await bump_counters(db, current_user.id, new_attendance.check_in_at, days_present=1)
     await db.commit()
     await db.refresh(new_attendance)
     return new_attendance
@@ -11,6 +11,7 @@ from app.core.security import create_access_token, create_refresh_token
 from app.core.auth import get_current_user
 from app.schemas.auth import ChangePasswordRequest
 from app.schemas.user import UserUpdate
+from app.services.birthdays import invalidate_birthdays
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -31,11 +32,14 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         email=user_in.email,
         name=user_in.name,  # ← Save name
-        hashed_password=hashed_pw
+        hashed_password=hashed_pw,
+        date_of_birth=user_in.date_of_birth
     )
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    if user.date_of_birth is not None:
+        invalidate_birthdays()
     return user
 
 
@@ -134,9 +138,14 @@ async def update_profile(
     if update_data.name is not None:
         current_user.name = update_data.name
 
+    if update_data.date_of_birth is not None:
+        current_user.date_of_birth = update_data.date_of_birth
+
     # Save changes
     db.add(current_user)
     await db.commit()
     await db.refresh(current_user)
+    # The birthday index carries names (or the email prefix) as well as dates
+    invalidate_birthdays()
 
     return current_user
\ No newline at end of file
@@ -1,62 +1,147 @@
 # app/routers/chat.py
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import select, insert, update, func, and_, or_, true
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.orm import aliased
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional, Tuple
 
-from app.database import get_db
-from app.core.auth import get_current_user
-from app.models.message import Conversation, ConversationParticipant, Message
-from app.schemas.message import ConversationResponse, MessageResponse, MessageCreate
+from app.database import get_db, AsyncSessionLocal
+from app.core.auth import get_current_user, get_user_from_token, stream_token
+from app.models.message import SEARCH_CONFIG, Conversation, ConversationParticipant, Message
+from app.schemas.message import (
+    ConversationResponse, ConversationReadResponse, MessageResponse, MessageCreate, MessageSearchResult
+)
+from app.services.archive import archived_page
+from app.services.chat_hub import chat_hub
+from app.services.membership import get_membership
+from app.utils.pagination import (
+    decode_rank_cursor, encode_rank_cursor, keyset_page, resolve_cursor, set_cursor_headers
+)
+
+MAX_PAGE_SIZE = 200
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+def _visible(message_table, participant):
+    """Messages a participant may see: everything, or up to their removal time."""
+    return or_(participant.removed_at.is_(None), message_table.created_at <= participant.removed_at)
+
+
 @router.get("/conversations", response_model=List[ConversationResponse])
 async def get_conversations(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
-    Get all conversations the current user is (or was) part of.
+    Get all conversations the current user is (or was) part of, most recently
+    active first, with active participants, the latest visible message and the
+    unread count, all from one statement.
     """
-    # Get all conversation IDs where user is/was a participant
-    participations = await db.execute(
-        select(ConversationParticipant.conversation_id)
-        .where(ConversationParticipant.user_id == current_user.id)
-    )
-    conv_ids = [row[0] for row in participations.fetchall()]
-    
-    if not conv_ids:
-        return []
+    me = aliased(ConversationParticipant)
+    member = aliased(ConversationParticipant)
+    last = aliased(Message)
 
-    # Fetch conversation details
-    conversations = await db.execute(
-        select(Conversation).where(Conversation.id.in_(conv_ids))
+    participants = (
+        select(func.array_agg(aggregate_order_by(member.user_id, member.user_id)))
+        .where(member.conversation_id == Conversation.id)
+        .where(member.removed_at.is_(None))
+        .scalar_subquery()
     )
-    
-    result = []
-    for conv in conversations.scalars():
-        # Get current active participants
-        active_participants = await db.execute(
-            select(ConversationParticipant.user_id)
-            .where(ConversationParticipant.conversation_id == conv.id)
-            .where(ConversationParticipant.removed_at.is_(None))
+    latest = (
+        select(last.id, last.sender_id, last.content, last.created_at)
+        .where(last.conversation_id == Conversation.id)
+        .where(_visible(last, me))
+        .order_by(last.created_at.desc(), last.id.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    unread = (
+        select(func.count(Message.id))
+        .where(Message.conversation_id == Conversation.id)
+        .where(Message.id > func.coalesce(me.last_read_message_id, 0))
+        .where(Message.sender_id != current_user.id)
+        .where(_visible(Message, me))
+        .scalar_subquery()
+    )
+
+    result = await db.execute(
+        select(
+            Conversation.id, Conversation.title, Conversation.admin_id, Conversation.created_at,
+            me.last_read_message_id,
+            participants.label("participants"),
+            unread.label("unread_count"),
+            latest.c.id.label("last_id"), latest.c.sender_id.label("last_sender_id"),
+            latest.c.content.label("last_content"), latest.c.created_at.label("last_created_at"),
         )
-        participant_ids = [p[0] for p in active_participants.fetchall()]
-        
-        result.append(
-            ConversationResponse(
-                id=conv.id,
-                title=conv.title,
-                admin_id=conv.admin_id,
-                participants=participant_ids,
-                created_at=conv.created_at
-            )
+        .join(me, and_(me.conversation_id == Conversation.id, me.user_id == current_user.id))
+        .outerjoin(latest, true())
+        .order_by(func.coalesce(latest.c.created_at, Conversation.created_at).desc(), Conversation.id.desc())
+    )
+
+    return [
+        ConversationResponse(
+            id=row.id,
+            title=row.title,
+            admin_id=row.admin_id,
+            participants=row.participants or [],
+            created_at=row.created_at,
+            last_message=MessageResponse(
+                id=row.last_id,
+                conversation_id=row.id,
+                sender_id=row.last_sender_id,
+                content=row.last_content,
+                created_at=row.last_created_at
+            ) if row.last_id is not None else None,
+            unread_count=row.unread_count,
+            last_read_message_id=row.last_read_message_id
         )
-    return result
+        for row in result
+    ]
+
+
+@router.post("/conversations/{conv_id}/read", response_model=ConversationReadResponse)
+async def mark_read(
+    conv_id: int,
+    message_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Move the caller's read marker up to ``message_id`` (default: the latest
+    message they can see). The marker never moves backwards.
+    """
+    participant = await get_membership(db, conv_id, current_user.id)
+    if not participant:
+        raise HTTPException(403, "Not a participant in this conversation")
+
+    query = select(func.max(Message.id)).where(Message.conversation_id == conv_id)
+    if participant.removed_at:
+        query = query.where(Message.created_at <= participant.removed_at)
+    if message_id is not None:
+        query = query.where(Message.id == message_id)
+    target = (await db.execute(query)).scalar()
+    if target is None:
+        if message_id is not None:
+            raise HTTPException(404, "Message not found in this conversation")
+        return ConversationReadResponse(conversation_id=conv_id, last_read_message_id=None)
+
+    result = await db.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.conversation_id == conv_id)
+        .where(ConversationParticipant.user_id == current_user.id)
+        .values(last_read_message_id=func.greatest(
+            func.coalesce(ConversationParticipant.last_read_message_id, 0), target
+        ))
+        .returning(ConversationParticipant.last_read_message_id)
+        .execution_options(synchronize_session=False)
+    )
+    last_read = result.scalar_one()
+    await db.commit()
+    return ConversationReadResponse(conversation_id=conv_id, last_read_message_id=last_read)
 
 
 @router.post("/conversations/{conv_id}/messages", response_model=MessageResponse)
@@ -71,43 +156,50 @@ async def send_message(
     Only active participants can send messages.
     """
     # Verify user is an active participant
-    participant = await db.execute(
-        select(ConversationParticipant)
-        .where(ConversationParticipant.conversation_id == conv_id)
-        .where(ConversationParticipant.user_id == current_user.id)
-        .where(ConversationParticipant.removed_at.is_(None))
-    )
-    if not participant.scalar_one_or_none():
+    membership = await get_membership(db, conv_id, current_user.id)
+    if not membership or not membership.active:
         raise HTTPException(403, "Not an active participant in this conversation")
 
-    message = Message(
+    result = await db.execute(
+        insert(Message)
+        .values(conversation_id=conv_id, sender_id=current_user.id, content=message_in.content)
+        .returning(Message.id, Message.created_at)
+    )
+    message_id, created_at = result.one()
+    await db.commit()
+
+    response = MessageResponse(
+        id=message_id,
         conversation_id=conv_id,
         sender_id=current_user.id,
-        content=message_in.content
+        content=message_in.content,
+        created_at=created_at
     )
-    db.add(message)
-    await db.commit()
-    await db.refresh(message)
-    return message
+    await chat_hub.publish(conv_id, message_event(response))
+    return response
 
 
 @router.get("/conversations/{conv_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
     conv_id: int,
+    response: Response,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
-    Get messages in a conversation.
+    Get one page of messages in a conversation, oldest first.
+    Without a cursor this is the latest page; pass X-Before-Cursor as ``before``
+    for older messages or X-After-Cursor as ``after`` for newer ones.
     If user was removed, only show messages up to removal time.
+    Archived history is read from cold storage once the hot table runs out.
     """
+    direction, position = resolve_cursor(before, after)
+
     # Verify user was ever a participant
-    participant_record = await db.execute(
-        select(ConversationParticipant)
-        .where(ConversationParticipant.conversation_id == conv_id)
-        .where(ConversationParticipant.user_id == current_user.id)
-    )
-    participant = participant_record.scalar_one_or_none()
+    participant = await get_membership(db, conv_id, current_user.id)
     if not participant:
         raise HTTPException(403, "Not a participant in this conversation")
 
@@ -118,6 +210,178 @@ async def get_messages(
     if participant.removed_at:
         query = query.where(Message.created_at <= participant.removed_at)
     
-    query = query.order_by(Message.created_at)
-    messages = await db.execute(query)
-    return messages.scalars().all()
\ No newline at end of file
+    query = keyset_page(query, Message.created_at, Message.id, direction, position, limit)
+    messages = (await db.execute(query)).scalars().all()
+
+    # Archived messages are older than every hot one: "after" pages start in the
+    # archive, other pages continue into it when the hot rows run out
+    if direction == "after":
+        archived = await archived_page(db, conv_id, direction, position, limit + 1, participant.removed_at)
+        messages = (archived + messages)[:limit + 1]
+    elif len(messages) <= limit:
+        boundary = (messages[-1].created_at, messages[-1].id) if messages else position
+        archived = await archived_page(
+            db, conv_id, "before" if boundary else None, boundary, limit + 1 - len(messages), participant.removed_at
+        )
+        messages = messages + archived
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if direction != "after":
+        messages.reverse()
+
+    set_cursor_headers(response, messages, has_more)
+    return messages
+
+
+# Highlight markers ts_headline wraps matches in; stripped from the content first,
+# then turned into offsets so no markup ever reaches clients
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    f'MaxFragments=1, MinWords=5, MaxWords=20, StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}"'
+)
+
+
+def _split_highlights(headline: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """Plain snippet text plus the [start, end) offsets of each highlighted match."""
+    text, highlights, start = [], [], None
+    length = 0
+    for char in headline:
+        if char == HIGHLIGHT_START:
+            start = length
+        elif char == HIGHLIGHT_STOP:
+            if start is not None:
+                highlights.append((start, length))
+            start = None
+        else:
+            text.append(char)
+            length += 1
+    return "".join(text), highlights
+
+
+@router.get("/search", response_model=List[MessageSearchResult])
+async def search_messages(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    conversation_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Full-text search over messages in conversations the current user is or was
+    part of (only up to their removal time), best matches first. ``q`` takes
+    web-search syntax: words, "quoted phrases", ``or`` and ``-excluded``.
+    Pass X-Next-Cursor back as ``cursor`` for the next page. ``snippet`` is
+    plain text; ``highlights`` are the offsets of the matched terms in it.
+    """
+    query_ts = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(Message.search_vector, query_ts)
+    me = aliased(ConversationParticipant)
+
+    query = (
+        select(
+            Message,
+            rank.label("rank"),
+            func.ts_headline(
+                SEARCH_CONFIG,
+                func.translate(Message.content, HIGHLIGHT_START + HIGHLIGHT_STOP, ""),
+                query_ts,
+                HEADLINE_OPTIONS,
+            ).label("headline"),
+        )
+        .join(me, and_(me.conversation_id == Message.conversation_id, me.user_id == current_user.id))
+        .where(Message.search_vector.op("@@")(query_ts))
+        .where(_visible(Message, me))
+    )
+    if conversation_id is not None:
+        query = query.where(Message.conversation_id == conversation_id)
+    if cursor:
+        last_rank, last_id = decode_rank_cursor(cursor)
+        query = query.where(or_(rank < last_rank, and_(rank == last_rank, Message.id < last_id)))
+    query = query.order_by(rank.desc(), Message.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(rows[-1].rank, rows[-1].Message.id)
+    results = []
+    for row in rows:
+        snippet, highlights = _split_highlights(row.headline)
+        results.append(MessageSearchResult(
+            **MessageResponse.model_validate(row.Message).model_dump(),
+            rank=row.rank,
+            snippet=snippet,
+            highlights=highlights,
+        ))
+    return results
+
+
+def message_event(message: MessageResponse) -> dict:
+    return {"type": "message", **message.model_dump(mode="json")}
+
+
+async def load_message_event(message_id: int) -> Optional[dict]:
+    """Rebuild a message event from the database (used for oversized cross-worker events)."""
+    async with AsyncSessionLocal() as db:
+        message = await db.get(Message, message_id)
+    return message_event(MessageResponse.model_validate(message)) if message else None
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Real-time delivery for every conversation the user is an active participant in.
+    Authenticate with ``?token=<access token>`` or an ``Authorization: Bearer`` header.
+    Server sends ``{"type": "message", ...}`` events; clients may send
+    ``{"type": "ping"}`` and get ``{"type": "pong"}`` back.
+    """
+    token = stream_token(websocket, token)
+
+    # Short-lived session: a socket must not hold a pooled connection while it is open
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(db, token) if token else None
+        if user is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        active = await db.execute(
+            select(ConversationParticipant.conversation_id)
+            .where(ConversationParticipant.user_id == user.id)
+            .where(ConversationParticipant.removed_at.is_(None))
+        )
+        conversation_ids = active.scalars().all()
+
+    await websocket.accept()
+    conn = chat_hub.connect(user.id, conversation_ids)
+
+    async def send_events():
+        while True:
+            await websocket.send_json(await conn.queue.get())
+
+    async def receive_commands():
+        while True:
+            data = await websocket.receive_json()
+            if isinstance(data, dict) and data.get("type") == "ping":
+                conn.offer({"type": "pong"})
+
+    sender = asyncio.create_task(send_events())
+    receiver = asyncio.create_task(receive_commands())
+    evicted = asyncio.create_task(conn.evicted.wait())
+    try:
+        done, _ = await asyncio.wait({sender, receiver, evicted}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        chat_hub.disconnect(conn)
+        for job in (sender, receiver, evicted):
+            job.cancel()
+    for job in done:
+        job.exception()  # disconnects and send failures just end the session
+
+    # An evicted client fell too far behind; it should reconnect and catch up via get_messages
+    code = status.WS_1013_TRY_AGAIN_LATER if conn.evicted.is_set() else status.WS_1000_NORMAL_CLOSURE
+    try:
+        await websocket.close(code=code)
+    except (RuntimeError, WebSocketDisconnect):
+        pass  # client already disconnected
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.database import get_db
@@ -7,41 +7,14 @@ from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.report import DailyReport
 from app.models.task import Task
-from app.data.staff import staff_birthdays
+from app.services.birthdays import get_birthday_index
+from typing import Optional
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-def find_next_birthday(staff_list):
-    today = date.today()
-    candidates = []
-    for person in staff_list:
-        dob_str = person["date_of_birth"]
-        dob = date.fromisoformat(dob_str)
-        try:
-            # Try to use Feb 29 in non-leap years → fails
-            bday_this_year = dob.replace(year=today.year)
-        except ValueError:
-            # Handle Feb 29 → use Feb 28 instead
-            if dob.month == 2 and dob.day == 29:
-                bday_this_year = date(today.year, 2, 28)
-            else:
-                continue  # skip invalid dates
-
-        if bday_this_year < today:
-            # Move to next year
-            try:
-                bday_this_year = dob.replace(year=today.year + 1)
-            except ValueError:
-                if dob.month == 2 and dob.day == 29:
-                    bday_this_year = date(today.year + 1, 2, 28)
-                else:
-                    continue
-
-        candidates.append((bday_this_year, person))
-    
-    if not candidates:
-        return None
-    return min(candidates, key=lambda x: x[0])[1]
+async def find_next_birthday(db: AsyncSession, today: Optional[date] = None) -> Optional[dict]:
+    index = await get_birthday_index(db)
+    return index.next_birthday(today or date.today())
 
 @router.get("")
 async def get_dashboard(
@@ -49,7 +22,7 @@ async def get_dashboard(
     current_user=Depends(get_current_user)
 ):
     # 1. Find next birthday
-    next_birthday = find_next_birthday(staff_birthdays)
+    next_birthday = await find_next_birthday(db)
 
     # 2. Get today's report status
     today = datetime.utcnow().date()
@@ -75,4 +48,15 @@ async def get_dashboard(
             "report_status": report_status,
             "uncompleted_tasks": uncompleted_count
         }
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/birthdays")
+async def get_upcoming_birthdays(
+    days: int = Query(30, ge=0, le=365),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """Birthdays from today through the next ``days`` days, soonest first."""
+    index = await get_birthday_index(db)
+    return index.upcoming(date.today(), days)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case
 from datetime import date, datetime, timezone
 from app.database import get_db
 from app.core.auth import get_current_user
@@ -20,28 +20,39 @@ def get_goal_status(goal: Goal, latest_progress: int, today: date) -> str:
     else:
         return "ongoing"
 
+def goal_status_expr(today: date):
+    """SQL version of get_goal_status() over the denormalized latest_progress."""
+    return case(
+        (Goal.latest_progress == 100, "achieved"),
+        (Goal.target_date < today, "overdue"),
+        else_="ongoing"
+    )
+
 @router.post("", response_model=GoalResponse)
 async def create_goal(
     goal_in: GoalCreate,
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    now = datetime.now(timezone.utc)
     goal = Goal(
         user_id=current_user.id,
         title=goal_in.title,
         description=goal_in.description,
         frequency=goal_in.frequency,
         priority=goal_in.priority,
-        target_date=goal_in.target_date
+        target_date=goal_in.target_date,
+        latest_progress=0,
+        last_update_at=now
     )
     db.add(goal)
-    await db.commit()
-    await db.refresh(goal)
+    await db.flush()  # assigns goal.id without committing
 
-    # Add initial update (0%)
-    update = GoalUpdate(goal_id=goal.id, progress_percent=0, note="Goal created")
+    # Add initial update (0%) in the same transaction
+    update = GoalUpdate(goal_id=goal.id, progress_percent=0, note="Goal created", created_at=now)
     db.add(update)
     await db.commit()
+    await db.refresh(goal)
 
     return GoalResponse(
         id=goal.id,
@@ -65,15 +76,23 @@ async def add_goal_update(
     goal = await db.execute(
         select(Goal).where(Goal.id == goal_id, Goal.user_id == current_user.id)
     )
-    if not goal.scalar_one_or_none():
+    goal_obj = goal.scalar_one_or_none()
+    if not goal_obj:
         raise HTTPException(404, "Goal not found")
 
+    now = datetime.now(timezone.utc)
     update = GoalUpdate(
         goal_id=goal_id,
         note=update_in.note,
-        progress_percent=update_in.progress_percent
+        progress_percent=update_in.progress_percent,
+        created_at=now
     )
     db.add(update)
+
+    # Keep the goal's denormalized progress in step with its newest update
+    goal_obj.latest_progress = update_in.progress_percent
+    goal_obj.last_update_at = now
+    db.add(goal_obj)
     await db.commit()
     await db.refresh(update)
     return update
@@ -84,26 +103,15 @@ async def get_goal_dashboard(
     current_user = Depends(get_current_user)
 ):
     today = date.today()
+    # One query: progress is denormalized on the goal and status is classified in SQL
     goals = await db.execute(
-        select(Goal)
+        select(Goal, goal_status_expr(today).label("status"))
         .where(Goal.user_id == current_user.id)
         .order_by(Goal.target_date)
     )
-    goal_list = goals.scalars().all()
 
-    # Get latest progress for each goal
     achieved, ongoing, overdue = [], [], []
-    for goal in goal_list:
-        latest_update = await db.execute(
-            select(GoalUpdate)
-            .where(GoalUpdate.goal_id == goal.id)
-            .order_by(GoalUpdate.created_at.desc())
-            .limit(1)
-        )
-        latest = latest_update.scalar_one_or_none()
-        progress = latest.progress_percent if latest else 0
-        status = get_goal_status(goal, progress, today)
-
+    for goal, status in goals.all():
         resp = GoalResponse(
             id=goal.id,
             title=goal.title,
@@ -112,7 +120,7 @@ async def get_goal_dashboard(
             priority=goal.priority,
             target_date=goal.target_date,
             created_at=goal.created_at,
-            latest_progress=progress,
+            latest_progress=goal.latest_progress,
             status=status
         )
 
@@ -145,7 +153,7 @@ async def get_goal_detail(
     )
     update_list = [GoalUpdateResponse.model_validate(u) for u in updates.scalars()]
 
-    latest_progress = update_list[-1].progress_percent if update_list else 0
+    latest_progress = goal_obj.latest_progress
     status = get_goal_status(goal_obj, latest_progress, date.today())
 
     return GoalDetailResponse(
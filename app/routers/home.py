@@ -0,0 +1,78 @@
+# app/routers/home.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.config import settings
+from app.core.auth import get_user_from_token, reusable_oauth2
+from app.database import AsyncSessionLocal
+from app.routers import attendance, dashboard, goal, performance, task
+from app.schemas.user import UserResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/home", tags=["home"])
+
+# Section name -> route handler taking (db, current_user); each runs on its own session
+HOME_SECTIONS: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "dashboard": dashboard.get_dashboard,
+    "attendance": attendance.get_attendance_status,
+    "tasks": task.get_my_tasks,
+    "goals": goal.get_goal_dashboard,
+    "performance": performance.get_my_performance,
+}
+
+
+async def _run_section(name: str, handler, user, timeout: float) -> Tuple[str, Any, Optional[str]]:
+    """(name, result, error) for one section; never raises."""
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await handler(db=db, current_user=user)
+
+    try:
+        return name, await asyncio.wait_for(run(), timeout), None
+    except asyncio.TimeoutError:
+        return name, None, "timeout"
+    except HTTPException as e:
+        return name, None, e.detail
+    except Exception:
+        logger.exception("Home section %s failed", name)
+        return name, None, "unavailable"
+
+
+@router.get("")
+async def get_home(token: HTTPAuthorizationCredentials = Depends(reusable_oauth2)):
+    """
+    Everything the staff home screen needs in one call: the ``/dashboard``,
+    ``/attendance/status``, ``/tasks/me``, ``/goals/dashboard`` and
+    ``/performance/my`` payloads under their section names. Sections run
+    concurrently, each on its own pooled session with its own timeout; one
+    that fails or times out is null and listed in ``errors``, the rest are
+    still returned.
+    """
+    # Authenticate once, and give the connection back before fanning out
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(db, token.credentials)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    results = await asyncio.gather(*(
+        _run_section(name, handler, user, settings.HOME_SECTION_TIMEOUT_SECONDS)
+        for name, handler in HOME_SECTIONS.items()
+    ))
+
+    home: Dict[str, Any] = {"user": UserResponse.model_validate(user)}
+    errors: Dict[str, str] = {}
+    for name, result, error in results:
+        home[name] = result
+        if error is not None:
+            errors[name] = error
+    home["errors"] = errors
+    return home
@@ -1,50 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, or_, exists
+from sqlalchemy.orm import aliased
 from app.database import get_db
 from app.core.auth import get_current_user
-from app.models.message import Message, MessageReply
-from app.schemas.message import MessageResponse, MessageReplyCreate, MessageReplyResponse
-from typing import List
+from app.models.message import TargetedMessage, MessageRecipient, MessageReply
+from app.schemas.message import TargetedMessageResponse, MessageReplyCreate, MessageReplyResponse
+from app.utils.pagination import keyset_page, resolve_cursor, set_cursor_headers
+from collections import defaultdict
+from typing import Dict, List, Optional
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
+
+def recipient_ids_expr():
+    """Correlated array of a targeted message's recipient ids."""
+    recipient = aliased(MessageRecipient)  # the outer query may join MessageRecipient itself
+    return (
+        select(func.array_agg(recipient.user_id))
+        .where(recipient.message_id == TargetedMessage.id)
+        .correlate(TargetedMessage)
+        .scalar_subquery()
+    )
+
+
+async def load_replies(
+    db: AsyncSession, message_ids: List[int], viewer_id: Optional[int] = None
+) -> Dict[int, List[MessageReplyResponse]]:
+    """
+    Replies for a whole page of messages in one query. With ``viewer_id`` (a
+    recipient), private replies are only included if the viewer or the
+    message's admin wrote them; without it (the sending admin) all are included.
+    """
+    if not message_ids:
+        return {}
+    query = (
+        select(MessageReply)
+        .join(TargetedMessage, TargetedMessage.id == MessageReply.message_id)
+        .where(MessageReply.message_id.in_(message_ids))
+        .order_by(MessageReply.message_id, MessageReply.created_at, MessageReply.id)
+    )
+    if viewer_id is not None:
+        query = query.where(or_(
+            MessageReply.is_private.is_(False),
+            MessageReply.user_id == viewer_id,
+            MessageReply.user_id == TargetedMessage.admin_id
+        ))
+    result = await db.execute(query)
+    replies = defaultdict(list)
+    for reply in result.scalars():
+        replies[reply.message_id].append(MessageReplyResponse.model_validate(reply))
+    return replies
+
+
+async def targeted_message_page(
+    db: AsyncSession, query, response: Response, before: Optional[str], after: Optional[str],
+    limit: int, viewer_id: Optional[int] = None
+) -> List[TargetedMessageResponse]:
+    """One keyset page of ``query`` (newest first) with recipients and visible replies: two queries."""
+    direction, position = resolve_cursor(before, after)
+    query = keyset_page(query, TargetedMessage.created_at, TargetedMessage.id, direction, position, limit)
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "after":
+        rows.reverse()
+
+    messages = [row.TargetedMessage for row in rows]
+    replies = await load_replies(db, [m.id for m in messages], viewer_id)
+    set_cursor_headers(response, messages, has_more)
+    return [
+        TargetedMessageResponse(
+            id=msg.id,
+            admin_id=msg.admin_id,
+            recipient_ids=sorted(row.recipient_ids or []),
+            title=msg.title,
+            content=msg.content,
+            created_at=msg.created_at,
+            replies=replies.get(msg.id, [])
+        )
+        for msg, row in zip(messages, rows)
+    ]
+
+
 # 1. Get messages for current staff
-@router.get("", response_model=List[MessageResponse])
+@router.get("", response_model=List[TargetedMessageResponse])
 async def get_my_messages(
+    response: Response,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    messages = await db.execute(
-        select(Message)
-        .where(Message.recipient_ids.contains([current_user.id]))
-        .order_by(Message.created_at.desc())
+    """
+    Targeted messages sent to the current user, newest first, with the replies
+    they may see. Page with the X-Before-Cursor / X-After-Cursor headers.
+    """
+    query = (
+        select(TargetedMessage, recipient_ids_expr().label("recipient_ids"))
+        .join(MessageRecipient, MessageRecipient.message_id == TargetedMessage.id)
+        .where(MessageRecipient.user_id == current_user.id)
     )
-    result = []
-    for msg in messages.scalars():
-        # Only show replies the user is allowed to see
-        replies = await db.execute(
-            select(MessageReply)
-            .where(MessageReply.message_id == msg.id)
-            .where(
-                (MessageReply.is_private == False) | 
-                (MessageReply.user_id == current_user.id) |
-                (MessageReply.user_id == msg.admin_id)
-            )
-            .order_by(MessageReply.created_at)
-        )
-        result.append(
-            MessageResponse(
-                id=msg.id,
-                admin_id=msg.admin_id,
-                recipient_ids=msg.recipient_ids,
-                title=msg.title,
-                content=msg.content,
-                created_at=msg.created_at,
-                replies=[MessageReplyResponse.model_validate(r) for r in replies.scalars()]
-            )
-        )
-    return result
+    return await targeted_message_page(db, query, response, before, after, limit, viewer_id=current_user.id)
 
 # 2. Reply to a message
 @router.post("/{message_id}/reply", response_model=MessageReplyResponse)
@@ -54,14 +112,17 @@ async def reply_to_message(
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    # Verify user is a recipient
+    # Verify user is a recipient (or the admin who sent it)
+    is_recipient = exists().where(
+        MessageRecipient.message_id == TargetedMessage.id,
+        MessageRecipient.user_id == current_user.id
+    )
     message = await db.execute(
-        select(Message)
-        .where(Message.id == message_id)
-        .where(Message.recipient_ids.contains([current_user.id]))
+        select(TargetedMessage.id)
+        .where(TargetedMessage.id == message_id)
+        .where(or_(is_recipient, TargetedMessage.admin_id == current_user.id))
     )
-    msg = message.scalar_one_or_none()
-    if not msg:
+    if message.scalar_one_or_none() is None:
         raise HTTPException(404, "Message not found or access denied")
 
     reply = MessageReply(
@@ -74,5 +135,3 @@ async def reply_to_message(
     await db.commit()
     await db.refresh(reply)
     return reply
-
-
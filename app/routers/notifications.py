@@ -0,0 +1,84 @@
+# app/routers/notifications.py
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.auth import get_user_from_token, stream_token
+from app.database import AsyncSessionLocal
+from app.models.message import ConversationParticipant
+from app.services.notifications import notification_hub
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+RETRY_MS = 3000
+
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+@router.get("/stream")
+async def notification_stream(request: Request, token: Optional[str] = None):
+    """
+    Server-Sent Events: ``announcement``, ``task_assigned``, ``task_overdue`` and
+    ``chat_message`` events for the current user, with ``: keepalive`` comments
+    in between. Authenticate with ``?token=`` (EventSource can't send headers)
+    or ``Authorization: Bearer``. On reconnect the browser sends Last-Event-ID and
+    missed events are replayed; if they are gone a ``reset`` event tells the
+    client to refetch.
+    """
+    token = stream_token(request, token)
+
+    # Short-lived session: an open stream must not hold a pooled connection
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(db, token) if token else None
+        if user is None:
+            raise HTTPException(401, "Could not validate credentials")
+        active = await db.execute(
+            select(ConversationParticipant.conversation_id)
+            .where(ConversationParticipant.user_id == user.id)
+            .where(ConversationParticipant.removed_at.is_(None))
+        )
+        conversation_ids = active.scalars().all()
+
+    # Subscribe before replaying so nothing published in between is lost
+    sub = notification_hub.subscribe(user.id, conversation_ids)
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+
+    async def events():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            last_seq = 0
+            if last_event_id:
+                replayed = notification_hub.replay(sub, last_event_id)
+                if replayed is None:
+                    yield "event: reset\ndata: {}\n\n"
+                else:
+                    for event in replayed:
+                        last_seq = notification_hub.event_seq(event)
+                        yield _sse(event)
+
+            while not sub.evicted.is_set():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                seq = notification_hub.event_seq(event)
+                if seq > last_seq:  # already sent from the replay buffer otherwise
+                    last_seq = seq
+                    yield _sse(event)
+            # Evicted for falling behind: end the stream; the browser reconnects with Last-Event-ID
+        finally:
+            notification_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
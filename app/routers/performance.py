@@ -1,14 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy import select
 from app.database import get_db
-from app.core.auth import get_current_user
-from app.services.performance import calculate_performance_score
+from app.core.auth import get_current_user, get_current_admin
+from app.services.performance import (
+    counter_breakdown, materialize_performance_scores, upsert_performance_scores,
+    is_score_stale, schedule_score_refresh
+)
+from app.services.leaderboard import get_leaderboard
+from app.services.simulation import simulate_weightings
+from app.services.trend import get_performance_trend
+from app.schemas.performance import ScoreSimulationRequest
 from app.models.performance import PerformanceScore
+from app.models.user import User
+from typing import List
 
 router = APIRouter(prefix="/performance", tags=["performance"])
 
+def _resolve_period(month: int = None, year: int = None):
+    now = datetime.utcnow()
+    month = month or now.month
+    year = year or now.year
+    if not (1 <= month <= 12):
+        raise HTTPException(400, "Invalid month")
+    if year < 1900 or year > 2100:
+        raise HTTPException(400, "Invalid year")
+    return month, year
+
 @router.get("/my")
 async def get_my_performance(
     db: AsyncSession = Depends(get_db),
@@ -27,20 +46,29 @@ async def get_my_performance(
     score = result.scalar_one_or_none()
 
     if not score:
-        # Calculate on-the-fly (or trigger async calc in prod)
-        calculated = await calculate_performance_score(db, current_user.id, month, year)
-        score = PerformanceScore(
-            user_id=current_user.id,
-            month=month,
-            year=year,
-            score=calculated
-        )
-        db.add(score)
+        # Calculate on-the-fly from the monthly counters, keeping the full breakdown
+        calculated = await counter_breakdown(db, current_user.id, month, year)
+        computed_at = datetime.now(timezone.utc)
+        await upsert_performance_scores(db, [{
+            "user_id": current_user.id,
+            "month": month,
+            "year": year,
+            "computed_at": computed_at,
+            **calculated
+        }])
         await db.commit()
-        await db.refresh(score)
+        score = PerformanceScore(computed_at=computed_at, **calculated)
+        stale = False
+    else:
+        # Serve what we have right away; an expired score is refreshed in the background
+        stale = is_score_stale(score)
+        if stale:
+            schedule_score_refresh(current_user.id, month, year)
 
     return {
         "score": round(score.score, 2),
+        "computed_at": score.computed_at,
+        "stale": stale,
         "breakdown": {
             "report_consistency": score.report_consistency,
             "task_score": score.task_score,
@@ -48,4 +76,132 @@ async def get_my_performance(
             "training_score": score.training_score,
             "achievement_count": score.achievement_count
         }
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/materialize")
+async def materialize_scores(
+    month: int = None,
+    year: int = None,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Admin: recompute and store every staff member's score for a month
+    (defaults to the current month). Also runs on a schedule.
+    """
+    month, year = _resolve_period(month, year)
+    count = await materialize_performance_scores(db, month, year)
+    return {"month": month, "year": year, "materialized": count}
+
+
+@router.get("/leaderboard")
+async def get_performance_leaderboard(
+    month: int = None,
+    year: int = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Admin: ranked staff scores for a month with percentile and score
+    distribution, built from the materialized PerformanceScore rows.
+    """
+    month, year = _resolve_period(month, year)
+    snapshot = await get_leaderboard(db, month, year)
+
+    return {
+        "month": month,
+        "year": year,
+        "total": len(snapshot),
+        "distribution": snapshot.distribution(),
+        "entries": [
+            {
+                "rank": e["rank"],
+                "percentile": e["percentile"],
+                "user_id": e["user_id"],
+                "name": e["name"],
+                "score": round(e["score"], 2),
+            }
+            for e in snapshot.entries[offset:offset + limit]
+        ]
+    }
+
+
+@router.get("/leaderboard/me")
+async def get_my_rank(
+    month: int = None,
+    year: int = None,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Current user's rank and percentile for a month (bisect on the cached snapshot).
+    """
+    month, year = _resolve_period(month, year)
+    snapshot = await get_leaderboard(db, month, year)
+
+    standing = snapshot.standing(current_user.id)
+    if standing is None:
+        raise HTTPException(404, "No performance score for this period yet")
+    return {"month": month, "year": year, **standing}
+
+
+
+@router.post("/simulate")
+async def simulate_score_weights(
+    sim_in: ScoreSimulationRequest,
+    db: AsyncSession = Depends(get_db),
+    admin = Depends(get_current_admin)
+):
+    """
+    Admin: preview how candidate component weightings would re-rank all staff
+    for a month, compared with the weights currently in use.
+    """
+    month, year = _resolve_period(sim_in.month, sim_in.year)
+    try:
+        return await simulate_weightings(db, month, year, sim_in.weightings, sim_in.top_movers)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+
+@router.get("/trend")
+async def get_trend(
+    months: int = Query(6, ge=1, le=24),
+    user_ids: List[int] = Query(None, max_length=200),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Score and component history for the last N months. Staff get their own;
+    admins may pass one or more user_ids (a group).
+    """
+    if not user_ids:
+        user_ids = [current_user.id]
+    elif current_user.role != "admin" and user_ids != [current_user.id]:
+        raise HTTPException(403, "Admin access required")
+
+    user_ids = list(dict.fromkeys(user_ids))
+    users = await db.execute(select(User.id, User.name).where(User.id.in_(user_ids)))
+    names = dict(users.all())
+    unknown = [u for u in user_ids if u not in names]
+    if unknown:
+        raise HTTPException(404, f"User not found: {unknown[0]}")
+
+    trend = await get_performance_trend(db, user_ids, months)
+    return {
+        "months": months,
+        "users": [
+            {
+                "user_id": user_id,
+                "name": names[user_id],
+                "history": [
+                    {**point, "score": round(point["score"], 2)}
+                    for point in trend[user_id]
+                ]
+            }
+            for user_id in user_ids
+        ]
+    }
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 from app.database import get_db
 from app.core.auth import get_current_user
 from app.models.report import DailyReport
+from app.services.counters import bump_counters
 from app.schemas.report import ReportCreate, ReportUpdate, ReportResponse, ReportHistoryResponse, ReportHistoryItem
 from calendar import monthrange
 from datetime import date, timedelta, datetime 
@@ -116,6 +117,7 @@ async def submit_report(
         date=datetime.now(timezone.utc)
     )
     db.add(report)
+    await bump_counters(db, current_user.id, report.date, reports_submitted=1)
     await db.commit()
     await db.refresh(report)
     return report
@@ -6,6 +6,9 @@ from app.database import get_db
 from app.core.auth import get_current_user
 from app.models.task import Task
 from app.models.user import User
+from app.services.deadlines import deadline_scheduler
+from app.services.counters import apply_counter_deltas, completion_deltas, rating_delta
+from app.services.notifications import notify_task_assigned
 from app.schemas.task import TaskCreate, TaskUpdateStatus, TaskRate, TaskResponse, TaskSummaryResponse
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -45,6 +48,8 @@ async def create_task(
     db.add(task)
     await db.commit()
     await db.refresh(task)
+    deadline_scheduler.schedule(task.id, task.deadline, task.assigned_to_id)
+    await notify_task_assigned(task.id, task.title, task.assigned_to_id, task.creator_id, task.deadline)
     return task
 
 
@@ -64,9 +69,6 @@ async def get_my_tasks(
     )
     tasks = result.scalars().all()
 
-    # ✅ Use timezone-aware UTC for 'now'
-    now = datetime.now(timezone.utc)
-
     completed = 0
     overdue = 0
     pending = 0
@@ -75,8 +77,8 @@ async def get_my_tasks(
         if task.status == "completed":
             completed += 1
         else:
-            # Only consider deadline if task is not completed
-            if task.deadline < now:
+            # is_overdue is flipped by the deadline scheduler when the deadline passes
+            if task.is_overdue:
                 overdue += 1
             else:
                 pending += 1
@@ -114,6 +116,7 @@ async def complete_task(
         select(Task)
         .where(Task.id == task_id)
         .where(Task.assigned_to_id == current_user.id)
+        .with_for_update()  # counters below are computed from the row's current state
     )
     task = result.scalar_one_or_none()
     if not task:
@@ -121,11 +124,17 @@ async def complete_task(
     if task.status == "completed":
         raise HTTPException(400, "Task already completed")
 
+    previously_completed_at = task.completed_at
     task.status = "completed"
     task.completed_at = datetime.now(timezone.utc)
+    task.is_overdue = False
     db.add(task)
+    await apply_counter_deltas(db, completion_deltas(
+        task.assigned_to_id, task.rating, previously_completed_at, task.completed_at
+    ))
     await db.commit()
     await db.refresh(task)
+    deadline_scheduler.complete(task.id)
     return task
 
 
@@ -140,6 +149,7 @@ async def rate_task(
         select(Task)
         .where(Task.id == task_id)
         .where(Task.rater_id == current_user.id)
+        .with_for_update()  # a concurrent re-rate must see this rating, not the old one
     )
     task = result.scalar_one_or_none()
     if not task:
@@ -147,6 +157,9 @@ async def rate_task(
     if task.status != "completed":
         raise HTTPException(400, "Task must be completed before rating")
 
+    await apply_counter_deltas(db, [
+        rating_delta(task.assigned_to_id, task.completed_at, task.rating, rating_in.rating)
+    ])
     task.rating = rating_in.rating
     db.add(task)
     await db.commit()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from datetime import date
+from pydantic import BaseModel, Field
+from datetime import date, datetime
 from typing import List, Optional
 from .task import TaskCreate as BaseTaskCreate, TaskResponse
 from .report import ReportResponse
@@ -27,6 +27,36 @@ class AdminTaskCreate(BaseTaskCreate):
     assigned_to_id: int  # staff user ID
     # Admin is always creator & rater (optional)
 
+class AdminBulkTaskCreate(BaseModel):
+    # One task template assigned to many staff
+    title: str = Field(..., min_length=3, max_length=100)
+    description: Optional[str] = None
+    rater_id: Optional[int] = None
+    deadline: datetime
+    assigned_to_ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+class AdminBulkTaskRateItem(BaseModel):
+    task_id: int
+    rating: int = Field(..., ge=1, le=5)
+
+class AdminBulkTaskRate(BaseModel):
+    items: List[AdminBulkTaskRateItem] = Field(..., min_length=1, max_length=10000)
+
+class AdminBulkTaskStatus(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1, max_length=10000)
+    status: str = Field(..., pattern="^(pending|in_progress|completed)$")
+
+class AdminBulkItemResult(BaseModel):
+    id: int  # staff user ID (assign) or task ID (rate / status)
+    status: str  # "created", "rated", "updated", "error"
+    task_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class AdminBulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[AdminBulkItemResult]
+
 class AdminTaskFilter(BaseModel):
     assigned_to_id: Optional[int] = None
     status: Optional[str] = None
@@ -43,11 +73,12 @@ class StaffProfileResponse(BaseModel):
     email: str
     # date_of_birth: Optional[date]  # ← COMMENT OUT OR REMOVE
     role: str
-    total_working_hours_this_month: float
-    reports: List[ReportResponse]
-    assigned_tasks: List[TaskResponse]
-    created_tasks: List[TaskResponse]
-    goals: List[GoalDetailResponse]
+    # Sections not requested via include= are left empty / None
+    total_working_hours_this_month: Optional[float] = None
+    reports: List[ReportResponse] = []
+    assigned_tasks: List[TaskResponse] = []
+    created_tasks: List[TaskResponse] = []
+    goals: List[GoalDetailResponse] = []
     achievements: List[str] = []
 
     model_config = {"from_attributes": True}
\ No newline at end of file
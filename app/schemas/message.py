@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 class AnnouncementCreate(BaseModel):
     title: str
@@ -15,7 +15,7 @@ class AnnouncementResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
-class MessageCreate(BaseModel):
+class TargetedMessageCreate(BaseModel):
     recipient_ids: List[int]  # Staff user IDs
     title: str
     content: str
@@ -33,7 +33,7 @@ class MessageReplyResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
-class MessageResponse(BaseModel):
+class TargetedMessageResponse(BaseModel):
     id: int
     admin_id: int
     recipient_ids: List[int]
@@ -51,12 +51,6 @@ class ConversationCreate(BaseModel):
     title: str
     initial_participant_ids: List[int]  # Staff user IDs (admin is auto-added)
 
-class ConversationResponse(BaseModel):
-    id: int
-    title: str
-    admin_id: int
-    participants: List[int]
-    created_at: datetime
 
 class MessageCreate(BaseModel):
     content: str
@@ -68,4 +62,31 @@ class MessageResponse(BaseModel):
     content: str
     created_at: datetime
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+class ConversationResponse(BaseModel):
+    id: int
+    title: str
+    admin_id: int
+    participants: List[int]
+    created_at: datetime
+    last_message: Optional[MessageResponse] = None
+    unread_count: int = 0
+    last_read_message_id: Optional[int] = None
+
+class MessageSearchResult(MessageResponse):
+    rank: float
+    snippet: str  # matching fragment as plain text (no markup; escape before rendering as HTML)
+    highlights: List[Tuple[int, int]] = []  # [start, end) offsets of matched terms in snippet
+
+class ConversationReadResponse(BaseModel):
+    conversation_id: int
+    last_read_message_id: Optional[int]
+
+class ConversationParticipantsAdd(BaseModel):
+    user_ids: List[int]  # Staff user IDs
+
+class ConversationParticipantsAddResponse(BaseModel):
+    conversation_id: int
+    added: List[int]  # New or re-activated participants
+    already_active: List[int]
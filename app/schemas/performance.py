@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class ScoreSimulationRequest(BaseModel):
+    month: Optional[int] = Field(None, ge=1, le=12)
+    year: Optional[int] = Field(None, ge=1900, le=2100)
+    # Each candidate overrides some or all of the component weights, e.g. {"task_score": 0.4}
+    weightings: List[Dict[str, float]] = Field(..., min_length=1, max_length=50)
+    top_movers: int = Field(20, ge=0, le=1000)  # per candidate, largest rank changes first
@@ -27,6 +27,7 @@ class TaskResponse(BaseModel):
     deadline: datetime
     created_at: datetime
     completed_at: Optional[datetime]
+    is_overdue: bool = False
 
     model_config = {"from_attributes": True}
 
@@ -8,6 +8,13 @@ class UserCreate(BaseModel):
     email: EmailStr
     name: str = Field(..., min_length=2, max_length=100)
     password: str = Field(..., min_length=8, max_length=72)
+    date_of_birth: Optional[date] = None
+
+    @model_validator(mode='after')
+    def date_of_birth_not_in_future(self):
+        if self.date_of_birth is not None and self.date_of_birth > date.today():
+            raise ValueError("date_of_birth cannot be in the future")
+        return self
 
 class UserResponse(BaseModel):
     id: int
@@ -15,6 +22,7 @@ class UserResponse(BaseModel):
     is_active: bool
     name: str | None  # ← Nullable in response
     role: str
+    date_of_birth: Optional[date] = None
 
     
     model_config = {"from_attributes": True}  # ✅ Pydantic v2 style
@@ -31,9 +39,12 @@ class Token(BaseModel):
 class UserUpdate(BaseModel):
     name: Optional[str] = None
     email: Optional[str] = None
+    date_of_birth: Optional[date] = None
 
     @model_validator(mode='after')
     def at_least_one_field(self):
-        if self.name is None and self.email is None:
-            raise ValueError("At least one field (name or email) must be provided")
+        if self.name is None and self.email is None and self.date_of_birth is None:
+            raise ValueError("At least one field (name, email or date_of_birth) must be provided")
+        if self.date_of_birth is not None and self.date_of_birth > date.today():
+            raise ValueError("date_of_birth cannot be in the future")
         return self
\ No newline at end of file
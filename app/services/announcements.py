@@ -0,0 +1,85 @@
+# app/services/announcements.py
+import hashlib
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.message import Announcement
+from app.schemas.message import AnnouncementResponse
+from app.services.cache import TTLCache
+
+FEED_SIZE = 500  # newest announcements kept in memory; older pages go to the database
+MAX_RENDERED_PAGES = 64
+
+_page_adapter = TypeAdapter(List[AnnouncementResponse])
+
+# Dropped by create_announcement; the TTL covers announcements posted on other workers
+feed_cache = TTLCache(ttl=60)
+
+
+class AnnouncementFeed:
+    """
+    The newest announcements, newest first, with a content version for
+    ETag / Last-Modified. Announcements are append-only, so the newest id
+    identifies the feed's content.
+    """
+
+    def __init__(self, items: List[AnnouncementResponse]):
+        self.items = items
+        self.complete = len(items) < FEED_SIZE  # nothing older outside the window
+        self.last_modified: Optional[datetime] = items[0].created_at if items else None
+        self.version = str(items[0].id) if items else "empty"
+        self._ascending = [(a.created_at, a.id) for a in reversed(items)]
+        self._rendered: Dict[Hashable, Tuple[bytes, bool]] = {}
+
+    def etag(self, *variant) -> str:
+        digest = hashlib.sha1(repr((self.version, variant)).encode()).hexdigest()[:16]
+        return f'"{digest}"'
+
+    def page(self, position: Optional[Tuple[datetime, int]], limit: Optional[int]) -> Optional[Tuple[List[AnnouncementResponse], bool]]:
+        """
+        (items, has_more) for the page older than ``position`` (everything
+        older without a limit), or None if it leaves the window.
+        """
+        older = len(self.items) if position is None else bisect_left(self._ascending, position)
+        if (limit is None or older <= limit) and not self.complete:
+            return None
+        if limit is None:
+            limit = older
+        start = len(self.items) - older
+        return self.items[start:start + limit], older > limit
+
+    def render(self, position: Optional[Tuple[datetime, int]], limit: Optional[int]) -> Optional[Tuple[List[AnnouncementResponse], bytes, bool]]:
+        """Like ``page`` but with the JSON body, serialized once per feed version."""
+        page = self.page(position, limit)
+        if page is None:
+            return None
+        items, has_more = page
+        key = (position, limit)
+        if key not in self._rendered:
+            if len(self._rendered) >= MAX_RENDERED_PAGES:
+                self._rendered.clear()
+            self._rendered[key] = (_page_adapter.dump_json(items), has_more)
+        body, has_more = self._rendered[key]
+        return items, body, has_more
+
+
+async def _load_feed(db: AsyncSession) -> AnnouncementFeed:
+    result = await db.execute(
+        select(Announcement)
+        .order_by(Announcement.created_at.desc(), Announcement.id.desc())
+        .limit(FEED_SIZE)
+    )
+    return AnnouncementFeed([AnnouncementResponse.model_validate(a) for a in result.scalars()])
+
+
+async def get_feed(db: AsyncSession) -> AnnouncementFeed:
+    return await feed_cache.get_or_compute("feed", lambda: _load_feed(db))
+
+
+def invalidate_feed() -> None:
+    feed_cache.invalidate()
@@ -0,0 +1,261 @@
+# app/services/archive.py
+"""
+Cold storage for chat history.
+
+Messages of archived (``is_active = False``) or long-idle conversations are
+moved out of the hot ``messages`` table into ``archived_message_segments``:
+runs of up to SEGMENT_SIZE consecutive messages, zlib-compressed JSON, with
+the (created_at, id) bounds of each run kept in plain columns so a page read
+only decompresses the segments it touches. Segments never change once
+written, so decoded ones are cached in-process.
+
+Archived messages are always older than whatever is still hot, so readers
+page through the hot table first and continue into the archive when it runs
+out (see ``archived_page``). Reactivating a conversation rehydrates its
+segments back into ``messages`` with their original ids.
+"""
+import asyncio
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, insert, delete, tuple_, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.message import ArchivedMessageSegment, Conversation, Message
+from app.schemas.message import MessageResponse
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SIZE = 500
+REHYDRATE_BATCH_SIZE = 2000  # 5 columns per row keeps each insert well under asyncpg's bind limit
+COMPRESSION_LEVEL = 6
+
+# segment id -> decoded messages (oldest first)
+segment_cache = TTLCache(ttl=600, max_entries=2000)
+
+Position = Tuple[datetime, int]
+
+
+def _encode(messages: List[Tuple[int, int, str, datetime]]) -> bytes:
+    rows = [[message_id, sender_id, content, created_at.isoformat()] for message_id, sender_id, content, created_at in messages]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode(), COMPRESSION_LEVEL)
+
+
+def _decode(conversation_id: int, data: bytes) -> List[MessageResponse]:
+    return [
+        MessageResponse(
+            id=message_id,
+            conversation_id=conversation_id,
+            sender_id=sender_id,
+            content=content,
+            created_at=datetime.fromisoformat(created_at),
+        )
+        for message_id, sender_id, content, created_at in json.loads(zlib.decompress(data))
+    ]
+
+
+async def _load_segments(db: AsyncSession, conversation_id: int, segment_ids: List[int]) -> dict:
+    """segment id -> decoded messages, decompressing only what isn't cached."""
+    decoded = {}
+    missing = []
+    for segment_id in segment_ids:
+        cached = segment_cache.get(segment_id)
+        if cached is None:
+            missing.append(segment_id)
+        else:
+            decoded[segment_id] = cached
+    if missing:
+        result = await db.execute(
+            select(ArchivedMessageSegment.id, ArchivedMessageSegment.data)
+            .where(ArchivedMessageSegment.id.in_(missing))
+        )
+        for segment_id, data in result:
+            decoded[segment_id] = _decode(conversation_id, data)
+            segment_cache.set(segment_id, decoded[segment_id])
+    return decoded
+
+
+async def archived_page(
+    db: AsyncSession,
+    conversation_id: int,
+    direction: Optional[str],
+    position: Optional[Position],
+    count: int,
+    removed_at: Optional[datetime] = None,
+) -> List[MessageResponse]:
+    """
+    Up to ``count`` archived messages past ``position``: newest first for
+    "before" (or no position), oldest first for "after", the same order
+    ``keyset_page`` uses. ``removed_at`` caps what a removed participant sees.
+    Usually two queries: segment bounds, then the segments not yet cached.
+    """
+    if count <= 0:
+        return []
+    first = tuple_(ArchivedMessageSegment.first_created_at, ArchivedMessageSegment.first_message_id)
+    last = tuple_(ArchivedMessageSegment.last_created_at, ArchivedMessageSegment.last_message_id)
+    query = (
+        select(ArchivedMessageSegment.id, ArchivedMessageSegment.message_count)
+        .where(ArchivedMessageSegment.conversation_id == conversation_id)
+    )
+    if removed_at is not None:
+        query = query.where(ArchivedMessageSegment.first_created_at <= removed_at)
+    if direction == "after":
+        query = query.where(last > tuple_(*position)).order_by(
+            ArchivedMessageSegment.first_created_at, ArchivedMessageSegment.first_message_id
+        )
+    else:
+        if direction == "before":
+            query = query.where(first < tuple_(*position))
+        query = query.order_by(
+            ArchivedMessageSegment.last_created_at.desc(), ArchivedMessageSegment.last_message_id.desc()
+        )
+
+    # Segments don't overlap: walk them in page order, decoding a batch at a time
+    segments = (await db.execute(query)).all()
+    page = []
+    while segments and len(page) < count:
+        batch, total = [], 0
+        while segments and total < count - len(page):
+            segment_id, message_count = segments.pop(0)
+            batch.append(segment_id)
+            total += message_count
+        decoded = await _load_segments(db, conversation_id, batch)
+        for segment_id in batch:
+            rows = decoded.get(segment_id, [])
+            for row in (rows if direction == "after" else reversed(rows)):
+                key = (row.created_at, row.id)
+                if removed_at is not None and row.created_at > removed_at:
+                    continue
+                if direction == "after" and key <= position:
+                    continue
+                if direction == "before" and key >= position:
+                    continue
+                page.append(row)
+                if len(page) == count:
+                    return page
+    return page
+
+
+async def archive_conversation(db: AsyncSession, conversation_id: int, idle_before: Optional[datetime] = None) -> int:
+    """
+    Move a conversation's hot messages into compressed segments and commit.
+    With ``idle_before``, an active conversation is only archived if its
+    latest message is older than that (re-checked under the row lock, so a
+    message sent since the candidate scan keeps it hot). Returns the number
+    of messages moved.
+    """
+    conversation = (await db.execute(
+        select(Conversation).where(Conversation.id == conversation_id).with_for_update()
+    )).scalar_one_or_none()
+    if conversation is None:
+        return 0
+
+    result = await db.execute(
+        select(Message.id, Message.sender_id, Message.content, Message.created_at)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at, Message.id)
+    )
+    messages = result.all()
+    if not messages:
+        await db.commit()
+        return 0
+    if conversation.is_active is not False and idle_before is not None and messages[-1].created_at >= idle_before:
+        await db.commit()
+        return 0
+
+    for start in range(0, len(messages), SEGMENT_SIZE):
+        chunk = messages[start:start + SEGMENT_SIZE]
+        await db.execute(insert(ArchivedMessageSegment).values(
+            conversation_id=conversation_id,
+            first_created_at=chunk[0].created_at,
+            first_message_id=chunk[0].id,
+            last_created_at=chunk[-1].created_at,
+            last_message_id=chunk[-1].id,
+            message_count=len(chunk),
+            data=_encode(chunk),
+        ))
+        await db.execute(delete(Message).where(Message.id.in_([row.id for row in chunk])))
+    await db.commit()
+    return len(messages)
+
+
+async def rehydrate_conversation(db: AsyncSession, conversation_id: int) -> int:
+    """Move a conversation's archived messages back into ``messages`` (original ids) and commit."""
+    result = await db.execute(
+        select(ArchivedMessageSegment.id, ArchivedMessageSegment.data)
+        .where(ArchivedMessageSegment.conversation_id == conversation_id)
+        .order_by(ArchivedMessageSegment.first_created_at, ArchivedMessageSegment.first_message_id)
+        .with_for_update()
+    )
+    segments = result.all()
+    rows = [
+        {
+            "id": message.id,
+            "conversation_id": conversation_id,
+            "sender_id": message.sender_id,
+            "content": message.content,
+            "created_at": message.created_at,
+        }
+        for segment_id, data in segments
+        for message in _decode(conversation_id, data)
+    ]
+    for start in range(0, len(rows), REHYDRATE_BATCH_SIZE):
+        await db.execute(insert(Message).values(rows[start:start + REHYDRATE_BATCH_SIZE]))
+    segment_ids = [segment_id for segment_id, _ in segments]
+    if segment_ids:
+        await db.execute(delete(ArchivedMessageSegment).where(ArchivedMessageSegment.id.in_(segment_ids)))
+    await db.commit()
+    for segment_id in segment_ids:
+        segment_cache.invalidate(segment_id)
+    return len(rows)
+
+
+async def archive_idle_conversations(db: AsyncSession, idle_days: int) -> Tuple[int, int]:
+    """
+    Archive every conversation that is marked inactive, or whose latest message
+    is older than ``idle_days``, and still has hot messages. Each conversation
+    is moved in its own transaction. Returns (conversations, messages) archived.
+    """
+    idle_before = datetime.now(timezone.utc) - timedelta(days=idle_days)
+    latest = (
+        select(Message.created_at)
+        .where(Message.conversation_id == Conversation.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .lateral()
+    )
+    result = await db.execute(
+        select(Conversation.id)
+        .join(latest, true())
+        .where((Conversation.is_active.is_(False)) | (latest.c.created_at < idle_before))
+    )
+    candidates = result.scalars().all()
+    await db.commit()  # don't hold the scan's snapshot open across the moves
+
+    conversations = messages = 0
+    for conversation_id in candidates:
+        moved = await archive_conversation(db, conversation_id, idle_before=idle_before)
+        if moved:
+            conversations += 1
+            messages += moved
+    return conversations, messages
+
+
+async def run_archiver(interval_seconds: int, idle_days: int) -> None:
+    """Background loop: move inactive and idle conversations to cold storage."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                conversations, messages = await archive_idle_conversations(db, idle_days)
+            if conversations:
+                logger.info("Archived %d messages from %d conversations", messages, conversations)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Conversation archival failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,108 @@
+# app/services/birthdays.py
+from bisect import bisect_left, bisect_right
+from calendar import isleap
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.cache import TTLCache
+
+FEB_29 = 60  # day-of-year of Feb 29 in a leap year
+
+# One sorted index for everyone; dropped whenever a user's name or birthday changes.
+# The TTL bounds staleness on other workers.
+birthday_cache = TTLCache(ttl=3600)
+
+
+_MONTH_START = [0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]  # days before each month, leap year
+
+
+def _day_key(month: int, day: int) -> int:
+    """Day of year in a leap year, so every (month, day) incl. Feb 29 has a fixed slot."""
+    return _MONTH_START[month] + day
+
+
+def _search_key(day: date, upper: bool = False) -> int:
+    key = _day_key(day.month, day.day)
+    if upper and not isleap(day.year) and key == FEB_29 - 1:
+        return FEB_29  # Feb 29 birthdays are celebrated on Feb 28 in common years
+    return key
+
+
+class BirthdayIndex:
+    """
+    Active users' birthdays sorted by leap-year day of year. Feb 29 sits right
+    after Feb 28, so mapping it to Feb 28 in common years keeps the order and
+    every lookup is a bisect plus a walk over the matches.
+    """
+
+    def __init__(self, rows: List[dict]):
+        keyed = sorted(
+            ((_day_key(r["date_of_birth"].month, r["date_of_birth"].day), r["user_id"], r) for r in rows),
+            key=lambda k: k[:2]
+        )
+        self.keys = [key for key, _, _ in keyed]
+        self.entries = [entry for _, _, entry in keyed]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _occurrence(dob: date, year: int) -> date:
+        if dob.month == 2 and dob.day == 29 and not isleap(year):
+            return date(year, 2, 28)
+        return date(year, dob.month, dob.day)
+
+    def _entry(self, index: int, year: int, today: date) -> dict:
+        entry = self.entries[index]
+        birthday = self._occurrence(entry["date_of_birth"], year)
+        return {**entry, "birthday": birthday, "days_until": (birthday - today).days}
+
+    def next_birthday(self, today: date) -> Optional[dict]:
+        """The first birthday on or after ``today`` (wrapping into next year)."""
+        if not self.entries:
+            return None
+        i = bisect_left(self.keys, _search_key(today))
+        if i < len(self.entries):
+            return self._entry(i, today.year, today)
+        return self._entry(0, today.year + 1, today)
+
+    def upcoming(self, today: date, days: int) -> List[dict]:
+        """Birthdays from ``today`` through ``today + days``, soonest first; each person once."""
+        if not self.entries:
+            return []
+        end = today + timedelta(days=min(days, 365))
+        start = bisect_left(self.keys, _search_key(today))
+        if end.year == today.year:
+            stop = bisect_right(self.keys, _search_key(end, upper=True))
+            return [self._entry(i, today.year, today) for i in range(start, stop)]
+
+        # Wraps past New Year: the rest of this year, then next year up to ``end``
+        stop = bisect_right(self.keys, _search_key(end, upper=True))
+        result = [self._entry(i, today.year, today) for i in range(start, len(self.entries))]
+        result += [self._entry(i, end.year, today) for i in range(0, min(stop, start))]
+        return result
+
+
+async def _build_index(db: AsyncSession) -> BirthdayIndex:
+    result = await db.execute(
+        select(User.id, User.name, User.email, User.date_of_birth)
+        .where(User.date_of_birth.is_not(None))
+        .where(User.is_active.is_not(False))
+    )
+    rows = [
+        {"user_id": r.id, "name": r.name or r.email.split("@")[0], "date_of_birth": r.date_of_birth}
+        for r in result
+    ]
+    return BirthdayIndex(rows)
+
+
+async def get_birthday_index(db: AsyncSession) -> BirthdayIndex:
+    return await birthday_cache.get_or_compute("index", lambda: _build_index(db))
+
+
+def invalidate_birthdays() -> None:
+    birthday_cache.invalidate("index")
@@ -0,0 +1,85 @@
+# app/services/cache.py
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small in-process cache with a per-entry TTL and single-flight loading:
+    concurrent callers asking for the same missing key share one computation.
+    A ``ttl`` of None keeps entries until they are invalidated.
+    """
+
+    def __init__(self, ttl: Optional[float] = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[Optional[float], Any]] = {}  # key -> (expires_at, value)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = ...) -> None:
+        ttl = self.ttl if ttl is ... else ttl
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Drop the oldest insertion; good enough for the handful of keys we keep
+            self._entries.pop(next(iter(self._entries)))
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (expires_at, value)
+
+    def invalidate(self, key: Hashable = ...) -> None:
+        # Also detach in-flight loads: they may have read the old value, so their
+        # result must not be cached and later callers must not join them
+        if key is ...:
+            self._entries.clear()
+            self._inflight.clear()
+        else:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]], ttl: Optional[float] = ...
+    ) -> Any:
+        missing = object()
+        while True:
+            value = self.get(key, missing)
+            if value is not missing:
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled, not the leader
+                # The leader was cancelled (e.g. its client went away): retry, the first one through leads
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved so nobody-waiting doesn't warn
+            raise
+        else:
+            if self._inflight.get(key) is future:  # not invalidated while loading
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,296 @@
+# app/services/chat_hub.py
+"""
+In-process pub/sub for real-time chat delivery.
+
+Each WebSocket gets a ``ChatConnection`` with a bounded send queue. Publishing
+never awaits a client: events are ``put_nowait`` onto every subscriber's queue,
+and a connection whose queue is full is evicted (closed with 1013) instead of
+slowing the publisher down.
+
+With several workers, a broker bridges hubs: every local publish and
+membership change is forwarded, and events from other workers are delivered
+to local connections. ``PostgresBroker`` uses LISTEN/NOTIFY on the existing
+database; ``LocalBroker`` is an in-process stand-in for tests and single-host
+experiments. Other real-time channels (see ``app.services.notifications``) can
+``tap`` the hub to see every chat event and membership change, and send their
+own payloads across workers with ``publish_notification``.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "chat_events"
+NOTIFY_PAYLOAD_LIMIT = 7900  # Postgres caps NOTIFY payloads at 8000 bytes
+MEMBERSHIP_BATCH_SIZE = 500  # user ids per join envelope; keeps it under the NOTIFY cap
+
+
+class ChatConnection:
+    """One connected client: its user, subscribed conversations and send queue."""
+
+    def __init__(self, user_id: int, queue_size: int = 256):
+        self.user_id = user_id
+        self.conversations: Set[int] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = asyncio.Event()
+
+    def offer(self, event: dict) -> bool:
+        """Queue an event without waiting; False means the client fell behind."""
+        if self.evicted.is_set():
+            return False
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.evicted.set()
+            return False
+        return True
+
+
+Handler = Callable[[str], Awaitable[None]]
+
+
+class LocalBroker:
+    """In-process stand-in for a message broker: every subscriber sees every publish."""
+
+    def __init__(self):
+        self._handlers: List[Handler] = []
+
+    async def start(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    async def publish(self, payload: str) -> None:
+        for handler in list(self._handlers):
+            await handler(payload)
+
+    async def stop(self) -> None:
+        self._handlers.clear()
+
+
+class PostgresBroker:
+    """LISTEN/NOTIFY on the application database; no extra infrastructure."""
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._listen_conn = None
+        self._notify_conn = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, handler: Handler) -> None:
+        import asyncpg
+
+        def on_notify(connection, pid, channel, payload):
+            asyncio.get_running_loop().create_task(handler(payload))
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._notify_conn = await asyncpg.connect(self.dsn)
+        await self._listen_conn.add_listener(CHANNEL, on_notify)
+
+    async def publish(self, payload: str) -> None:
+        async with self._lock:
+            await self._notify_conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+
+    async def stop(self) -> None:
+        for conn in (self._listen_conn, self._notify_conn):
+            if conn is not None:
+                await conn.close()
+        self._listen_conn = self._notify_conn = None
+
+
+class ChatHub:
+    """
+    Routes chat events to connected clients by conversation.
+
+    ``publish`` delivers to local subscribers first, then forwards to the
+    broker (if any); events that come back from the broker with this hub's
+    origin are ignored, so each worker delivers every event exactly once.
+    Events too large for the broker are forwarded as a message reference and
+    re-loaded by the receiving worker via ``loader``.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        self.broker = None
+        self.loader: Optional[Callable[[int], Awaitable[Optional[dict]]]] = None
+        self._by_conversation: Dict[int, Set[ChatConnection]] = defaultdict(set)
+        self._by_user: Dict[int, Set[ChatConnection]] = defaultdict(set)
+        self._membership_listeners: List[Callable[[int, int], None]] = []
+        self._taps: List[Callable[[str, Optional[int], object], None]] = []
+        self._listeners: List[Callable[[int], bool]] = []
+        self.evictions = 0
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(conns) for conns in self._by_user.values())
+
+    def on_membership_change(self, callback: Callable[[int, int], None]) -> None:
+        """Call ``callback(conversation_id, user_id)`` when another worker adds or removes a participant."""
+        self._membership_listeners.append(callback)
+
+    def tap(self, callback: Callable[[str, Optional[int], object], None]) -> None:
+        """
+        Call ``callback(kind, conversation_id, payload)`` for everything this hub
+        sees, local or from other workers: ("event", conv, event),
+        ("join" | "leave", conv, user_id) and ("notify", None, payload).
+        """
+        self._taps.append(callback)
+
+    def listen_for(self, predicate: Callable[[int], bool]) -> None:
+        """
+        Treat a conversation as having subscribers here while ``predicate(conversation_id)``
+        is true, for taps that serve clients of their own: events another worker
+        forwarded by reference are then loaded for them too.
+        """
+        self._listeners.append(predicate)
+
+    def has_subscribers(self, conversation_id: int) -> bool:
+        return conversation_id in self._by_conversation or any(p(conversation_id) for p in self._listeners)
+
+    def connect(self, user_id: int, conversation_ids: Iterable[int]) -> ChatConnection:
+        conn = ChatConnection(user_id, self.queue_size)
+        self._by_user[user_id].add(conn)
+        for conv_id in conversation_ids:
+            conn.conversations.add(conv_id)
+            self._by_conversation[conv_id].add(conn)
+        return conn
+
+    def disconnect(self, conn: ChatConnection) -> None:
+        for conv_id in conn.conversations:
+            subscribers = self._by_conversation.get(conv_id)
+            if subscribers is not None:
+                subscribers.discard(conn)
+                if not subscribers:
+                    del self._by_conversation[conv_id]
+        conn.conversations.clear()
+        users = self._by_user.get(conn.user_id)
+        if users is not None:
+            users.discard(conn)
+            if not users:
+                del self._by_user[conn.user_id]
+
+    async def publish(self, conversation_id: int, event: dict) -> None:
+        self._deliver(conversation_id, event)
+        await self._forward({"kind": "event", "conversation_id": conversation_id, "event": event})
+
+    async def join(self, conversation_id: int, user_id: int) -> None:
+        """Subscribe a user's open connections to a conversation they were added to."""
+        await self.join_many(conversation_id, [user_id])
+
+    async def join_many(self, conversation_id: int, user_ids: Iterable[int]) -> None:
+        """``join`` for many users, forwarded in a few batched envelopes instead of one per user."""
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            self._join(conversation_id, user_id)
+        for i in range(0, len(user_ids), MEMBERSHIP_BATCH_SIZE):
+            await self._forward({
+                "kind": "join", "conversation_id": conversation_id,
+                "user_ids": user_ids[i:i + MEMBERSHIP_BATCH_SIZE],
+            })
+
+    async def leave(self, conversation_id: int, user_id: int) -> None:
+        """Stop delivering a conversation to a user who was removed from it."""
+        self._leave(conversation_id, user_id)
+        await self._forward({"kind": "leave", "conversation_id": conversation_id, "user_id": user_id})
+
+    async def publish_notification(self, payload: dict) -> None:
+        """Hand a non-chat payload to every worker's taps (this one included)."""
+        self._tap("notify", None, payload)
+        await self._forward({"kind": "notify", "conversation_id": None, "payload": payload})
+
+    async def start(self, broker=None, loader=None) -> None:
+        self.broker = broker
+        self.loader = loader
+        if broker is not None:
+            await broker.start(self._on_broker_message)
+
+    async def stop(self) -> None:
+        if self.broker is not None:
+            await self.broker.stop()
+            self.broker = None
+        for conns in list(self._by_user.values()):
+            for conn in list(conns):
+                conn.evicted.set()
+                self.disconnect(conn)
+
+    def _tap(self, kind: str, conversation_id: Optional[int], payload) -> None:
+        for callback in self._taps:
+            try:
+                callback(kind, conversation_id, payload)
+            except Exception:
+                logger.exception("Chat hub tap failed")
+
+    def _deliver(self, conversation_id: int, event: dict) -> None:
+        self._tap("event", conversation_id, event)
+        for conn in list(self._by_conversation.get(conversation_id, ())):
+            if not conn.offer(event):
+                # Slow consumer: drop it so it can't hold everyone else back
+                self.evictions += 1
+                self.disconnect(conn)
+
+    def _join(self, conversation_id: int, user_id: int) -> None:
+        self._tap("join", conversation_id, user_id)
+        for conn in self._by_user.get(user_id, ()):
+            conn.conversations.add(conversation_id)
+            self._by_conversation[conversation_id].add(conn)
+
+    def _leave(self, conversation_id: int, user_id: int) -> None:
+        self._tap("leave", conversation_id, user_id)
+        subscribers = self._by_conversation.get(conversation_id)
+        for conn in self._by_user.get(user_id, ()):
+            conn.conversations.discard(conversation_id)
+            if subscribers is not None:
+                subscribers.discard(conn)
+        if subscribers is not None and not subscribers:
+            del self._by_conversation[conversation_id]
+
+    async def _forward(self, envelope: dict) -> None:
+        if self.broker is None:
+            return
+        envelope["origin"] = self.origin
+        payload = json.dumps(envelope, default=str)
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT and envelope["kind"] == "event":
+            envelope["event"] = {"type": envelope["event"]["type"], "ref": envelope["event"]["id"]}
+            payload = json.dumps(envelope, default=str)
+        try:
+            await self.broker.publish(payload)
+        except Exception:
+            logger.exception("Failed to forward chat event to broker")
+
+    async def _on_broker_message(self, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+            if envelope.get("origin") == self.origin:
+                return
+            conv_id = envelope["conversation_id"]
+            if envelope["kind"] == "notify":
+                self._tap("notify", None, envelope["payload"])
+                return
+            if envelope["kind"] in ("join", "leave"):
+                user_ids = envelope["user_ids"] if "user_ids" in envelope else [envelope["user_id"]]
+                for user_id in user_ids:
+                    for callback in self._membership_listeners:
+                        callback(conv_id, user_id)
+                    if envelope["kind"] == "join":
+                        self._join(conv_id, user_id)
+                    else:
+                        self._leave(conv_id, user_id)
+            elif envelope["kind"] == "event":
+                event = envelope["event"]
+                if "ref" in event:
+                    if self.loader is None or not self.has_subscribers(conv_id):
+                        return
+                    event = await self.loader(event["ref"])
+                    if event is None:
+                        return
+                self._deliver(conv_id, event)
+        except Exception:
+            logger.exception("Bad chat event from broker")
+
+
+chat_hub = ChatHub(queue_size=settings.CHAT_WS_QUEUE_SIZE)
@@ -0,0 +1,236 @@
+# app/services/counters.py
+"""
+Incremental per-user monthly performance counters.
+
+Routes call ``bump_counters`` / ``apply_counter_deltas`` before they commit, so
+the counters move in the same transaction as the report, check-in, completion
+or rating that caused them. ``reconcile_counters`` rebuilds them from the
+source tables and reports drift:
+
+    python -m app.services.counters --month 10 --year 2026 [--dry-run]
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select, func, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.attendance import Attendance
+from app.models.performance import PerformanceCounter, PerformanceScore
+from app.models.report import DailyReport
+from app.models.task import Task
+from app.services.performance import month_bounds, UPSERT_BATCH_SIZE
+from app.services.trend import invalidate_closed_months
+
+COUNTER_FIELDS = ("reports_submitted", "days_present", "tasks_completed", "rating_sum", "rating_count")
+
+
+def _month_of(when: datetime) -> Tuple[int, int]:
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    return when.month, when.year
+
+
+def rating_delta(user_id: int, completed_at: datetime, old_rating: Optional[int], new_rating: int) -> dict:
+    """Counter change for (re-)rating a task; a re-rate only moves the sum."""
+    return {
+        "user_id": user_id,
+        "when": completed_at,
+        "rating_sum": new_rating - (old_rating or 0),
+        "rating_count": 0 if old_rating is not None else 1,
+    }
+
+
+def completion_deltas(
+    user_id: int, rating: Optional[int], old_completed_at: Optional[datetime], new_completed_at: Optional[datetime]
+) -> List[dict]:
+    """Move a task's completion (and its rating, if any) from one month to another."""
+    if old_completed_at == new_completed_at:
+        return []
+
+    def contribution(when: datetime, sign: int) -> dict:
+        return {
+            "user_id": user_id,
+            "when": when,
+            "tasks_completed": sign,
+            "rating_sum": sign * (rating or 0),
+            "rating_count": sign if rating is not None else 0,
+        }
+
+    deltas = []
+    if old_completed_at is not None:
+        deltas.append(contribution(old_completed_at, -1))
+    if new_completed_at is not None:
+        deltas.append(contribution(new_completed_at, 1))
+    return deltas
+
+
+async def _mark_closed_months_stale(db: AsyncSession, keys: List[Tuple[int, int, int]]) -> None:
+    """
+    Counters of a month that has already ended changed: its stored scores are
+    no longer final, and its cached trend points go once the caller commits.
+    """
+    current_month, current_year = _month_of(datetime.now(timezone.utc))
+    closed = [key for key in keys if (key[2], key[1]) < (current_year, current_month)]
+    if not closed:
+        return
+    key = tuple_(PerformanceScore.user_id, PerformanceScore.month, PerformanceScore.year)
+    for i in range(0, len(closed), UPSERT_BATCH_SIZE):
+        await db.execute(
+            update(PerformanceScore)
+            .where(key.in_(closed[i:i + UPSERT_BATCH_SIZE]))
+            .values(computed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    event.listen(db.sync_session, "after_commit", lambda session: invalidate_closed_months(closed), once=True)
+
+
+async def apply_counter_deltas(db: AsyncSession, deltas: List[dict]) -> None:
+    """
+    Add many deltas (``{"user_id", "when", <counter>: n, ...}``) with one
+    INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col per batch.
+    Does not commit — the caller's transaction owns the change.
+
+    Deltas for months that have already ended (a late rating, a re-opened
+    task) also mark those months' scores stale.
+    """
+    totals: Dict[Tuple[int, int, int], Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for delta in deltas:
+        month, year = _month_of(delta["when"])
+        row = totals[(delta["user_id"], month, year)]
+        for field in COUNTER_FIELDS:
+            row[field] += delta.get(field, 0)
+
+    rows = [
+        {"user_id": user_id, "month": month, "year": year, **counts}
+        for (user_id, month, year), counts in totals.items()
+    ]
+    table = PerformanceCounter.__table__
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = pg_insert(PerformanceCounter).values(rows[i:i + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_counter_user_month_year",
+            set_={field: table.c[field] + stmt.excluded[field] for field in COUNTER_FIELDS},
+        )
+        await db.execute(stmt)
+    await _mark_closed_months_stale(db, list(totals))
+
+
+async def bump_counters(db: AsyncSession, user_id: int, when: datetime, **deltas: int) -> None:
+    await apply_counter_deltas(db, [{"user_id": user_id, "when": when, **deltas}])
+
+
+async def count_from_source(db: AsyncSession, month: int, year: int) -> Dict[int, Dict[str, int]]:
+    """Authoritative counters for a month, one grouped query per source table."""
+    start, end = month_bounds(month, year)
+    counts: Dict[int, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    reports = await db.execute(
+        select(DailyReport.user_id, func.count(DailyReport.id))
+        .where(DailyReport.created_at >= start)
+        .where(DailyReport.created_at < end)
+        .group_by(DailyReport.user_id)
+    )
+    for user_id, n in reports:
+        counts[user_id]["reports_submitted"] = n
+
+    attendance = await db.execute(
+        select(Attendance.user_id, func.count(Attendance.id))
+        .where(func.date(Attendance.check_in_at) >= start.date())
+        .where(func.date(Attendance.check_in_at) < end.date())
+        .group_by(Attendance.user_id)
+    )
+    for user_id, n in attendance:
+        counts[user_id]["days_present"] = n
+
+    tasks = await db.execute(
+        select(
+            Task.assigned_to_id,
+            func.count(Task.id),
+            func.coalesce(func.sum(Task.rating), 0),
+            func.count(Task.rating),
+        )
+        .where(Task.completed_at >= start)
+        .where(Task.completed_at < end)
+        .group_by(Task.assigned_to_id)
+    )
+    for user_id, completed, rating_sum, rating_count in tasks:
+        counts[user_id]["tasks_completed"] = completed
+        counts[user_id]["rating_sum"] = int(rating_sum)
+        counts[user_id]["rating_count"] = rating_count
+
+    return counts
+
+
+async def reconcile_counters(db: AsyncSession, month: int, year: int, dry_run: bool = False) -> List[dict]:
+    """
+    Rebuild a month's counters from the source tables. Returns one entry per
+    user whose stored counters differed, with the stored and actual values.
+
+    Runs as one transaction holding a SHARE ROW EXCLUSIVE lock on the counters
+    table: routes bump counters in the same transaction as the source write,
+    so a bump either committed before the lock (and its source row is counted)
+    or waits for the rebuild to commit and then applies on top of it. Without
+    the lock a concurrent bump could be overwritten by the stale rebuild.
+    """
+    await db.execute(text("LOCK TABLE performance_counters IN SHARE ROW EXCLUSIVE MODE"))
+    actual = await count_from_source(db, month, year)
+
+    stored_result = await db.execute(
+        select(PerformanceCounter)
+        .where(PerformanceCounter.month == month)
+        .where(PerformanceCounter.year == year)
+    )
+    stored = {
+        c.user_id: {field: getattr(c, field) for field in COUNTER_FIELDS}
+        for c in stored_result.scalars()
+    }
+
+    zero = dict.fromkeys(COUNTER_FIELDS, 0)
+    drift = []
+    for user_id in sorted(set(actual) | set(stored)):
+        was = stored.get(user_id, zero)
+        now = actual.get(user_id, zero)
+        if was != now:
+            drift.append({"user_id": user_id, "stored": was, "actual": now})
+
+    if drift and not dry_run:
+        rows = [{"user_id": d["user_id"], "month": month, "year": year, **d["actual"]} for d in drift]
+        for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+            stmt = pg_insert(PerformanceCounter).values(rows[i:i + UPSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_counter_user_month_year",
+                set_={field: stmt.excluded[field] for field in COUNTER_FIELDS},
+            )
+            await db.execute(stmt)
+        await _mark_closed_months_stale(db, [(d["user_id"], month, year) for d in drift])
+        await db.commit()
+    else:
+        await db.rollback()  # release the lock
+
+    return drift
+
+
+async def _main(month: int, year: int, dry_run: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        drift = await reconcile_counters(db, month, year, dry_run=dry_run)
+    for d in drift:
+        changed = {f: (d["stored"][f], d["actual"][f]) for f in COUNTER_FIELDS if d["stored"][f] != d["actual"][f]}
+        print(f"user {d['user_id']}: " + ", ".join(f"{f} {a} -> {b}" for f, (a, b) in changed.items()))
+    action = "found" if dry_run else "fixed"
+    print(f"{len(drift)} user(s) with drift {action} for {month:02d}/{year}")
+
+
+if __name__ == "__main__":
+    now = datetime.now(timezone.utc)
+    parser = argparse.ArgumentParser(description="Rebuild performance counters from source tables")
+    parser.add_argument("--month", type=int, default=now.month)
+    parser.add_argument("--year", type=int, default=now.year)
+    parser.add_argument("--dry-run", action="store_true", help="only report drift")
+    args = parser.parse_args()
+    asyncio.run(_main(args.month, args.year, args.dry_run))
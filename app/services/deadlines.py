@@ -0,0 +1,225 @@
+# app/services/deadlines.py
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update
+
+from app.database import AsyncSessionLocal
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of open task deadlines.
+
+    Tasks are flipped to ``is_overdue`` exactly when their deadline passes and an
+    overdue event is published to subscribers. ``overdue_count`` is maintained in
+    memory so dashboards don't have to scan the tasks table. The heap is reloaded
+    from the database every ``resync_seconds`` to pick up changes made by other
+    processes and to correct any drift.
+    """
+
+    def __init__(self, resync_seconds: int = 300):
+        self.resync_seconds = resync_seconds
+        self._heap: List[Tuple[datetime, int, int]] = []  # (deadline, task_id, assigned_to_id)
+        self._open: Dict[int, datetime] = {}  # task_id -> live deadline (stale heap entries are skipped)
+        self._overdue: Set[int] = set()
+        self._listeners: List[Callable[[dict], None]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._loaded_at: Optional[datetime] = None
+        self._during_load: Optional[List[Tuple[Callable, tuple]]] = None  # calls to replay over the snapshot
+
+    def _defer(self, method: Callable, *args) -> None:
+        if self._during_load is not None:
+            self._during_load.append((method, args))
+
+    @property
+    def overdue_count(self) -> int:
+        return len(self._overdue)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        self._listeners.append(callback)
+
+    def schedule(self, task_id: int, deadline: datetime, assigned_to_id: int) -> None:
+        """Track a new or re-opened task. Past deadlines fire on the next tick."""
+        self._defer(self.schedule, task_id, deadline, assigned_to_id)
+        deadline = _as_utc(deadline)
+        self._overdue.discard(task_id)
+        self._open[task_id] = deadline
+        heapq.heappush(self._heap, (deadline, task_id, assigned_to_id))
+        if self._wakeup is not None and self._heap[0][1] == task_id:
+            self._wakeup.set()
+
+    def mark_overdue(self, task_id: int) -> None:
+        """Track a re-opened task whose deadline had already passed as overdue, without a new event."""
+        self._defer(self.mark_overdue, task_id)
+        self._open.pop(task_id, None)
+        self._overdue.add(task_id)
+
+    def complete(self, task_id: int) -> None:
+        """Stop tracking a task (completed); the heap entry is dropped lazily."""
+        self._defer(self.complete, task_id)
+        self._open.pop(task_id, None)
+        self._overdue.discard(task_id)
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        await self.load()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def load(self) -> None:
+        """
+        Rebuild the heap and overdue set from the tasks table. Tasks scheduled,
+        completed or marked overdue while the snapshot is read are re-applied
+        on top of it, so they aren't lost until the next resync.
+        """
+        now = datetime.now(timezone.utc)
+        self._during_load = []
+        try:
+            snapshot = await self._read_snapshot(now)
+        except BaseException:
+            self._during_load = None
+            raise
+        overdue_ids, rows = snapshot
+
+        changes, self._during_load = self._during_load, None
+        self._overdue = overdue_ids
+        self._heap = [(_as_utc(r.deadline), r.id, r.assigned_to_id) for r in rows]
+        heapq.heapify(self._heap)
+        self._open = {task_id: deadline for deadline, task_id, _ in self._heap}
+        self._loaded_at = now
+        for method, args in changes:
+            method(*args)
+
+    async def _read_snapshot(self, now: datetime) -> Tuple[Set[int], list]:
+        async with AsyncSessionLocal() as db:
+            # Catch up on anything that expired while no scheduler was running
+            await db.execute(
+                update(Task)
+                .where(Task.status != "completed")
+                .where(Task.deadline <= now)
+                .where(Task.is_overdue.is_(False))
+                .values(is_overdue=True)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+            overdue = await db.execute(select(Task.id).where(Task.is_overdue.is_(True)))
+            open_tasks = await db.execute(
+                select(Task.id, Task.deadline, Task.assigned_to_id)
+                .where(Task.status != "completed")
+                .where(Task.is_overdue.is_(False))
+            )
+            return set(overdue.scalars().all()), open_tasks.all()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                timeout = float(self.resync_seconds)
+                if self._heap:
+                    timeout = min(timeout, max((self._heap[0][0] - now).total_seconds(), 0.0))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                if (datetime.now(timezone.utc) - self._loaded_at).total_seconds() >= self.resync_seconds:
+                    await self.load()
+                await self._expire_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Deadline scheduler tick failed")
+                await asyncio.sleep(1)
+
+    async def _expire_due(self) -> None:
+        now = datetime.now(timezone.utc)
+        due = {}
+        while self._heap and self._heap[0][0] <= now:
+            deadline, task_id, assigned_to_id = heapq.heappop(self._heap)
+            if self._open.get(task_id) != deadline:
+                continue  # completed or rescheduled since it was pushed
+            due[task_id] = (deadline, assigned_to_id)
+
+        if not due:
+            return
+
+        # Tasks stay in _open until the write commits, so a failed write can put them back.
+        # Every worker tracks every open task: only the one whose UPDATE flips the flag
+        # publishes the event, the others just count the task as overdue.
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(Task)
+                    .where(Task.id.in_(list(due)))
+                    .where(Task.status != "completed")
+                    .where(Task.is_overdue.is_(False))
+                    .values(is_overdue=True)
+                    .returning(Task.id)
+                    .execution_options(synchronize_session=False)
+                )
+                flipped = result.scalars().all()
+                already = []
+                others = list(set(due) - set(flipped))
+                if others:
+                    result = await db.execute(
+                        select(Task.id)
+                        .where(Task.id.in_(others))
+                        .where(Task.status != "completed")
+                        .where(Task.is_overdue.is_(True))
+                    )
+                    already = result.scalars().all()
+                await db.commit()
+        except BaseException:
+            for task_id, (deadline, assigned_to_id) in due.items():
+                if self._open.get(task_id) == deadline:  # not completed or rescheduled meanwhile
+                    heapq.heappush(self._heap, (deadline, task_id, assigned_to_id))
+            raise
+
+        for task_id, (deadline, _) in due.items():
+            if self._open.get(task_id) == deadline:
+                del self._open[task_id]
+
+        self._overdue.update(already)
+        for task_id in flipped:
+            self._overdue.add(task_id)
+            deadline, assigned_to_id = due[task_id]
+            self._publish({
+                "type": "task_overdue",
+                "task_id": task_id,
+                "assigned_to_id": assigned_to_id,
+                "deadline": deadline.isoformat(),
+            })
+
+    def _publish(self, event: dict) -> None:
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Overdue event listener failed")
+
+
+deadline_scheduler = DeadlineScheduler()
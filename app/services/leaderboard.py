@@ -0,0 +1,108 @@
+# app/services/leaderboard.py
+from bisect import bisect_left, bisect_right
+from statistics import mean, median
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.performance import PerformanceScore
+from app.models.user import User
+from app.services.cache import TTLCache
+
+HISTOGRAM_BUCKETS = 10  # 0–10, 10–20, ... 90–100
+
+# One sorted snapshot per (month, year); dropped whenever scores are re-materialized
+leaderboard_cache = TTLCache(ttl=300)
+
+
+class LeaderboardSnapshot:
+    """
+    Materialized scores for one month, sorted once. Ranks use competition
+    ranking (ties share a rank); percentile is the share of staff scoring
+    strictly lower. Single-user lookups bisect the sorted score column.
+    """
+
+    def __init__(self, month: int, year: int, rows: List[dict]):
+        self.month = month
+        self.year = year
+        self.entries = sorted(rows, key=lambda r: (-r["score"], r["user_id"]))
+        self.ascending = [r["score"] for r in reversed(self.entries)]
+        self.scores: Dict[int, float] = {r["user_id"]: r["score"] for r in self.entries}
+
+        # Rank/percentile for every entry in one pass over the sorted column
+        for i, entry in enumerate(self.entries):
+            if i and entry["score"] == self.entries[i - 1]["score"]:
+                entry["rank"] = self.entries[i - 1]["rank"]
+                entry["percentile"] = self.entries[i - 1]["percentile"]
+            else:
+                entry["rank"] = i + 1
+                entry["percentile"] = self.percentile_of(entry["score"])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def rank_of(self, score: float) -> int:
+        return len(self.ascending) - bisect_right(self.ascending, score) + 1
+
+    def percentile_of(self, score: float) -> float:
+        if not self.ascending:
+            return 0.0
+        return round(bisect_left(self.ascending, score) / len(self.ascending) * 100, 2)
+
+    def standing(self, user_id: int) -> Optional[dict]:
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return {
+            "user_id": user_id,
+            "score": round(score, 2),
+            "rank": self.rank_of(score),
+            "percentile": self.percentile_of(score),
+            "total": len(self.ascending),
+        }
+
+    def distribution(self) -> dict:
+        if not self.ascending:
+            return {"count": 0, "histogram": [0] * HISTOGRAM_BUCKETS}
+
+        width = 100 / HISTOGRAM_BUCKETS
+        histogram = [0] * HISTOGRAM_BUCKETS
+        for score in self.ascending:
+            histogram[min(int(score // width), HISTOGRAM_BUCKETS - 1)] += 1
+
+        def quantile(q: float) -> float:
+            return round(self.ascending[min(int(q * len(self.ascending)), len(self.ascending) - 1)], 2)
+
+        return {
+            "count": len(self.ascending),
+            "min": round(self.ascending[0], 2),
+            "max": round(self.ascending[-1], 2),
+            "mean": round(mean(self.ascending), 2),
+            "median": round(median(self.ascending), 2),
+            "p25": quantile(0.25),
+            "p75": quantile(0.75),
+            "histogram": histogram,
+        }
+
+
+async def _build_snapshot(db: AsyncSession, month: int, year: int) -> LeaderboardSnapshot:
+    result = await db.execute(
+        select(PerformanceScore.user_id, User.name, PerformanceScore.score)
+        .join(User, User.id == PerformanceScore.user_id)
+        .where(User.role == "staff")
+        .where(PerformanceScore.month == month)
+        .where(PerformanceScore.year == year)
+    )
+    rows = [{"user_id": r.user_id, "name": r.name, "score": r.score} for r in result]
+    return LeaderboardSnapshot(month, year, rows)
+
+
+async def get_leaderboard(db: AsyncSession, month: int, year: int) -> LeaderboardSnapshot:
+    return await leaderboard_cache.get_or_compute(
+        (month, year), lambda: _build_snapshot(db, month, year)
+    )
+
+
+def invalidate_leaderboard(month: int, year: int) -> None:
+    leaderboard_cache.invalidate((month, year))
@@ -0,0 +1,52 @@
+# app/services/membership.py
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.message import ConversationParticipant
+from app.services.cache import TTLCache
+from app.services.chat_hub import chat_hub
+
+# (conversation_id, user_id) -> Membership, or None for "never a participant".
+# Routes that change participants invalidate their entries; other workers hear
+# about it through the chat hub's broker, and the TTL bounds anything missed.
+# Without a broker nothing tells other workers, so entries only live a few
+# seconds: a removed participant must lose access almost at once everywhere.
+membership_cache = TTLCache(ttl=300, max_entries=100_000)
+MEMBERSHIP_TTL_WITHOUT_BROKER = 5
+
+
+class Membership(NamedTuple):
+    removed_at: Optional[datetime]
+
+    @property
+    def active(self) -> bool:
+        return self.removed_at is None
+
+
+async def _load_membership(db: AsyncSession, conversation_id: int, user_id: int) -> Optional[Membership]:
+    result = await db.execute(
+        select(ConversationParticipant.removed_at)
+        .where(ConversationParticipant.conversation_id == conversation_id)
+        .where(ConversationParticipant.user_id == user_id)
+    )
+    row = result.first()
+    return Membership(removed_at=row.removed_at) if row else None
+
+
+async def get_membership(db: AsyncSession, conversation_id: int, user_id: int) -> Optional[Membership]:
+    """The user's participation in a conversation (active or removed), or None."""
+    key = (conversation_id, user_id)
+    ttl = ... if chat_hub.broker is not None else MEMBERSHIP_TTL_WITHOUT_BROKER
+    return await membership_cache.get_or_compute(
+        key, lambda: _load_membership(db, conversation_id, user_id), ttl=ttl
+    )
+
+
+def invalidate_membership(conversation_id: int, user_id: int) -> None:
+    membership_cache.invalidate((conversation_id, user_id))
+
+
+chat_hub.on_membership_change(invalidate_membership)
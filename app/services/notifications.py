@@ -0,0 +1,207 @@
+# app/services/notifications.py
+"""
+Per-user notification stream behind the SSE endpoint.
+
+Announcements (everyone), task assignments and overdue tasks (one user) and
+chat messages (a conversation's active participants) are numbered, kept in a
+bounded replay buffer for Last-Event-ID resumes, and pushed onto each
+subscriber's bounded queue. A subscriber that falls behind is evicted; its
+client reconnects with Last-Event-ID and replays what it missed.
+
+Everything arrives through ``chat_hub`` taps, so the hub's broker also carries
+announcements and task events to subscribers on other workers. Event ids are
+``<stream>-<seq>`` where the stream is unique per process: an id from another
+worker or before a restart can't be replayed and gets a "reset" event instead.
+"""
+import asyncio
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.services.chat_hub import chat_hub
+
+Audience = Tuple  # ("all",) | ("users", frozenset) | ("conversation", id)
+
+FAN_OUT_BATCH_SIZE = 100  # per-user entries per broker payload, well under the NOTIFY size cap
+
+
+class Subscriber:
+    """One open stream: its user, current conversations and send queue."""
+
+    def __init__(self, user_id: int, conversation_ids: Iterable[int], queue_size: int):
+        self.user_id = user_id
+        self.conversations: Set[int] = set(conversation_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = asyncio.Event()
+
+    def sees(self, audience: Audience) -> bool:
+        if audience[0] == "all":
+            return True
+        if audience[0] == "users":
+            return self.user_id in audience[1]
+        return audience[1] in self.conversations
+
+    def offer(self, event: dict) -> bool:
+        if self.evicted.is_set():
+            return False
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.evicted.set()
+            return False
+        return True
+
+
+class NotificationHub:
+    def __init__(self, replay_size: int = 1000, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.stream = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._replay: Deque[Tuple[int, Audience, dict]] = deque(maxlen=replay_size)
+        self._by_user: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self._by_conversation: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self.evictions = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._by_user.values())
+
+    def subscribe(self, user_id: int, conversation_ids: Iterable[int]) -> Subscriber:
+        sub = Subscriber(user_id, conversation_ids, self.queue_size)
+        self._by_user[user_id].add(sub)
+        for conversation_id in sub.conversations:
+            self._by_conversation[conversation_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subs = self._by_user.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._by_user[sub.user_id]
+        for conversation_id in sub.conversations:
+            self._unindex(conversation_id, sub)
+
+    def _unindex(self, conversation_id: int, sub: Subscriber) -> None:
+        subs = self._by_conversation.get(conversation_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._by_conversation[conversation_id]
+
+    async def publish(self, event_type: str, data: dict, user_ids: Optional[Iterable[int]] = None) -> None:
+        """Notify everyone, or only ``user_ids``, on every worker."""
+        await chat_hub.publish_notification({
+            "type": event_type,
+            "data": data,
+            "user_ids": sorted(set(user_ids)) if user_ids is not None else None,
+        })
+
+    async def publish_each(self, event_type: str, data: dict, per_user: List[Tuple[int, dict]]) -> None:
+        """
+        One event per ``(user_id, fields)`` entry, ``data`` plus that user's
+        fields, seen only by that user. Sent across workers in a few batched
+        payloads rather than one per user.
+        """
+        for i in range(0, len(per_user), FAN_OUT_BATCH_SIZE):
+            await chat_hub.publish_notification({
+                "type": event_type,
+                "data": data,
+                "per_user": [[user_id, fields] for user_id, fields in per_user[i:i + FAN_OUT_BATCH_SIZE]],
+            })
+
+    def has_conversation_listeners(self, conversation_id: int) -> bool:
+        return conversation_id in self._by_conversation
+
+    def replay(self, sub: Subscriber, last_event_id: str) -> Optional[List[dict]]:
+        """Events after ``last_event_id`` this subscriber may see; None if they are no longer buffered."""
+        stream, _, seq = last_event_id.partition("-")
+        if stream != self.stream or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._replay[0][0] if self._replay else self._seq + 1
+        if seq < oldest - 1:
+            return None
+        return [event for n, audience, event in self._replay if n > seq and sub.sees(audience)]
+
+    def event_seq(self, event: dict) -> int:
+        return int(event["id"].rpartition("-")[2])
+
+    def _record(self, audience: Audience, event_type: str, data: dict) -> None:
+        self._seq += 1
+        event = {"id": f"{self.stream}-{self._seq}", "type": event_type, "data": data}
+        self._replay.append((self._seq, audience, event))
+
+        if audience[0] == "users":
+            targets = [sub for user_id in audience[1] for sub in self._by_user.get(user_id, ())]
+        elif audience[0] == "conversation":
+            targets = list(self._by_conversation.get(audience[1], ()))
+        else:
+            targets = [sub for subs in self._by_user.values() for sub in subs]
+        for sub in targets:
+            if not sub.offer(event):
+                self.evictions += 1
+                self.unsubscribe(sub)
+
+    def _on_chat_hub(self, kind: str, conversation_id: Optional[int], payload) -> None:
+        if kind == "notify" and "per_user" in payload:
+            for user_id, fields in payload["per_user"]:
+                self._record(("users", frozenset((user_id,))), payload["type"], {**payload["data"], **fields})
+        elif kind == "notify":
+            user_ids = payload["user_ids"]
+            audience = ("all",) if user_ids is None else ("users", frozenset(user_ids))
+            self._record(audience, payload["type"], payload["data"])
+        elif kind == "event" and payload.get("type") == "message":
+            self._record(("conversation", conversation_id), "chat_message", payload)
+        elif kind == "join":
+            for sub in self._by_user.get(payload, ()):
+                sub.conversations.add(conversation_id)
+                self._by_conversation[conversation_id].add(sub)
+        elif kind == "leave":
+            for sub in self._by_user.get(payload, ()):
+                sub.conversations.discard(conversation_id)
+                self._unindex(conversation_id, sub)
+
+
+notification_hub = NotificationHub(replay_size=settings.SSE_REPLAY_SIZE, queue_size=settings.SSE_QUEUE_SIZE)
+chat_hub.tap(notification_hub._on_chat_hub)
+chat_hub.listen_for(notification_hub.has_conversation_listeners)
+
+
+async def notify_task_assigned(task_id: int, title: str, assigned_to_id: int, creator_id: int, deadline: datetime) -> None:
+    await notification_hub.publish(
+        "task_assigned",
+        {
+            "task_id": task_id,
+            "title": title,
+            "assigned_to_id": assigned_to_id,
+            "creator_id": creator_id,
+            "deadline": deadline.isoformat(),
+        },
+        user_ids=[assigned_to_id],
+    )
+
+
+async def notify_tasks_assigned(
+    assignments: List[Tuple[int, int]], title: str, creator_id: int, deadline: datetime
+) -> None:
+    """``task_assigned`` for each (task_id, assigned_to_id) created from one template, batched."""
+    await notification_hub.publish_each(
+        "task_assigned",
+        {"title": title, "creator_id": creator_id, "deadline": deadline.isoformat()},
+        [(user_id, {"task_id": task_id, "assigned_to_id": user_id}) for task_id, user_id in assignments],
+    )
+
+
+_pending_publishes: Set[asyncio.Task] = set()  # strong refs so in-flight publishes aren't collected
+
+
+def notify_task_overdue(event: dict) -> None:
+    """deadline_scheduler listener (sync): forward overdue events to the assignee."""
+    task = asyncio.get_running_loop().create_task(
+        notification_hub.publish("task_overdue", event, user_ids=[event["assigned_to_id"]])
+    )
+    _pending_publishes.add(task)
+    task.add_done_callback(_pending_publishes.discard)
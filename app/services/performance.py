@@ -1,18 +1,93 @@
-from datetime import datetime
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, true, event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.database import AsyncSessionLocal
+from app.config import settings
 from app.models.report import DailyReport
 from app.models.task import Task
 from app.models.attendance import Attendance
-from app.models.performance import PerformanceScore
+from app.models.performance import PerformanceScore, PerformanceCounter
+from app.models.user import User
+from app.services.leaderboard import invalidate_leaderboard
 
-async def get_report_consistency(db: AsyncSession, user_id: int, month: int, year: int) -> float:
-    """% of days with reports in the month (max 100%)"""
+logger = logging.getLogger(__name__)
+
+# Component weights; every scoring path goes through combine_score() so they can't drift
+DEFAULT_SCORE_WEIGHTS = {
+    "report_consistency": 0.35,
+    "task_score": 0.30,
+    "attendance_rate": 0.20,
+    "training_score": 0.10,
+    "achievement_count": 0.05,
+}
+ACHIEVEMENT_CAP = 20  # Cap at 20 → 100%
+DEFAULT_TRAINING_SCORE = 100.0  # until the trainings module exists
+DEFAULT_ACHIEVEMENT_COUNT = 0  # until the achievements module exists
+UPSERT_BATCH_SIZE = 2000  # keeps each statement well under asyncpg's 32k bind-parameter limit
+
+def resolve_weights(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Defaults with any overrides applied; unknown components or negative weights are rejected."""
+    overrides = overrides or {}
+    unknown = set(overrides) - set(DEFAULT_SCORE_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown performance components: {', '.join(sorted(unknown))}")
+    if any(w < 0 for w in overrides.values()):
+        raise ValueError("Performance weights must be non-negative")
+    return {**DEFAULT_SCORE_WEIGHTS, **overrides}
+
+SCORE_WEIGHTS = resolve_weights(settings.PERFORMANCE_WEIGHTS)
+
+def month_bounds(month: int, year: int) -> Tuple[datetime, datetime]:
     start = datetime(year, month, 1)
     if month == 12:
         end = datetime(year + 1, 1, 1)
     else:
         end = datetime(year, month + 1, 1)
+    return start, end
+
+def report_pct(submitted: int, total_days: int) -> float:
+    return min((submitted / total_days) * 100, 100.0)
+
+def task_pct(avg_rating) -> float:
+    # avg() comes back as Decimal (or None when nothing was rated)
+    return min(float(avg_rating or 0.0) * 20, 100.0)
+
+def attendance_pct(present: int, total_days: int) -> float:
+    return min((present / total_days) * 100, 100.0)
+
+def combine_score(
+    report: float, task: float, attendance: float, training: float, achievements: int,
+    weights: Optional[Dict[str, float]] = None
+) -> float:
+    weights = weights or SCORE_WEIGHTS
+    score = (
+        report * weights["report_consistency"] +
+        task * weights["task_score"] +
+        attendance * weights["attendance_rate"] +
+        training * weights["training_score"] +
+        min(achievements, ACHIEVEMENT_CAP) * weights["achievement_count"]
+    )
+    return min(score, 100.0)
+
+def score_breakdown(
+    report: float, task: float, attendance: float, training: float, achievements: int
+) -> dict:
+    return {
+        "score": combine_score(report, task, attendance, training, achievements),
+        "report_consistency": report,
+        "task_score": task,
+        "attendance_rate": attendance,
+        "training_score": training,
+        "achievement_count": achievements,
+    }
+
+async def get_report_consistency(db: AsyncSession, user_id: int, month: int, year: int) -> float:
+    """% of days with reports in the month (max 100%)"""
+    start, end = month_bounds(month, year)
 
     total_days = (end - start).days
     result = await db.execute(
@@ -22,14 +97,10 @@ async def get_report_consistency(db: AsyncSession, user_id: int, month: int, yea
         .where(DailyReport.created_at < end)
     )
     submitted = result.scalar_one()
-    return min((submitted / total_days) * 100, 100.0)
+    return report_pct(submitted, total_days)
 
 async def get_task_score(db: AsyncSession, user_id: int, month: int, year: int) -> float:
-    start = datetime(year, month, 1)
-    if month == 12:
-        end = datetime(year + 1, 1, 1)
-    else:
-        end = datetime(year, month + 1, 1)
+    start, end = month_bounds(month, year)
 
     result = await db.execute(
         select(func.avg(Task.rating))
@@ -39,22 +110,11 @@ async def get_task_score(db: AsyncSession, user_id: int, month: int, year: int)
         .where(Task.rating.isnot(None))
     )
     avg_rating = result.scalar_one()
-
-    # Convert Decimal to float or default to 0.0
-    if avg_rating is None:
-        avg_rating = 0.0
-    else:
-        avg_rating = float(avg_rating)
-
-    return min(avg_rating * 20, 100.0)
+    return task_pct(avg_rating)
 
 async def get_attendance_rate(db: AsyncSession, user_id: int, month: int, year: int) -> float:
     """% of workdays with check-in (assume all days are workdays)"""
-    start = datetime(year, month, 1)
-    if month == 12:
-        end = datetime(year + 1, 1, 1)
-    else:
-        end = datetime(year, month + 1, 1)
+    start, end = month_bounds(month, year)
 
     total_days = (end - start).days
     result = await db.execute(
@@ -64,30 +124,268 @@ async def get_attendance_rate(db: AsyncSession, user_id: int, month: int, year:
         .where(func.date(Attendance.check_in_at) < end.date())
     )
     present = result.scalar_one()
-    return min((present / total_days) * 100, 100.0)
+    return attendance_pct(present, total_days)
 
 async def get_training_score(db: AsyncSession, user_id: int, month: int, year: int) -> float:
     """Placeholder: return 100% for now"""
-    return 100.0  # Implement when trainings module exists
+    return DEFAULT_TRAINING_SCORE  # Implement when trainings module exists
 
 async def get_achievement_count(db: AsyncSession, user_id: int, month: int, year: int) -> int:
     """Placeholder: return 0 for now"""
-    return 0  # Implement when achievements module exists
+    return DEFAULT_ACHIEVEMENT_COUNT  # Implement when achievements module exists
+
+def counts_breakdown(counter: Optional[PerformanceCounter], total_days: int) -> dict:
+    """Breakdown from one counter row (None means no activity)."""
+    if counter is None:
+        return score_breakdown(0.0, 0.0, 0.0, DEFAULT_TRAINING_SCORE, DEFAULT_ACHIEVEMENT_COUNT)
+    avg_rating = counter.rating_sum / counter.rating_count if counter.rating_count else None
+    return score_breakdown(
+        report_pct(counter.reports_submitted, total_days),
+        task_pct(avg_rating),
+        attendance_pct(counter.days_present, total_days),
+        DEFAULT_TRAINING_SCORE,
+        DEFAULT_ACHIEVEMENT_COUNT,
+    )
+
+async def counter_breakdown(db: AsyncSession, user_id: int, month: int, year: int) -> dict:
+    """
+    Breakdown from the incrementally maintained counters: one unique-key
+    lookup instead of rescanning a month of reports, tasks and attendance.
+    Without a counter row (no activity yet, or a month the counters never
+    covered) it falls back to the single-query computation from source.
+    """
+    result = await db.execute(
+        select(PerformanceCounter)
+        .where(PerformanceCounter.user_id == user_id)
+        .where(PerformanceCounter.month == month)
+        .where(PerformanceCounter.year == year)
+    )
+    counter = result.scalar_one_or_none()
+    if counter is None:
+        return await calculate_performance_breakdown(db, user_id, month, year)
+
+    start, end = month_bounds(month, year)
+    return counts_breakdown(counter, (end - start).days)
 
 async def calculate_performance_score(
     db: AsyncSession, user_id: int, month: int, year: int
 ) -> float:
-    report = await get_report_consistency(db, user_id, month, year)
-    task = await get_task_score(db, user_id, month, year)
-    attendance = await get_attendance_rate(db, user_id, month, year)
-    training = await get_training_score(db, user_id, month, year)
-    achievements = await get_achievement_count(db, user_id, month, year)
+    breakdown = await counter_breakdown(db, user_id, month, year)
+    return breakdown["score"]
 
-    score = (
-        report * 0.35 +
-        task * 0.30 +
-        attendance * 0.20 +
-        training * 0.10 +
-        min(achievements, 20) * 0.05  # Cap at 20 → 100%
+async def calculate_performance_breakdown(
+    db: AsyncSession, user_id: int, month: int, year: int
+) -> dict:
+    """
+    On-demand score for one user in a single round-trip: each component is a
+    CTE and the three are cross-joined into one row. Same formulas and
+    weights as the counter-based breakdowns.
+    """
+    start, end = month_bounds(month, year)
+    total_days = (end - start).days
+
+    reports = (
+        select(func.count(DailyReport.id).label("submitted"))
+        .where(DailyReport.user_id == user_id)
+        .where(DailyReport.created_at >= start)
+        .where(DailyReport.created_at < end)
+        .cte("reports")
     )
-    return min(score, 100.0)
\ No newline at end of file
+    ratings = (
+        select(func.avg(Task.rating).label("avg_rating"))
+        .where(Task.assigned_to_id == user_id)
+        .where(Task.completed_at >= start)
+        .where(Task.completed_at < end)
+        .where(Task.rating.isnot(None))
+        .cte("ratings")
+    )
+    attendance = (
+        select(func.count(Attendance.id).label("present"))
+        .where(Attendance.user_id == user_id)
+        .where(func.date(Attendance.check_in_at) >= start.date())
+        .where(func.date(Attendance.check_in_at) < end.date())
+        .cte("attendance")
+    )
+    result = await db.execute(
+        select(reports.c.submitted, ratings.c.avg_rating, attendance.c.present)
+        .select_from(reports)
+        .join(ratings, true())
+        .join(attendance, true())
+    )
+    row = result.one()
+
+    return score_breakdown(
+        report_pct(row.submitted, total_days),
+        task_pct(row.avg_rating),
+        attendance_pct(row.present, total_days),
+        DEFAULT_TRAINING_SCORE,
+        DEFAULT_ACHIEVEMENT_COUNT,
+    )
+
+# ---- Batch (org-wide) computation ----
+
+async def compute_org_components(db: AsyncSession, month: int, year: int) -> Dict[str, list]:
+    """
+    Components for every staff member from the monthly counters, in one
+    query. Returns aligned columns (user_ids[i] ↔ report_consistency[i] ↔ ...).
+    """
+    start, end = month_bounds(month, year)
+    total_days = (end - start).days
+
+    result = await db.execute(
+        select(User.id, PerformanceCounter)
+        .outerjoin(PerformanceCounter, and_(
+            PerformanceCounter.user_id == User.id,
+            PerformanceCounter.month == month,
+            PerformanceCounter.year == year,
+        ))
+        .where(User.role == "staff")
+        .order_by(User.id)
+    )
+    rows = result.all()
+    user_ids = [user_id for user_id, _ in rows]
+    breakdowns = [counts_breakdown(counter, total_days) for _, counter in rows]
+
+    columns = {"user_ids": user_ids}
+    for column in ("score", *SCORE_WEIGHTS):
+        columns[column] = [b[column] for b in breakdowns]
+    return columns
+
+async def compute_components_for_range(
+    db: AsyncSession, user_ids: List[int], first: Tuple[int, int], last: Tuple[int, int]
+) -> Dict[Tuple[int, int, int], dict]:
+    """
+    Breakdowns for several users over a span of months, (month, year) inclusive,
+    from one read of their monthly counters. Returns
+    {(user_id, month, year): breakdown} for every user/month in the span.
+    """
+    first_month, first_year = first
+    last_month, last_year = last
+    period = PerformanceCounter.year * 12 + PerformanceCounter.month
+    result = await db.execute(
+        select(PerformanceCounter)
+        .where(PerformanceCounter.user_id.in_(user_ids))
+        .where(period >= first_year * 12 + first_month)
+        .where(period <= last_year * 12 + last_month)
+    )
+    counters = {(c.user_id, c.month, c.year): c for c in result.scalars()}
+
+    breakdowns = {}
+    month, year = first
+    while (year, month) <= (last_year, last_month):
+        month_start, month_end = month_bounds(month, year)
+        total_days = (month_end - month_start).days
+        for user_id in user_ids:
+            key = (user_id, month, year)
+            breakdowns[key] = counts_breakdown(counters.get(key), total_days)
+        month, year = (1, year + 1) if month == 12 else (month + 1, year)
+    return breakdowns
+
+async def upsert_performance_scores(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Bulk INSERT ... ON CONFLICT (user, month, year) DO UPDATE, in batches.
+    Every score write goes through here, so it also drops the cached
+    leaderboards of the months written once the caller's transaction commits.
+    """
+    periods = {(row["month"], row["year"]) for row in rows}
+
+    def invalidate(session):
+        for month, year in periods:
+            invalidate_leaderboard(month, year)
+
+    if periods:
+        event.listen(db.sync_session, "after_commit", invalidate, once=True)
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = pg_insert(PerformanceScore).values(rows[i:i + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_user_month_year",
+            set_={
+                column: stmt.excluded[column]
+                for column in ("score", "computed_at", *SCORE_WEIGHTS)
+            },
+        )
+        await db.execute(stmt)
+
+async def materialize_performance_scores(db: AsyncSession, month: int, year: int) -> int:
+    """Compute and store every staff member's score (with full breakdown) for a month."""
+    columns = await compute_org_components(db, month, year)
+    computed_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "user_id": user_id,
+            "month": month,
+            "year": year,
+            "score": columns["score"][i],
+            "report_consistency": columns["report_consistency"][i],
+            "task_score": columns["task_score"][i],
+            "attendance_rate": columns["attendance_rate"][i],
+            "training_score": columns["training_score"][i],
+            "achievement_count": columns["achievement_count"][i],
+            "computed_at": computed_at,
+        }
+        for i, user_id in enumerate(columns["user_ids"])
+    ]
+    await upsert_performance_scores(db, rows)
+    await db.commit()
+    return len(rows)
+
+async def run_performance_materializer(interval_seconds: int) -> None:
+    """Background loop: refresh the current month's scores for all staff."""
+    while True:
+        try:
+            now = datetime.now(timezone.utc)
+            async with AsyncSessionLocal() as db:
+                count = await materialize_performance_scores(db, now.month, now.year)
+            logger.info("Materialized %d performance scores for %02d/%d", count, now.month, now.year)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Performance materialization failed")
+        await asyncio.sleep(interval_seconds)
+
+# ---- Freshness (stale-while-revalidate) ----
+
+_refreshing: Dict[Tuple[int, int, int], asyncio.Task] = {}  # (user_id, month, year) -> running refresh
+
+def is_score_stale(score: PerformanceScore, now: Optional[datetime] = None) -> bool:
+    if score.computed_at is None:
+        return True
+    now = now or datetime.now(timezone.utc)
+    computed_at = score.computed_at
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    return (now - computed_at).total_seconds() >= settings.PERFORMANCE_SCORE_TTL_MINUTES * 60
+
+async def refresh_performance_score(user_id: int, month: int, year: int) -> dict:
+    """Recompute one user's score on its own session and upsert it."""
+    async with AsyncSessionLocal() as db:
+        breakdown = await counter_breakdown(db, user_id, month, year)
+        await upsert_performance_scores(db, [{
+            "user_id": user_id,
+            "month": month,
+            "year": year,
+            "computed_at": datetime.now(timezone.utc),
+            **breakdown,
+        }])
+        await db.commit()
+    return breakdown
+
+def schedule_score_refresh(user_id: int, month: int, year: int) -> bool:
+    """
+    Start a background recompute unless one is already running for this
+    user/month. Returns False when the request was de-duplicated.
+    """
+    key = (user_id, month, year)
+    if key in _refreshing:
+        return False
+
+    async def _run():
+        try:
+            await refresh_performance_score(user_id, month, year)
+        except Exception:
+            logger.exception("Background refresh of performance score %s failed", key)
+        finally:
+            _refreshing.pop(key, None)
+
+    _refreshing[key] = asyncio.create_task(_run())
+    return True
@@ -0,0 +1,103 @@
+# app/services/simulation.py
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services.performance import (
+    SCORE_WEIGHTS, ACHIEVEMENT_CAP, compute_org_components, resolve_weights
+)
+
+COMPONENTS = list(SCORE_WEIGHTS)  # fixed column order for the component matrix
+
+
+def competition_ranks(scores: List[float]) -> List[int]:
+    """Rank 1 = highest score; ties share a rank (1, 2, 2, 4)."""
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    ranks = [0] * len(scores)
+    for position, i in enumerate(order):
+        if position and scores[i] == scores[order[position - 1]]:
+            ranks[i] = ranks[order[position - 1]]
+        else:
+            ranks[i] = position + 1
+    return ranks
+
+
+def score_matrix(components: List[List[float]], weightings: List[Dict[str, float]]) -> List[List[float]]:
+    """
+    (staff × components) · (components × candidates) → one score column per
+    candidate, clamped at 100 exactly like combine_score().
+    """
+    weight_rows = [[w[c] for c in COMPONENTS] for w in weightings]
+    return [
+        [min(sum(x * w for x, w in zip(row, weights)), 100.0) for row in components]
+        for weights in weight_rows
+    ]
+
+
+def _spearman(a: List[int], b: List[int]) -> float:
+    n = len(a)
+    if n < 2:
+        return 1.0
+    d2 = sum((x - y) ** 2 for x, y in zip(a, b))
+    return round(1 - 6 * d2 / (n * (n * n - 1)), 4)
+
+
+async def simulate_weightings(
+    db: AsyncSession, month: int, year: int, weightings: List[Dict[str, float]], top_movers: int = 20
+) -> dict:
+    """
+    Re-rank the whole organisation under each candidate weighting. Component
+    vectors are loaded once (from the monthly counters) and every candidate is scored
+    against the same matrix.
+    """
+    candidates = [resolve_weights(w) for w in weightings]
+
+    columns = await compute_org_components(db, month, year)
+    user_ids = columns["user_ids"]
+    capped = {**columns, "achievement_count": [min(a, ACHIEVEMENT_CAP) for a in columns["achievement_count"]]}
+    components = [list(row) for row in zip(*(capped[c] for c in COMPONENTS))]
+
+    names_result = await db.execute(select(User.id, User.name).where(User.id.in_(user_ids)))
+    names = dict(names_result.all())
+
+    baseline_scores, *candidate_scores = score_matrix(components, [SCORE_WEIGHTS, *candidates])
+    baseline_ranks = competition_ranks(baseline_scores)
+
+    results = []
+    for weights, scores in zip(candidates, candidate_scores):
+        ranks = competition_ranks(scores)
+        moves = [old - new for old, new in zip(baseline_ranks, ranks)]  # positive = moved up
+        movers = sorted(
+            (i for i, m in enumerate(moves) if m),
+            key=lambda i: (-abs(moves[i]), ranks[i])
+        )[:top_movers]
+        results.append({
+            "weights": weights,
+            "moved": sum(1 for m in moves if m),
+            "max_rise": max(moves, default=0),
+            "max_drop": -min(moves, default=0),
+            "mean_abs_change": round(sum(abs(m) for m in moves) / len(moves), 2) if moves else 0.0,
+            "rank_correlation": _spearman(baseline_ranks, ranks),
+            "top_movers": [
+                {
+                    "user_id": user_ids[i],
+                    "name": names.get(user_ids[i]),
+                    "current_rank": baseline_ranks[i],
+                    "new_rank": ranks[i],
+                    "change": moves[i],
+                    "current_score": round(baseline_scores[i], 2),
+                    "new_score": round(scores[i], 2),
+                }
+                for i in movers
+            ],
+        })
+
+    return {
+        "month": month,
+        "year": year,
+        "staff": len(user_ids),
+        "current_weights": SCORE_WEIGHTS,
+        "candidates": results,
+    }
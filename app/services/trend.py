@@ -0,0 +1,108 @@
+# app/services/trend.py
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.performance import PerformanceScore
+from app.services.cache import TTLCache
+from app.services.performance import (
+    SCORE_WEIGHTS, month_bounds, compute_components_for_range, upsert_performance_scores
+)
+
+# Closed months rarely change; apply_counter_deltas drops the entries it makes stale.
+# The TTL bounds what other workers (or a read racing that change) keep.
+closed_month_cache = TTLCache(ttl=3600, max_entries=100_000)
+
+
+def invalidate_closed_months(keys: Iterable[Tuple[int, int, int]]) -> None:
+    """Drop cached (user_id, month, year) trend points whose month changed after it closed."""
+    for key in keys:
+        closed_month_cache.invalidate(key)
+
+
+def last_n_months(n: int, now: datetime) -> List[Tuple[int, int]]:
+    """[(month, year), ...] oldest first, ending with the current month."""
+    periods = []
+    month, year = now.month, now.year
+    for _ in range(n):
+        periods.append((month, year))
+        month, year = (12, year - 1) if month == 1 else (month - 1, year)
+    return periods[::-1]
+
+
+def _breakdown_from_row(row: PerformanceScore) -> dict:
+    return {"score": row.score, **{c: getattr(row, c) for c in SCORE_WEIGHTS}}
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def get_performance_trend(db: AsyncSession, user_ids: List[int], months: int) -> Dict[int, List[dict]]:
+    """
+    Score and component history for each user over the last ``months`` months.
+    Stored scores are used where they are final; every missing user/month is
+    filled by one batched computation over the whole span, then stored.
+    """
+    now = datetime.now(timezone.utc)
+    periods = last_n_months(months, now)
+    current = periods[-1]
+    history: Dict[Tuple[int, int, int], dict] = {}
+
+    # 1. Closed months already in memory
+    wanted = []
+    for user_id in user_ids:
+        for month, year in periods:
+            key = (user_id, month, year)
+            cached = closed_month_cache.get(key) if (month, year) != current else None
+            if cached is not None:
+                history[key] = cached
+            else:
+                wanted.append(key)
+
+    # 2. Materialized rows; a closed month only counts if it was computed after it ended
+    wanted_keys = set(wanted)
+    if wanted:
+        first_month, first_year = periods[0]
+        stored = await db.execute(
+            select(PerformanceScore)
+            .where(PerformanceScore.user_id.in_(list({k[0] for k in wanted})))
+            .where(PerformanceScore.year * 12 + PerformanceScore.month >= first_year * 12 + first_month)
+        )
+        for row in stored.scalars():
+            key = (row.user_id, row.month, row.year)
+            if key not in wanted_keys or key in history:
+                continue
+            _, month_end = month_bounds(row.month, row.year)
+            if (row.month, row.year) == current:
+                history[key] = _breakdown_from_row(row)
+            elif row.computed_at and _as_utc(row.computed_at) >= month_end.replace(tzinfo=timezone.utc):
+                history[key] = _breakdown_from_row(row)
+                closed_month_cache.set(key, history[key])
+
+    # 3. Everything still missing, in one grouped computation over the span it covers
+    missing = [key for key in wanted if key not in history]
+    if missing:
+        missing_periods = sorted({(m, y) for _, m, y in missing}, key=lambda p: (p[1], p[0]))
+        computed = await compute_components_for_range(
+            db, sorted({k[0] for k in missing}), missing_periods[0], missing_periods[-1]
+        )
+        rows = []
+        for key in missing:
+            user_id, month, year = key
+            history[key] = computed[key]
+            rows.append({"user_id": user_id, "month": month, "year": year, "computed_at": now, **computed[key]})
+            if (month, year) != current:
+                closed_month_cache.set(key, computed[key])
+        await upsert_performance_scores(db, rows)
+        await db.commit()
+
+    return {
+        user_id: [
+            {"month": month, "year": year, **history[(user_id, month, year)]}
+            for month, year in periods
+        ]
+        for user_id in user_ids
+    }
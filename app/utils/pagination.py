@@ -0,0 +1,88 @@
+# app/utils/pagination.py
+import base64
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+
+# Exposed to browsers via CORS in app.main
+CURSOR_HEADERS = ["X-Before-Cursor", "X-After-Cursor", "X-Next-Cursor", "X-Has-More"]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for a (created_at, id) position."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        position = datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+    # Stored timestamps are aware; read a hand-built naive one as UTC so it compares
+    if position[0].tzinfo is None:
+        position = position[0].replace(tzinfo=timezone.utc), position[1]
+    return position
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    """Cursor for ranked results ordered by (rank desc, id desc)."""
+    raw = f"{rank!r}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        rank, row_id = raw.rsplit("|", 1)
+        return float(rank), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def resolve_cursor(before: Optional[str], after: Optional[str]) -> Tuple[Optional[str], Optional[Tuple[datetime, int]]]:
+    """("before" | "after" | None, decoded position) for a before/after query pair."""
+    if before and after:
+        raise HTTPException(400, "Use either 'before' or 'after', not both")
+    if before:
+        return "before", decode_cursor(before)
+    if after:
+        return "after", decode_cursor(after)
+    return None, None
+
+
+def keyset_page(
+    query: Select, created_col, id_col, direction: Optional[str], position, limit: int
+) -> Select:
+    """
+    Restrict ``query`` to one page past ``position`` in ``direction``. Fetches
+    ``limit + 1`` rows so the caller can tell whether there are more; rows come
+    back newest first, except for "after" pages which are oldest first.
+    """
+    key = tuple_(created_col, id_col)
+    if direction == "after":
+        return query.where(key > tuple_(*position)).order_by(created_col, id_col).limit(limit + 1)
+    if direction == "before":
+        query = query.where(key < tuple_(*position))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def set_cursor_headers(response: Response, rows: Sequence, has_more: bool) -> None:
+    """
+    X-Before-Cursor points at the oldest row of the page (pass as ``before`` for
+    older rows), X-After-Cursor at the newest (pass as ``after`` to poll for new
+    ones). X-Has-More says whether the requested direction has more rows.
+    """
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    if rows:
+        oldest, newest = min(rows, key=_position), max(rows, key=_position)
+        response.headers["X-Before-Cursor"] = encode_cursor(oldest.created_at, oldest.id)
+        response.headers["X-After-Cursor"] = encode_cursor(newest.created_at, newest.id)
+
+
+def _position(row) -> Tuple[datetime, int]:
+    return row.created_at, row.id
@@ -0,0 +1,81 @@
+# tests/test_admin.py
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.database import AsyncSessionLocal
+from app.models.goal import Goal, GoalUpdate
+from app.models.report import DailyReport
+from tests.conftest import ADMIN_ID, auth_headers
+
+
+async def _seed_profile(goals: int, updates_per_goal: int, reports: int) -> None:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with AsyncSessionLocal() as db:
+        for g in range(goals):
+            goal = Goal(user_id=100, title=f"Goal {g}", frequency="weekly", priority="low",
+                        target_date=date(2026, 12, 1) + timedelta(days=g))
+            db.add(goal)
+            await db.flush()
+            for u in range(updates_per_goal):
+                db.add(GoalUpdate(goal_id=goal.id, progress_percent=u % 101, created_at=start + timedelta(hours=u)))
+        for r in range(reports):
+            when = start + timedelta(days=r)
+            db.add(DailyReport(user_id=100, date=when, created_at=when, achievements="a",
+                               challenges="c", completed_tasks="t", plans_for_tomorrow="p"))
+        await db.commit()
+
+
+async def test_profile_limits_updates_per_goal(client):
+    await _seed_profile(goals=3, updates_per_goal=12, reports=0)
+
+    r = await client.get("/admin/staff/100?include=goals&limit=5", headers=auth_headers(ADMIN_ID))
+    assert r.status_code == 200
+    goals = r.json()["goals"]
+    assert len(goals) == 3
+    for goal in goals:
+        # The latest five, oldest first
+        assert [u["progress_percent"] for u in goal["updates"]] == [7, 8, 9, 10, 11]
+
+
+async def test_profile_query_count_does_not_grow_with_data(client, statements):
+    await _seed_profile(goals=2, updates_per_goal=2, reports=2)
+    with statements() as small:
+        r = await client.get("/admin/staff/100?limit=50", headers=auth_headers(ADMIN_ID))
+    assert r.status_code == 200
+
+    await _seed_profile(goals=40, updates_per_goal=100, reports=60)
+    with statements() as large:
+        start = time.perf_counter()
+        r = await client.get("/admin/staff/100?limit=50", headers=auth_headers(ADMIN_ID))
+        elapsed = time.perf_counter() - start
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["goals"]) == 42 and len(body["reports"]) == 50
+    assert max(len(g["updates"]) for g in body["goals"]) == 50
+
+    # auth, staff lookup, four list/total sections, goals + their updates
+    assert len(small) == len(large) == 8
+    assert elapsed < 2.0
+
+
+async def test_goals_overview_paginates_at_risk_separately(client):
+    today = date.today()
+    async with AsyncSessionLocal() as db:
+        for user_id in (100, 101, 102):
+            for days in (1, 2):
+                db.add(Goal(user_id=user_id, title=f"Due in {days}", frequency="weekly", priority="high",
+                            target_date=today + timedelta(days=days)))
+        await db.commit()
+
+    r = await client.get("/admin/goals/overview?page=3&page_size=1&risk_page_size=4",
+                         headers=auth_headers(ADMIN_ID))
+    assert r.status_code == 200
+    body = r.json()
+    assert [s["user_id"] for s in body["staff"]["items"]] == [102]
+    at_risk = body["at_risk"]
+    assert (at_risk["total"], at_risk["page"], at_risk["page_size"]) == (6, 1, 4)
+    assert len(at_risk["items"]) == 4  # not skipped by the staff page's offset
+
+    r = await client.get("/admin/goals/overview?page=3&page_size=1&risk_page=2&risk_page_size=4",
+                         headers=auth_headers(ADMIN_ID))
+    assert len(r.json()["at_risk"]["items"]) == 2
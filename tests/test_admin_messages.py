@@ -0,0 +1,64 @@
+# tests/test_admin_messages.py
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.message import Conversation, ConversationParticipant
+from app.services.chat_hub import MEMBERSHIP_BATCH_SIZE
+from tests.conftest import ADMIN_ID, auth_headers, seed_staff
+
+GROUP_SIZE = 1000
+
+
+async def _participant_count(conv_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(func.count()).where(ConversationParticipant.conversation_id == conv_id)
+        )).scalar_one()
+
+
+@pytest.mark.benchmark
+async def test_thousand_member_group_is_constant_work(client, statements, broker_payloads):
+    staff_ids = await seed_staff(GROUP_SIZE)
+
+    with statements() as executed:
+        start = time.perf_counter()
+        r = await client.post("/admin/messages/conversations", headers=auth_headers(ADMIN_ID),
+                              json={"title": "Everyone", "initial_participant_ids": staff_ids})
+        elapsed = time.perf_counter() - start
+    assert r.status_code == 200
+    conv_id = r.json()["id"]
+    assert len(r.json()["participants"]) == GROUP_SIZE + 1
+    assert await _participant_count(conv_id) == GROUP_SIZE + 1
+
+    # auth, validation, conversation insert, one participant insert (+ the transaction's BEGIN/COMMIT aren't statements)
+    assert len(executed) <= 5
+    joins = [p for p in broker_payloads if p["kind"] == "join"]
+    assert len(joins) == -(-(GROUP_SIZE + 1) // MEMBERSHIP_BATCH_SIZE)
+    assert sorted(u for p in joins for u in p["user_ids"]) == sorted(staff_ids + [ADMIN_ID])
+    assert elapsed < 2.0
+    print(f"\n1,000-member conversation: {elapsed * 1000:.0f} ms, {len(executed)} statements, {len(joins)} broker joins")
+
+
+async def test_invalid_participant_leaves_nothing_behind(client):
+    r = await client.post("/admin/messages/conversations", headers=auth_headers(ADMIN_ID),
+                          json={"title": "Broken", "initial_participant_ids": [100, 101, 99999]})
+    assert r.status_code == 400
+    async with AsyncSessionLocal() as db:
+        assert (await db.execute(select(func.count()).select_from(Conversation))).scalar_one() == 0
+
+
+async def test_bulk_add_to_existing_conversation(client, broker_payloads):
+    r = await client.post("/admin/messages/conversations", headers=auth_headers(ADMIN_ID),
+                          json={"title": "Team", "initial_participant_ids": [100]})
+    conv_id = r.json()["id"]
+    staff_ids = await seed_staff(600)
+    broker_payloads.clear()
+
+    r = await client.post(f"/admin/messages/conversations/{conv_id}/participants", headers=auth_headers(ADMIN_ID),
+                          json={"user_ids": [100, *staff_ids]})
+    assert r.status_code == 200
+    assert r.json()["added"] == staff_ids and r.json()["already_active"] == [100]
+    assert [len(p["user_ids"]) for p in broker_payloads if p["kind"] == "join"] == [500, 100]
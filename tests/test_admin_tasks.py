@@ -0,0 +1,78 @@
+# tests/test_admin_tasks.py
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.task import Task
+from tests.conftest import ADMIN_ID, auth_headers, seed_staff
+
+BULK_STAFF = 5000
+
+
+def _deadline(days: int = 7) -> str:
+    return (datetime.now(timezone.utc) + timedelta(days=days)).isoformat()
+
+
+async def _task_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(Task))).scalar_one()
+
+
+async def _assign(client, staff_ids) -> dict:
+    r = await client.post("/admin/tasks/bulk", headers=auth_headers(ADMIN_ID),
+                          json={"title": "Quarterly review", "deadline": _deadline(), "assigned_to_ids": staff_ids})
+    assert r.status_code == 200
+    return r.json()
+
+
+async def test_bulk_assign_reports_each_recipient(client):
+    # 1 is the admin, 99999 doesn't exist, 101 is listed twice
+    body = await _assign(client, [100, 1, 101, 99999, 101])
+
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert [(item["id"], item["status"]) for item in body["results"]] == [
+        (100, "created"), (1, "error"), (101, "created"), (99999, "error"),
+    ]
+    assert await _task_count() == 2
+
+
+async def test_bulk_rate_and_status_report_each_task(client):
+    created = await _assign(client, [100, 101, 102])
+    task_ids = [item["task_id"] for item in created["results"]]
+
+    r = await client.post("/admin/tasks/bulk/status", headers=auth_headers(ADMIN_ID),
+                          json={"task_ids": task_ids[:2] + [99999], "status": "completed"})
+    assert r.status_code == 200
+    assert [item["status"] for item in r.json()["results"]] == ["updated", "updated", "error"]
+
+    r = await client.post("/admin/tasks/bulk/rate", headers=auth_headers(ADMIN_ID),
+                          json={"items": [{"task_id": task_id, "rating": 4} for task_id in task_ids] + [{"task_id": 99999, "rating": 5}]})
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert [item.get("detail") for item in body["results"]] == [
+        None, None, "Task must be completed before rating", "Task not found",
+    ]
+    async with AsyncSessionLocal() as db:
+        ratings = dict((await db.execute(select(Task.id, Task.rating).where(Task.id.in_(task_ids)))).all())
+    assert ratings == {task_ids[0]: 4, task_ids[1]: 4, task_ids[2]: None}
+
+
+@pytest.mark.benchmark
+async def test_assign_to_five_thousand_staff(client, statements):
+    staff_ids = await seed_staff(BULK_STAFF)
+
+    with statements() as executed:
+        start = time.perf_counter()
+        body = await _assign(client, staff_ids)
+        elapsed = time.perf_counter() - start
+
+    assert body["succeeded"] == BULK_STAFF and body["failed"] == 0
+    assert await _task_count() == BULK_STAFF
+    # auth, one IN validation, and the multi-row INSERT in insertmanyvalues pages of 1,000
+    assert len(executed) <= 2 + BULK_STAFF // 1000
+    assert elapsed < 5.0
+    print(f"\nbulk assign to {BULK_STAFF:,} staff: {elapsed * 1000:.0f} ms, {len(executed)} statements")
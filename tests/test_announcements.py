@@ -0,0 +1,103 @@
+# tests/test_announcements.py
+import base64
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.models.message import Announcement
+from app.services import announcements
+from tests.conftest import ADMIN_ID
+
+LOAD_REQUESTS = 300
+
+
+async def _seed_announcements(count: int) -> None:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with AsyncSessionLocal() as db:
+        for i in range(count):
+            db.add(Announcement(admin_id=ADMIN_ID, title=f"A{i}", content="c", created_at=start + timedelta(hours=i)))
+        await db.commit()
+
+
+async def test_feed_returns_everything_without_limit(client):
+    await _seed_announcements(25)
+    r = await client.get("/announcements")
+    assert r.status_code == 200
+    assert [a["title"] for a in r.json()] == [f"A{i}" for i in reversed(range(25))]
+    assert r.headers["X-Has-More"] == "false"
+
+    r = await client.get("/announcements?limit=10")
+    assert len(r.json()) == 10 and r.headers["X-Has-More"] == "true"
+    r = await client.get("/announcements", params={"before": r.headers["X-Before-Cursor"]})
+    assert [a["title"] for a in r.json()] == [f"A{i}" for i in reversed(range(15))]
+
+
+async def test_feed_without_limit_beyond_memory_window(client, monkeypatch):
+    monkeypatch.setattr(announcements, "FEED_SIZE", 5)
+    await _seed_announcements(12)
+    r = await client.get("/announcements")
+    assert len(r.json()) == 12
+
+    r = await client.get("/announcements?limit=3")
+    r = await client.get("/announcements", params={"before": r.headers["X-Before-Cursor"]})
+    assert [a["title"] for a in r.json()] == [f"A{i}" for i in reversed(range(9))]
+
+
+async def test_naive_cursor_is_read_as_utc(client, monkeypatch):
+    await _seed_announcements(12)
+    # 2026-01-01T05:00 without an offset: A0..A4 are older
+    naive = base64.urlsafe_b64encode(b"2026-01-01T05:00:00|0").decode().rstrip("=")
+
+    r = await client.get("/announcements", params={"before": naive, "limit": 10})
+    assert r.status_code == 200
+    assert [a["title"] for a in r.json()] == [f"A{i}" for i in reversed(range(5))]
+
+    # Same answer when the page comes from the database instead of the feed
+    monkeypatch.setattr(announcements, "FEED_SIZE", 3)
+    announcements.feed_cache.invalidate()
+    r = await client.get("/announcements", params={"before": naive, "limit": 10})
+    assert r.status_code == 200
+    assert [a["title"] for a in r.json()] == [f"A{i}" for i in reversed(range(5))]
+
+
+async def test_naive_if_modified_since(client):
+    await _seed_announcements(1)
+    r = await client.get("/announcements")
+    last_modified = r.headers["Last-Modified"]
+
+    # "-0000" makes parsedate_to_datetime return a naive datetime
+    naive = last_modified.replace("GMT", "-0000")
+    r = await client.get("/announcements", headers={"If-Modified-Since": naive})
+    assert r.status_code == 304
+
+    earlier = "Wed, 31 Dec 2025 00:00:00 -0000"
+    r = await client.get("/announcements", headers={"If-Modified-Since": earlier})
+    assert r.status_code == 200
+
+
+@pytest.mark.benchmark
+async def test_feed_load_with_and_without_cache(client, statements):
+    await _seed_announcements(200)
+
+    async def requests_per_second(headers=None, cold=False) -> float:
+        start = time.perf_counter()
+        for _ in range(LOAD_REQUESTS):
+            if cold:
+                announcements.invalidate_feed()  # every call reads the table, as before the feed
+            r = await client.get("/announcements?limit=50", headers=headers)
+            assert r.status_code in (200, 304)
+        return LOAD_REQUESTS / (time.perf_counter() - start)
+
+    uncached = await requests_per_second(cold=True)
+    with statements() as executed:
+        cached = await requests_per_second()
+        etag = (await client.get("/announcements?limit=50")).headers["ETag"]
+        not_modified = await requests_per_second({"If-None-Match": etag})
+    assert (await client.get("/announcements?limit=50", headers={"If-None-Match": etag})).status_code == 304
+
+    assert executed == []  # warm feed: neither full responses nor 304s touch the database
+    assert cached > uncached
+    print(f"\nannouncements, {LOAD_REQUESTS} requests each: {uncached:.0f} req/s uncached, "
+          f"{cached:.0f} req/s cached, {not_modified:.0f} req/s for 304s")
@@ -0,0 +1,139 @@
+# tests/test_birthdays.py
+import random
+import time
+from calendar import isleap
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.birthdays import BirthdayIndex, _day_key, get_birthday_index
+from tests.conftest import auth_headers
+
+BENCHMARK_USERS = 50_000
+
+# Around both New Years, both Februaries and an ordinary day, in common and leap years
+TODAYS = [
+    date(year, month, day)
+    for year in (2027, 2028)
+    for month, day in ((1, 1), (2, 27), (2, 28), (2, 29), (3, 1), (7, 15), (12, 30), (12, 31))
+    if not (month == 2 and day == 29 and not isleap(year))
+]
+
+
+def _people(count: int, seed: int = 49) -> list:
+    rng = random.Random(seed)
+    edges = [date(1992, 2, 29), date(1990, 2, 28), date(1991, 3, 1), date(1985, 1, 1), date(1988, 12, 31)]
+    people = [{"user_id": i + 1, "name": f"P{i}", "date_of_birth": dob} for i, dob in enumerate(edges)]
+    for i in range(len(edges), count):
+        dob = date(1960, 1, 1) + timedelta(days=rng.randrange(365 * 40))
+        people.append({"user_id": i + 1, "name": f"P{i}", "date_of_birth": dob})
+    return people
+
+
+def _scan(people: list, today: date) -> list:
+    """What the old per-request scan computed: every person's next birthday, soonest first."""
+    found = []
+    for person in people:
+        dob = person["date_of_birth"]
+        for year in (today.year, today.year + 1):
+            day = 28 if (dob.month, dob.day) == (2, 29) and not isleap(year) else dob.day
+            birthday = date(year, dob.month, day)
+            if birthday >= today:
+                break
+        found.append(((birthday - today).days, _day_key(dob.month, dob.day), person["user_id"], birthday))
+    return sorted(found)
+
+
+@pytest.mark.parametrize("today", TODAYS, ids=str)
+def test_index_matches_full_scan(today):
+    people = _people(400)
+    index = BirthdayIndex(people)
+    expected = _scan(people, today)
+
+    first = index.next_birthday(today)
+    assert (first["user_id"], first["birthday"]) == (expected[0][2], expected[0][3])
+
+    for days in (0, 1, 2, 30, 364, 365):
+        got = [(e["days_until"], e["user_id"], e["birthday"]) for e in index.upcoming(today, days)]
+        assert got == [(d, uid, b) for d, _, uid, b in expected if d <= days], days
+
+
+def test_leap_day_birthday_falls_on_feb_28_in_common_years():
+    index = BirthdayIndex([
+        {"user_id": 1, "name": "Leap", "date_of_birth": date(1992, 2, 29)},
+        {"user_id": 2, "name": "March", "date_of_birth": date(1990, 3, 1)},
+    ])
+    assert index.next_birthday(date(2027, 2, 28))["birthday"] == date(2027, 2, 28)
+    assert index.next_birthday(date(2028, 2, 28))["birthday"] == date(2028, 2, 29)
+    assert index.next_birthday(date(2028, 3, 1))["user_id"] == 2
+    assert index.next_birthday(date(2027, 3, 2))["birthday"] == date(2028, 2, 29)
+
+    around_feb = [e["user_id"] for e in index.upcoming(date(2027, 2, 27), 2)]
+    assert around_feb == [1, 2]
+    # Each person once, even when the window reaches the same day next year
+    assert [e["user_id"] for e in index.upcoming(date(2027, 3, 1), 365)] == [2, 1]
+
+
+async def test_future_birthday_is_rejected_on_register(client):
+    tomorrow = date.today() + timedelta(days=1)
+    r = await client.post("/auth/register", json={"email": "new@test.com", "name": "New", "password": "password123",
+                                                  "date_of_birth": tomorrow.isoformat()})
+    assert r.status_code == 422
+
+    r = await client.patch("/auth/me", json={"date_of_birth": tomorrow.isoformat()}, headers=auth_headers(100))
+    assert r.status_code == 422
+
+
+async def test_registration_updates_the_index(client):
+    r = await client.get("/dashboard", headers=auth_headers(100))
+    assert r.json()["next_birthday"] is None
+
+    today = date.today()
+    born = date(1992, today.month, today.day)  # a leap year, so this works on Feb 29 too
+    r = await client.post("/auth/register", json={"email": "new@test.com", "name": "New", "password": "password123",
+                                                  "date_of_birth": born.isoformat()})
+    assert r.status_code == 200
+    r = await client.get("/dashboard", headers=auth_headers(100))
+    assert r.json()["next_birthday"]["name"] == "New"
+    assert r.json()["next_birthday"]["days_until"] == 0
+
+
+@pytest.mark.benchmark
+async def test_index_with_fifty_thousand_users(db_setup):
+    people = _people(BENCHMARK_USERS)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(User), [
+            {"id": 10_000 + p["user_id"], "email": f"u{p['user_id']}@test.com", "name": p["name"],
+             "hashed_password": "x", "role": "staff", "date_of_birth": p["date_of_birth"]}
+            for p in people
+        ])
+        await db.commit()
+
+        start = time.perf_counter()
+        index = await get_birthday_index(db)
+        build = time.perf_counter() - start
+
+    assert len(index) == BENCHMARK_USERS
+    rounds = 1000
+    start = time.perf_counter()
+    for i in range(rounds):
+        index.next_birthday(TODAYS[i % len(TODAYS)])
+    next_lookup = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for i in range(rounds):
+        week = index.upcoming(TODAYS[i % len(TODAYS)], 7)
+    week_lookup = (time.perf_counter() - start) / rounds
+
+    today = TODAYS[0]
+    start = time.perf_counter()
+    expected = _scan(people, today)
+    scan = time.perf_counter() - start
+    assert index.next_birthday(today)["user_id"] == 10_000 + expected[0][2]
+
+    assert next_lookup < 0.001
+    print(f"\nbirthday index, {BENCHMARK_USERS:,} users: built in {build * 1000:.0f} ms, "
+          f"next birthday {next_lookup * 1e6:.0f} us, next 7 days ({len(week):,} people) {week_lookup * 1e6:.0f} us; "
+          f"a full scan takes {scan * 1000:.0f} ms")
@@ -0,0 +1,287 @@
+# tests/test_chat.py
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.database import AsyncSessionLocal
+from app.models.message import Conversation, ConversationParticipant, Message
+from app.models.user import User
+from app.routers.chat import get_conversations
+from app.core.security import create_access_token
+from app.main import app
+from app.services.chat_hub import ChatHub, chat_hub
+from tests.conftest import ADMIN_ID, auth_headers
+
+FAN_OUT_CLIENTS = 5000
+
+
+async def _seed_conversations(count: int) -> None:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with AsyncSessionLocal() as db:
+        for k in range(count):
+            conversation = Conversation(admin_id=ADMIN_ID, title=f"C{k}", created_at=start)
+            db.add(conversation)
+            await db.flush()
+            for user_id in (ADMIN_ID, 100, 101):
+                db.add(ConversationParticipant(conversation_id=conversation.id, user_id=user_id))
+            for i in range(k + 1):
+                db.add(Message(conversation_id=conversation.id, sender_id=101, content=f"c{k}m{i}",
+                               created_at=start + timedelta(minutes=k * 10 + i)))
+        await db.commit()
+
+
+async def test_get_conversations_is_one_statement(db_setup, statements):
+    await _seed_conversations(5)
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, 100)
+        with statements() as executed:
+            conversations = await get_conversations(db=db, current_user=user)
+
+    assert len(executed) == 1
+    assert [c.title for c in conversations] == ["C4", "C3", "C2", "C1", "C0"]
+    assert [c.unread_count for c in conversations] == [5, 4, 3, 2, 1]
+    assert conversations[0].last_message.content == "c4m4"
+    assert conversations[0].participants == [ADMIN_ID, 100, 101]
+
+
+async def test_conversation_list_statements_do_not_grow(client, statements):
+    await _seed_conversations(2)
+    with statements() as few:
+        r = await client.get("/chat/conversations", headers=auth_headers(100))
+    assert len(r.json()) == 2
+
+    await _seed_conversations(30)
+    with statements() as many:
+        r = await client.get("/chat/conversations", headers=auth_headers(100))
+    assert len(r.json()) == 32
+
+    assert len(few) == len(many) == 2  # authentication + the list
+
+
+async def test_search_snippet_is_plain_text_with_offsets(client):
+    async with AsyncSessionLocal() as db:
+        conversation = Conversation(admin_id=ADMIN_ID, title="Search")
+        db.add(conversation)
+        await db.flush()
+        db.add(ConversationParticipant(conversation_id=conversation.id, user_id=100))
+        db.add(Message(conversation_id=conversation.id, sender_id=100,
+                       content='<img src=x onerror=alert(1)> quarterly <b>budget</b> \x02review\x03 today'))
+        await db.commit()
+
+    r = await client.get("/chat/search", params={"q": "budget"}, headers=auth_headers(100))
+    assert r.status_code == 200
+    [result] = r.json()
+    snippet = result["snippet"]
+    assert "\x02" not in snippet and "\x03" not in snippet
+    assert "<b>" not in snippet  # no markup is added around matches
+    assert [snippet[start:end] for start, end in result["highlights"]] == ["budget"]
+
+
+async def _conversation_with(user_ids) -> int:
+    async with AsyncSessionLocal() as db:
+        conversation = Conversation(admin_id=ADMIN_ID, title="Members")
+        db.add(conversation)
+        await db.flush()
+        for user_id in (ADMIN_ID, *user_ids):
+            db.add(ConversationParticipant(conversation_id=conversation.id, user_id=user_id))
+        await db.commit()
+        return conversation.id
+
+
+async def _post(client, conv_id: int, user_id: int) -> int:
+    r = await client.post(f"/chat/conversations/{conv_id}/messages", json={"content": "hi"}, headers=auth_headers(user_id))
+    return r.status_code
+
+
+async def test_removal_revokes_access_immediately(client):
+    conv_id = await _conversation_with([100])
+    assert await _post(client, conv_id, 100) == 200
+
+    r = await client.post(f"/admin/messages/conversations/{conv_id}/participants/100/remove", headers=auth_headers(ADMIN_ID))
+    assert r.status_code == 200
+    assert await _post(client, conv_id, 100) == 403
+
+
+async def test_removal_on_another_worker_expires_quickly_without_broker(client, monkeypatch):
+    from app.services import membership
+
+    monkeypatch.setattr(membership, "MEMBERSHIP_TTL_WITHOUT_BROKER", 0.3)
+    conv_id = await _conversation_with([100])
+    assert await _post(client, conv_id, 100) == 200  # membership now cached
+
+    # Another worker removes the participant; nothing reaches this one
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ConversationParticipant)
+            .where(ConversationParticipant.conversation_id == conv_id, ConversationParticipant.user_id == 100)
+            .values(removed_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+
+    await asyncio.sleep(0.4)
+    assert await _post(client, conv_id, 100) == 403
+
+
+async def test_removal_on_another_worker_is_broadcast(client, broker_payloads):
+    conv_id = await _conversation_with([100])
+    assert await _post(client, conv_id, 100) == 200
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ConversationParticipant)
+            .where(ConversationParticipant.conversation_id == conv_id, ConversationParticipant.user_id == 100)
+            .values(removed_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+    await chat_hub._on_broker_message(json.dumps(
+        {"kind": "leave", "conversation_id": conv_id, "user_id": 100, "origin": "other-worker"}
+    ))
+    assert await _post(client, conv_id, 100) == 403
+
+
+async def _messages_at(conv_id: int, when: datetime, count: int) -> list:
+    async with AsyncSessionLocal() as db:
+        messages = [Message(conversation_id=conv_id, sender_id=100, content=f"m{i}", created_at=when) for i in range(count)]
+        db.add_all(messages)
+        await db.commit()
+        return [m.id for m in messages]
+
+
+async def test_cursor_pages_through_identical_timestamps(client):
+    conv_id = await _conversation_with([100])
+    ids = await _messages_at(conv_id, datetime(2026, 3, 2, 9, tzinfo=timezone.utc), 25)
+    url = f"/chat/conversations/{conv_id}/messages"
+
+    seen, params = [], {}
+    for _ in range(3):
+        r = await client.get(url, params={"limit": 10, **params}, headers=auth_headers(100))
+        assert r.status_code == 200
+        seen = [m["id"] for m in r.json()] + seen
+        params = {"before": r.headers["X-Before-Cursor"]}
+    assert r.headers["X-Has-More"] == "false"
+    assert seen == ids
+
+    # And forward from the oldest, again without skipping or repeating a tie
+    first = await client.get(url, params={"before": r.headers["X-Before-Cursor"]}, headers=auth_headers(100))
+    assert first.json() == [] and first.headers["X-Has-More"] == "false"
+    seen, params = ids[:1], {"after": r.headers["X-Before-Cursor"]}
+    for _ in range(3):
+        r = await client.get(url, params={"limit": 10, **params}, headers=auth_headers(100))
+        seen += [m["id"] for m in r.json()]
+        params = {"after": r.headers["X-After-Cursor"]}
+    assert r.headers["X-Has-More"] == "false"
+    assert seen == ids
+
+
+async def test_malformed_cursor_is_rejected(client):
+    conv_id = await _conversation_with([100])
+    url = f"/chat/conversations/{conv_id}/messages"
+    for cursor in ("not a cursor", "bm90LWEtZGF0ZXwx", "MjAyNi0wMy0wMlQwOTowMDowMCswMDowMHx4", "%FF%FE"):
+        r = await client.get(f"{url}?before={cursor}", headers=auth_headers(100))
+        assert r.status_code == 400, cursor
+        assert r.json()["detail"] == "Invalid cursor"
+    r = await client.get(f"{url}?before=x&after=y", headers=auth_headers(100))
+    assert r.status_code == 400
+
+
+def _event(n: int) -> dict:
+    return {"type": "message", "id": n, "content": f"m{n}"}
+
+
+async def test_full_queue_evicts_only_the_slow_connection():
+    hub = ChatHub(queue_size=2)
+    slow = hub.connect(100, [7])
+    fast = hub.connect(101, [7])
+
+    received = []
+    for n in range(3):
+        await hub.publish(7, _event(n))
+        received.append(fast.queue.get_nowait())
+
+    assert [e["id"] for e in received] == [0, 1, 2]
+    assert slow.evicted.is_set() and not fast.evicted.is_set()
+    assert hub.evictions == 1
+    assert slow.queue.qsize() == 2 and not slow.conversations
+    assert hub.connection_count == 1
+
+    # Once evicted, nothing more is queued for it
+    await hub.publish(7, _event(3))
+    assert slow.queue.qsize() == 2 and fast.queue.get_nowait()["id"] == 3
+    assert not slow.offer(_event(4))
+
+
+async def test_slow_socket_is_closed_with_1013(db_setup, monkeypatch):
+    """Drives the endpoint as raw ASGI with a client that never reads what it is sent."""
+    conv_id = await _conversation_with([100])
+    monkeypatch.setattr(chat_hub, "queue_size", 2)
+
+    incoming: asyncio.Queue = asyncio.Queue()
+    await incoming.put({"type": "websocket.connect"})
+    sent = []
+    accepted = asyncio.Event()
+    stalled = asyncio.Event()  # never set: sends block like a client that stopped reading
+
+    async def receive():
+        return await incoming.get()
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "websocket.accept":
+            accepted.set()
+        elif message["type"] == "websocket.send":
+            await stalled.wait()
+
+    token = create_access_token({"sub": "100"})
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": "/chat/ws", "raw_path": b"/chat/ws",
+        "query_string": f"token={token}".encode(), "headers": [], "client": ("test", 1), "server": ("test", 80),
+        "subprotocols": [],
+    }
+    session = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(accepted.wait(), 5)
+
+    # One event is stuck in send_json, two fill the queue, the next overflows it
+    for n in range(4):
+        await chat_hub.publish(conv_id, _event(n))
+        await asyncio.sleep(0)
+    await asyncio.wait_for(session, 5)
+
+    assert sent[-1] == {"type": "websocket.close", "code": 1013, "reason": ""}
+    assert not chat_hub.has_subscribers(conv_id)
+
+
+@pytest.mark.benchmark
+async def test_fan_out_to_five_thousand_clients():
+    hub = ChatHub(queue_size=8)
+    conns = [hub.connect(2000 + i, [7]) for i in range(FAN_OUT_CLIENTS)]
+    rounds = 20
+
+    elapsed = 0.0
+    for n in range(rounds):
+        start = time.perf_counter()
+        await hub.publish(7, _event(n))
+        elapsed += (time.perf_counter() - start) / rounds
+        for conn in conns:
+            conn.queue.get_nowait()  # every client keeps up
+
+    assert hub.evictions == 0 and all(conn.queue.empty() for conn in conns)
+
+    # Half the clients stop reading: they are evicted once their queues fill, the rest keep receiving
+    readers = conns[::2]
+    with_stalls = 0.0
+    for n in range(hub.queue_size + 1):
+        start = time.perf_counter()
+        await hub.publish(7, _event(n))
+        with_stalls = max(with_stalls, time.perf_counter() - start)
+        for conn in readers:
+            conn.queue.get_nowait()
+
+    assert hub.evictions == FAN_OUT_CLIENTS // 2
+    assert hub.connection_count == len(readers)
+    assert elapsed < 0.05
+    print(f"\nfan-out to {FAN_OUT_CLIENTS:,} clients: {elapsed * 1000:.2f} ms per message "
+          f"({with_stalls * 1000:.2f} ms for the message evicting {FAN_OUT_CLIENTS // 2:,} stalled clients)")
@@ -0,0 +1,197 @@
+# tests/test_counters.py
+import asyncio
+import importlib.util
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal, engine
+from app.models.attendance import Attendance
+from app.models.performance import PerformanceCounter, PerformanceScore
+from app.models.report import DailyReport
+from app.models.task import Task
+from app.services.counters import bump_counters, reconcile_counters
+from app.services.performance import calculate_performance_breakdown, compute_org_components, counter_breakdown
+from app.services.trend import last_n_months
+from tests.conftest import ADMIN_ID, auth_headers
+
+MONTH, YEAR = 3, 2026
+
+
+def _at(day: int, month: int = MONTH) -> datetime:
+    return datetime(2026, month, day, 9, tzinfo=timezone.utc)
+
+
+def _report(user_id: int, when: datetime) -> DailyReport:
+    return DailyReport(user_id=user_id, date=when, created_at=when, achievements="a",
+                       challenges="c", completed_tasks="t", plans_for_tomorrow="p")
+
+
+@pytest.fixture
+async def activity(db_setup):
+    """Source rows written directly, so no counters exist yet."""
+    async with AsyncSessionLocal() as db:
+        for day in (2, 3, 4):
+            db.add(_report(100, _at(day)))
+        db.add(_report(101, _at(2)))
+        db.add(_report(100, _at(2, 4)))
+        db.add(Attendance(user_id=100, check_in_at=_at(2), method="IP"))
+        for rating in (3, None):
+            db.add(Task(title="Done", creator_id=1, assigned_to_id=100, deadline=_at(10), status="completed",
+                        rating=rating, completed_at=_at(5)))
+        await db.commit()
+
+
+async def _counters(db, user_id, month=MONTH):
+    return (await db.execute(
+        select(PerformanceCounter)
+        .where(PerformanceCounter.user_id == user_id)
+        .where(PerformanceCounter.month == month)
+        .where(PerformanceCounter.year == YEAR)
+    )).scalar_one_or_none()
+
+
+async def test_breakdown_falls_back_to_source_without_counters(activity):
+    async with AsyncSessionLocal() as db:
+        assert await counter_breakdown(db, 100, MONTH, YEAR) == await calculate_performance_breakdown(db, 100, MONTH, YEAR)
+
+
+async def test_reconcile_rebuilds_counters(activity, statements):
+    async with AsyncSessionLocal() as db:
+        drift = await reconcile_counters(db, MONTH, YEAR, dry_run=True)
+        assert {d["user_id"] for d in drift} == {100, 101}
+        assert await _counters(db, 100) is None
+
+        await reconcile_counters(db, MONTH, YEAR)
+        counter = await _counters(db, 100)
+        assert (counter.reports_submitted, counter.days_present, counter.tasks_completed,
+                counter.rating_sum, counter.rating_count) == (3, 1, 2, 3, 1)
+        assert await reconcile_counters(db, MONTH, YEAR) == []
+
+        expected = await calculate_performance_breakdown(db, 100, MONTH, YEAR)
+        with statements() as executed:
+            breakdown = await counter_breakdown(db, 100, MONTH, YEAR)
+        assert len(executed) == 1
+        assert breakdown == pytest.approx(expected)
+
+        with statements() as executed:
+            columns = await compute_org_components(db, MONTH, YEAR)
+        assert len(executed) == 1
+        assert columns["user_ids"] == [100, 101, 102]
+        assert columns["score"][0] == pytest.approx(expected["score"])
+        assert columns["report_consistency"][1] == pytest.approx(1 / 31 * 100)
+        assert columns["report_consistency"][2] == 0.0
+
+
+async def test_reconcile_does_not_lose_concurrent_bump(activity):
+    async with AsyncSessionLocal() as writer, AsyncSessionLocal() as reconciler:
+        # A report route mid-transaction: source row and counter bump not yet committed
+        writer.add(_report(102, _at(6)))
+        await bump_counters(writer, 102, _at(6), reports_submitted=1)
+        await writer.flush()
+
+        rebuild = asyncio.create_task(reconcile_counters(reconciler, MONTH, YEAR))
+        await asyncio.sleep(0.2)
+        assert not rebuild.done()  # waits for the writer instead of rebuilding around it
+        await writer.commit()
+        await asyncio.wait_for(rebuild, 5)
+
+    async with AsyncSessionLocal() as db:
+        assert (await _counters(db, 102)).reports_submitted == 1
+        assert await reconcile_counters(db, MONTH, YEAR, dry_run=True) == []
+
+
+async def test_backfill_migration_matches_reconcile(activity):
+    path = Path(__file__).parent.parent / "alembic" / "versions" / "a9d3f6b2c8e1_backfill_performance_counters.py"
+    spec = importlib.util.spec_from_file_location("backfill_performance_counters", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: _run_upgrade(sync_conn, migration))
+
+    async with AsyncSessionLocal() as db:
+        assert await reconcile_counters(db, MONTH, YEAR, dry_run=True) == []
+        assert await reconcile_counters(db, 4, YEAR, dry_run=True) == []
+        assert (await _counters(db, 100, month=4)).reports_submitted == 1
+
+
+def _run_upgrade(sync_conn, migration):
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    with Operations.context(MigrationContext.configure(sync_conn)):
+        migration.upgrade()
+
+
+async def test_concurrent_ratings_and_completions_keep_counters_exact(client):
+    async with AsyncSessionLocal() as db:
+        rated = Task(title="Rate me", creator_id=ADMIN_ID, assigned_to_id=100, rater_id=101,
+                     deadline=_at(20), status="completed", completed_at=_at(5))
+        open_task = Task(title="Finish me", creator_id=ADMIN_ID, assigned_to_id=100, rater_id=101,
+                         deadline=_at(20), status="pending")
+        db.add_all([rated, open_task])
+        await db.commit()
+        await reconcile_counters(db, MONTH, YEAR)
+
+    responses = await asyncio.gather(
+        *(client.post(f"/tasks/{rated.id}/rate", json={"rating": 1 + i % 5}, headers=auth_headers(101))
+          for i in range(4)),
+        *(client.post(f"/admin/tasks/{rated.id}/rate", json={"rating": 1 + i % 5}, headers=auth_headers(ADMIN_ID))
+          for i in range(2)),
+        *(client.post(f"/tasks/{open_task.id}/complete", headers=auth_headers(100)) for _ in range(4)),
+    )
+    assert all(r.status_code == 200 for r in responses[:6])
+    assert sorted(r.status_code for r in responses[6:]) == [200, 400, 400, 400]
+
+    month = datetime.now(timezone.utc).month
+    async with AsyncSessionLocal() as db:
+        assert await reconcile_counters(db, MONTH, YEAR, dry_run=True) == []
+        assert await reconcile_counters(db, month, 2026, dry_run=True) == []
+
+
+async def test_late_rating_refreshes_a_closed_month(client):
+    (month, year), _, _ = last_n_months(3, datetime.now(timezone.utc))
+    async with AsyncSessionLocal() as db:
+        task = Task(title="Late", creator_id=ADMIN_ID, assigned_to_id=100, deadline=datetime(year, month, 20, tzinfo=timezone.utc),
+                    status="completed", completed_at=datetime(year, month, 5, tzinfo=timezone.utc))
+        db.add(task)
+        await db.commit()
+        await reconcile_counters(db, month, year)
+
+    async def closed_month_task_score():
+        r = await client.get("/performance/trend?months=3", headers=auth_headers(100))
+        assert r.status_code == 200
+        point = r.json()["users"][0]["history"][0]
+        assert (point["month"], point["year"]) == (month, year)
+        return point["task_score"]
+
+    assert await closed_month_task_score() == 0.0
+    assert await closed_month_task_score() == 0.0  # now cached and stored as final
+
+    r = await client.post(f"/admin/tasks/{task.id}/rate", json={"rating": 5}, headers=auth_headers(ADMIN_ID))
+    assert r.status_code == 200
+    assert await closed_month_task_score() == 100.0
+
+    async with AsyncSessionLocal() as db:
+        stored = (await db.execute(
+            select(PerformanceScore).where(PerformanceScore.user_id == 100)
+            .where(PerformanceScore.month == month).where(PerformanceScore.year == year)
+        )).scalar_one()
+    assert stored.task_score == 100.0 and stored.computed_at is not None
+
+
+async def test_reconcile_refreshes_a_closed_month(client):
+    (month, year), _, _ = last_n_months(3, datetime.now(timezone.utc))
+    r = await client.get("/performance/trend?months=3", headers=auth_headers(100))
+    assert r.json()["users"][0]["history"][0]["report_consistency"] == 0.0
+
+    # A report the counters missed, e.g. written before they existed
+    async with AsyncSessionLocal() as db:
+        db.add(_report(100, datetime(year, month, 3, 9, tzinfo=timezone.utc)))
+        await db.commit()
+        assert len(await reconcile_counters(db, month, year)) == 1
+
+    r = await client.get("/performance/trend?months=3", headers=auth_headers(100))
+    assert r.json()["users"][0]["history"][0]["report_consistency"] > 0.0
@@ -0,0 +1,113 @@
+# tests/test_deadlines.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, select
+
+from app.database import AsyncSessionLocal, engine
+from app.models.task import Task
+from app.services.deadlines import DeadlineScheduler
+from tests.conftest import ADMIN_ID
+
+
+async def _add_task(deadline: datetime, status: str = "pending") -> int:
+    async with AsyncSessionLocal() as db:
+        task = Task(title="Due", creator_id=ADMIN_ID, assigned_to_id=100, deadline=deadline, status=status)
+        db.add(task)
+        await db.commit()
+        return task.id
+
+
+def _scheduler() -> tuple:
+    scheduler = DeadlineScheduler()
+    events = []
+    scheduler.subscribe(events.append)
+    return scheduler, events
+
+
+async def _is_overdue(task_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Task.is_overdue).where(Task.id == task_id))).scalar_one()
+
+
+async def test_due_task_is_flagged_once(db_setup):
+    now = datetime.now(timezone.utc)
+    due = await _add_task(now + timedelta(milliseconds=200))
+    later = await _add_task(now + timedelta(days=1))
+    scheduler, events = _scheduler()
+    await scheduler.load()
+    assert scheduler.overdue_count == 0
+
+    scheduler.schedule(due, now - timedelta(seconds=1), 100)  # deadline moved into the past
+    await scheduler._expire_due()
+    await scheduler._expire_due()
+
+    assert [(e["type"], e["task_id"]) for e in events] == [("task_overdue", due)]
+    assert scheduler.overdue_count == 1
+    assert await _is_overdue(due) and not await _is_overdue(later)
+
+
+async def test_only_one_worker_publishes(db_setup):
+    task_id = await _add_task(datetime.now(timezone.utc) + timedelta(milliseconds=300))
+    workers = [_scheduler() for _ in range(3)]
+    for scheduler, _ in workers:
+        await scheduler.load()
+
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    for scheduler, _ in workers:
+        scheduler.schedule(task_id, past, 100)
+        await scheduler._expire_due()
+
+    assert sum(len(events) for _, events in workers) == 1
+    assert all(scheduler.overdue_count == 1 for scheduler, _ in workers)
+
+
+async def test_completed_task_does_not_fire(db_setup):
+    task_id = await _add_task(datetime.now(timezone.utc) - timedelta(seconds=1), status="completed")
+    scheduler, events = _scheduler()
+    scheduler.schedule(task_id, datetime.now(timezone.utc) - timedelta(seconds=1), 100)
+    await scheduler._expire_due()
+    assert events == [] and scheduler.overdue_count == 0
+
+
+async def test_changes_during_load_are_kept(db_setup):
+    existing = await _add_task(datetime.now(timezone.utc) + timedelta(days=1))
+    finished = await _add_task(datetime.now(timezone.utc) + timedelta(days=1))
+    scheduler, _ = _scheduler()
+    new_deadline = datetime.now(timezone.utc) + timedelta(days=2)
+
+    def during_snapshot(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT tasks.id, tasks.deadline"):
+            # Routes acting while the open-task query is in flight
+            scheduler.schedule(4242, new_deadline, 100)
+            scheduler.complete(finished)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", during_snapshot)
+    try:
+        await scheduler.load()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", during_snapshot)
+
+    assert scheduler._open.get(4242) == new_deadline
+    assert existing in scheduler._open
+    assert finished not in scheduler._open
+
+
+async def test_reopened_overdue_task_does_not_fire_again(db_setup):
+    task_id = await _add_task(datetime.now(timezone.utc) - timedelta(days=1))
+    scheduler, events = _scheduler()
+    await scheduler.load()  # catches up: flagged without an event
+    assert scheduler.overdue_count == 1
+
+    scheduler.complete(task_id)
+    scheduler.mark_overdue(task_id)
+    await scheduler._expire_due()
+    assert events == [] and scheduler.overdue_count == 1
+
+
+@pytest.mark.parametrize("naive", [True, False])
+async def test_schedule_accepts_naive_deadlines(naive):
+    scheduler, _ = _scheduler()
+    deadline = datetime(2030, 1, 1, 12)
+    scheduler.schedule(1, deadline if naive else deadline.replace(tzinfo=timezone.utc), 100)
+    assert scheduler._open[1] == datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
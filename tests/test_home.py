@@ -0,0 +1,82 @@
+# tests/test_home.py
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.routers import home
+from tests.conftest import auth_headers
+
+SECTIONS = ["dashboard", "attendance", "tasks", "goals", "performance"]
+SEPARATE_CALLS = ["/dashboard", "/attendance/status", "/tasks/me", "/goals/dashboard", "/performance/my"]
+
+
+async def test_home_returns_every_section(client):
+    r = await client.get("/home", headers=auth_headers(100))
+    assert r.status_code == 200
+    body = r.json()
+    assert body["errors"] == {}
+    assert body["user"]["id"] == 100
+    assert all(body[name] is not None for name in SECTIONS)
+
+
+async def test_home_requires_a_valid_token(client):
+    r = await client.get("/home", headers={"Authorization": "Bearer nope"})
+    assert r.status_code == 401
+
+
+async def test_failing_sections_degrade_to_partial_results(client, monkeypatch):
+    async def hangs(db, current_user):
+        await asyncio.sleep(5)
+
+    async def breaks(db, current_user):
+        raise RuntimeError("boom")
+
+    async def refuses(db, current_user):
+        raise HTTPException(403, "Not allowed")
+
+    monkeypatch.setattr(settings, "HOME_SECTION_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setitem(home.HOME_SECTIONS, "goals", hangs)
+    monkeypatch.setitem(home.HOME_SECTIONS, "performance", breaks)
+    monkeypatch.setitem(home.HOME_SECTIONS, "attendance", refuses)
+
+    start = time.perf_counter()
+    r = await client.get("/home", headers=auth_headers(100))
+    elapsed = time.perf_counter() - start
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["errors"] == {"goals": "timeout", "performance": "unavailable", "attendance": "Not allowed"}
+    assert body["goals"] is None and body["performance"] is None and body["attendance"] is None
+    assert body["dashboard"] is not None and body["tasks"] is not None
+    assert elapsed < 1.0  # bounded by the section timeout, not the slow section
+
+
+@pytest.mark.benchmark
+async def test_home_against_five_separate_calls(client):
+    headers = auth_headers(100)
+
+    async def separate():
+        for path in SEPARATE_CALLS:
+            assert (await client.get(path, headers=headers)).status_code == 200
+
+    async def composite():
+        assert (await client.get("/home", headers=headers)).status_code == 200
+
+    async def best_of(runs, fn):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    await separate()  # warm caches and the pool
+    await composite()
+    separate_time = await best_of(20, separate)
+    home_time = await best_of(20, composite)
+
+    assert home_time < separate_time
+    print(f"\nhome page: five calls {separate_time * 1000:.1f} ms, /home {home_time * 1000:.1f} ms")
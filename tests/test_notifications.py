@@ -0,0 +1,105 @@
+# tests/test_notifications.py
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.services.chat_hub import ChatHub, LocalBroker, NOTIFY_PAYLOAD_LIMIT
+from app.services.notifications import FAN_OUT_BATCH_SIZE, NotificationHub, notification_hub
+from tests.conftest import ADMIN_ID, STAFF_IDS, auth_headers
+
+
+def _drain(sub) -> list:
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+
+async def test_bulk_assignment_is_one_batched_notification(client, broker_payloads):
+    subs = {user_id: notification_hub.subscribe(user_id, []) for user_id in STAFF_IDS}
+    try:
+        deadline = (datetime.now(timezone.utc) + timedelta(days=3)).isoformat()
+        r = await client.post("/admin/tasks/bulk", headers=auth_headers(ADMIN_ID), json={
+            "title": "Quarterly review", "deadline": deadline, "assigned_to_ids": STAFF_IDS,
+        })
+        assert r.status_code == 200
+        task_ids = {item["id"]: item["task_id"] for item in r.json()["results"]}
+
+        assert len(broker_payloads) == 1
+        for user_id, sub in subs.items():
+            events = [e for e in _drain(sub) if e["type"] == "task_assigned"]
+            assert [(e["data"]["task_id"], e["data"]["assigned_to_id"]) for e in events] == [(task_ids[user_id], user_id)]
+            assert events[0]["data"]["title"] == "Quarterly review"
+    finally:
+        for sub in subs.values():
+            notification_hub.unsubscribe(sub)
+
+
+async def test_fan_out_batches_fit_broker_payload(broker_payloads):
+    hub = NotificationHub()
+    per_user = [(user_id, {"task_id": 10_000_000 + user_id, "assigned_to_id": user_id}) for user_id in range(250)]
+    await hub.publish_each("task_assigned", {"title": "é" * 100, "creator_id": 1, "deadline": "2026-01-01"}, per_user)
+
+    assert len(broker_payloads) == -(-250 // FAN_OUT_BATCH_SIZE)
+    for payload in broker_payloads:
+        assert len(json.dumps(payload, default=str).encode()) < NOTIFY_PAYLOAD_LIMIT
+
+
+async def test_referenced_event_reaches_sse_only_worker():
+    sender, receiver = ChatHub(), ChatHub()
+    broker = LocalBroker()
+    big = {"type": "message", "id": 7, "conversation_id": 5, "content": "x" * (NOTIFY_PAYLOAD_LIMIT + 1)}
+    loaded = []
+
+    async def loader(message_id):
+        loaded.append(message_id)
+        return big
+
+    await sender.start(broker)
+    await receiver.start(broker, loader=loader)
+    sse = NotificationHub()
+    receiver.tap(sse._on_chat_hub)
+    receiver.listen_for(sse.has_conversation_listeners)
+    sub = sse.subscribe(100, [5])
+    try:
+        await sender.publish(6, {**big, "conversation_id": 6})  # nobody listens to 6 on the receiver
+        await sender.publish(5, big)
+        assert loaded == [7]
+        assert [e["data"]["content"] for e in _drain(sub) if e["type"] == "chat_message"] == [big["content"]]
+    finally:
+        await sender.stop()
+        await receiver.stop()
+
+
+def test_conversation_index_follows_membership():
+    hub = NotificationHub()
+    member = hub.subscribe(100, [5])
+    idle = [hub.subscribe(user_id, []) for user_id in range(200, 1200)]
+    assert hub.has_conversation_listeners(5) and not hub.has_conversation_listeners(6)
+
+    hub._on_chat_hub("event", 5, {"type": "message", "id": 1})
+    assert member.queue.qsize() == 1 and all(sub.queue.empty() for sub in idle)
+
+    hub._on_chat_hub("join", 6, 200)
+    hub._on_chat_hub("event", 6, {"type": "message", "id": 2})
+    assert idle[0].queue.qsize() == 1
+
+    hub._on_chat_hub("leave", 5, 100)
+    assert not hub.has_conversation_listeners(5)
+    hub.unsubscribe(idle[0])
+    assert not hub.has_conversation_listeners(6)
+
+
+async def test_overdue_notification_is_delivered():
+    from app.services import notifications
+
+    sub = notification_hub.subscribe(100, [])
+    try:
+        notifications.notify_task_overdue({"type": "task_overdue", "task_id": 1, "assigned_to_id": 100, "deadline": "d"})
+        assert len(notifications._pending_publishes) == 1
+        await asyncio.gather(*notifications._pending_publishes)
+        await asyncio.sleep(0)
+        assert not notifications._pending_publishes
+        assert [e["type"] for e in _drain(sub)] == ["task_overdue"]
+    finally:
+        notification_hub.unsubscribe(sub)
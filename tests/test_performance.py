@@ -0,0 +1,183 @@
+# tests/test_performance.py
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.database import AsyncSessionLocal
+from app.models.attendance import Attendance
+from app.models.performance import PerformanceCounter, PerformanceScore
+from app.models.report import DailyReport
+from app.models.task import Task
+from app.services.counters import reconcile_counters
+from app.services.leaderboard import get_leaderboard
+from app.services.performance import (
+    UPSERT_BATCH_SIZE, calculate_performance_breakdown, combine_score, get_attendance_rate, get_report_consistency,
+    get_task_score, materialize_performance_scores, refresh_performance_score, upsert_performance_scores,
+)
+from tests.conftest import STAFF_IDS, seed_staff
+
+MATERIALIZE_STAFF = 10_000
+
+MONTH, YEAR = 3, 2026  # 31 days
+
+
+def _at(day: int, month: int = MONTH) -> datetime:
+    return datetime(YEAR, month, day, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def activity(db_setup):
+    """Staff 100: 3 reports, 2 check-ins and tasks rated 4 and 5 in March, plus noise elsewhere."""
+    async with AsyncSessionLocal() as db:
+        for day in (2, 3, 4):
+            db.add(DailyReport(user_id=100, date=_at(day), created_at=_at(day), achievements="a",
+                               challenges="c", completed_tasks="t", plans_for_tomorrow="p"))
+        for day in (2, 3):
+            db.add(Attendance(user_id=100, check_in_at=_at(day), method="IP"))
+        for rating in (4, 5):
+            db.add(Task(title="Done", creator_id=1, assigned_to_id=100, deadline=_at(10), status="completed",
+                        rating=rating, completed_at=_at(5)))
+        # Other months and other staff must not count
+        db.add(DailyReport(user_id=100, date=_at(2, 4), created_at=_at(2, 4), achievements="a",
+                           challenges="c", completed_tasks="t", plans_for_tomorrow="p"))
+        db.add(Attendance(user_id=101, check_in_at=_at(2), method="IP"))
+        db.add(Task(title="Done", creator_id=1, assigned_to_id=100, deadline=_at(10), status="completed",
+                    rating=1, completed_at=_at(5, 2)))
+        await db.commit()
+
+
+async def test_breakdown_is_one_statement(activity, statements):
+    async with AsyncSessionLocal() as db:
+        with statements() as executed:
+            breakdown = await calculate_performance_breakdown(db, 100, MONTH, YEAR)
+
+    assert len(executed) == 1
+    assert breakdown["report_consistency"] == pytest.approx(3 / 31 * 100)
+    assert breakdown["task_score"] == pytest.approx(90.0)
+    assert breakdown["attendance_rate"] == pytest.approx(2 / 31 * 100)
+    assert breakdown["score"] == pytest.approx(combine_score(
+        breakdown["report_consistency"], breakdown["task_score"], breakdown["attendance_rate"],
+        breakdown["training_score"], breakdown["achievement_count"],
+    ))
+
+
+async def test_breakdown_matches_per_component_queries(activity, statements):
+    async with AsyncSessionLocal() as db:
+        breakdown = await calculate_performance_breakdown(db, 100, MONTH, YEAR)
+        with statements() as executed:
+            report = await get_report_consistency(db, 100, MONTH, YEAR)
+            task = await get_task_score(db, 100, MONTH, YEAR)
+            attendance = await get_attendance_rate(db, 100, MONTH, YEAR)
+
+    assert len(executed) == 3
+    assert breakdown["report_consistency"] == pytest.approx(report)
+    assert breakdown["task_score"] == pytest.approx(task)
+    assert breakdown["attendance_rate"] == pytest.approx(attendance)
+
+
+async def test_breakdown_not_slower_than_per_component_queries(activity):
+    async def best_of(runs, fn):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    async with AsyncSessionLocal() as db:
+        async def single():
+            await calculate_performance_breakdown(db, 100, MONTH, YEAR)
+
+        async def separate():
+            await get_report_consistency(db, 100, MONTH, YEAR)
+            await get_task_score(db, 100, MONTH, YEAR)
+            await get_attendance_rate(db, 100, MONTH, YEAR)
+
+        await single(), await separate()  # warm up
+        single_time = await best_of(20, single)
+        separate_time = await best_of(20, separate)
+
+    # One round trip instead of three; allow generous slack for noisy machines
+    assert single_time < separate_time * 1.5
+
+
+async def test_score_writes_invalidate_leaderboard(db_setup):
+    row = {"user_id": 100, "month": MONTH, "year": YEAR, "computed_at": _at(1), "score": 50.0,
+           "report_consistency": 0.0, "task_score": 0.0, "attendance_rate": 0.0,
+           "training_score": 100.0, "achievement_count": 0}
+    async with AsyncSessionLocal() as db:
+        await upsert_performance_scores(db, [row])
+        await db.commit()
+        assert (await get_leaderboard(db, MONTH, YEAR)).standing(100)["score"] == 50.0
+
+        # Uncommitted writes leave the cached snapshot alone
+        await upsert_performance_scores(db, [{**row, "score": 70.0}])
+        assert (await get_leaderboard(db, MONTH, YEAR)).standing(100)["score"] == 50.0
+        await db.rollback()
+
+    await refresh_performance_score(100, MONTH, YEAR)  # recomputed: nothing recorded → training only
+    async with AsyncSessionLocal() as db:
+        snapshot = await get_leaderboard(db, MONTH, YEAR)
+    assert snapshot.standing(100)["score"] == pytest.approx(combine_score(0, 0, 0, 100.0, 0), abs=0.01)
+
+
+async def _stored_scores() -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(PerformanceScore).where(PerformanceScore.month == MONTH).where(PerformanceScore.year == YEAR)
+        )
+        return {score.user_id: score for score in result.scalars()}
+
+
+async def test_materialize_stores_full_breakdowns(activity):
+    async with AsyncSessionLocal() as db:
+        await reconcile_counters(db, MONTH, YEAR)
+        assert await materialize_performance_scores(db, MONTH, YEAR) == len(STAFF_IDS)
+        # Re-running updates the same rows in place
+        assert await materialize_performance_scores(db, MONTH, YEAR) == len(STAFF_IDS)
+        expected = {user_id: await calculate_performance_breakdown(db, user_id, MONTH, YEAR) for user_id in STAFF_IDS}
+
+    stored = await _stored_scores()
+    assert set(stored) == set(STAFF_IDS)
+    for user_id, breakdown in expected.items():
+        for column, value in breakdown.items():
+            assert getattr(stored[user_id], column) == pytest.approx(value), (user_id, column)
+        assert stored[user_id].computed_at is not None
+    assert stored[100].task_score == pytest.approx(90.0)
+    assert stored[101].attendance_rate == pytest.approx(1 / 31 * 100)
+
+
+@pytest.mark.benchmark
+async def test_materialize_ten_thousand_staff(db_setup, statements):
+    staff_ids = await seed_staff(MATERIALIZE_STAFF)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(PerformanceCounter), [
+            {"user_id": user_id, "month": MONTH, "year": YEAR, "reports_submitted": user_id % 31,
+             "days_present": user_id % 23, "tasks_completed": user_id % 7,
+             "rating_sum": 4 * (user_id % 7), "rating_count": user_id % 7}
+            for user_id in staff_ids
+        ])
+        await db.commit()
+
+        with statements() as executed:
+            start = time.perf_counter()
+            count = await materialize_performance_scores(db, MONTH, YEAR)
+            elapsed = time.perf_counter() - start
+
+        # The per-user path it replaces, sampled on 200 staff
+        sample = staff_ids[:200]
+        start = time.perf_counter()
+        for user_id in sample:
+            await calculate_performance_breakdown(db, user_id, MONTH, YEAR)
+        per_user = (time.perf_counter() - start) / len(sample)
+
+    total = MATERIALIZE_STAFF + len(STAFF_IDS)
+    assert count == total
+    assert len(await _stored_scores()) == total
+    # One counters read, then the upsert in batches
+    assert len(executed) == 1 + -(-total // UPSERT_BATCH_SIZE)
+    assert elapsed < 10.0
+    print(f"\nmaterialize {total:,} staff: {elapsed * 1000:.0f} ms, {len(executed)} statements "
+          f"(per-user breakdowns: {per_user * 1000:.2f} ms each, ~{per_user * total:.1f} s for all)")